@@ -7,13 +7,17 @@ Created on Tue Dec  2 16:43:05 2025
 Primarily generated using Gemini
 """
 import sys
-import csv
 import pandas as pd
 import numpy as np
 import matplotlib
-import re
 import os
-from scipy.stats import linregress
+import copy
+import sqlite3
+from datetime import datetime
+import warnings
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 matplotlib.use('QtAgg')
 
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
@@ -21,16 +25,31 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QStackedWidget, QComboBox, QLineEdit, QGridLayout,
                                QFrame, QMessageBox, QScrollArea, QSplitter, QGroupBox,
                                QTableWidget, QTableWidgetItem, QHeaderView, QFormLayout,
-                               QSizePolicy, QSpacerItem, QCheckBox)
-from PySide6.QtCore import Qt, Signal, QSize, QPoint
-from PySide6.QtGui import QColor, QPainter, QAction, QIcon, QFont, QPalette, QBrush, QPen
+                               QSizePolicy, QSpacerItem, QCheckBox, QDialog,
+                               QDialogButtonBox, QTabWidget, QSpinBox, QDoubleSpinBox, QSlider)
+from PySide6.QtCore import Qt, Signal, QSize, QPoint, QTimer
+from PySide6.QtGui import QColor, QPainter, QAction, QIcon, QFont, QPalette, QBrush, QPen, QPolygon
 
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 from PySide6.QtGui import QPixmap
 from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
 import seaborn as sns
 
+# Data logic lives in the GUI-free hibitquant package next to this script
+from hibitquant import (CURVE_MODELS, CURVE_PARAMS, CURVE_EQUATIONS, resource_path, DataParser,
+                        QuantEngine, QCEngine, BackgroundEngine, DEFAULT_BACKGROUND, TimeAligner, PlateWorkspace,
+                        CurveLibrary, ResultsDatabase, CalibrationEngine, AssayMetrics, HitRanker, quantify,
+                        quantify_batch, assay_metrics, well_features, plate_matrix, plate_format, WellMask)
+from hibitquant.metrics import METRICS, THRESHOLDS
+from hibitquant.ranking import RANK_LEVELS, RANK_VALUES
+from hibitquant.pipeline import calibrator_scales
+from hibitquant.timecourse import TIME_SIGNALS, STABLE_READS, TimeCourseEngine
+from hibitquant.features import FEATURES, SIGNAL_FEATURES, SMOOTHING, PLATE_SHAPES, row_label
+from hibitquant.cli import run_cli
+from hibitquant.report import FIGURES, plate_job, generate_report
+
 # --- Constants ---
 COLORS = [
     '#2563eb', '#dc2626', '#16a34a', '#d97706', '#9333ea', 
@@ -39,92 +58,13 @@ COLORS = [
     '#65a30d', '#be123c', '#4f46e5', '#b45309', '#334155'
 ]
 
-# --- Data Logic ---
-
-class DataParser:
-    @staticmethod
-    def parse_file(filepath):
-        try:
-            if filepath.endswith('.xlsx') or filepath.endswith('.xls'):
-                df_raw = pd.read_excel(filepath, header=None)
-                rows = df_raw.values.tolist()
-            else:
-                with open(filepath, 'r', encoding='utf-8-sig', errors='replace') as f:
-                    reader = csv.reader(f)
-                    rows = list(reader)
-
-            all_data = []
-            well_pat = re.compile(r'^[A-P][0-9]{1,2}$')
-            
-            i = 0
-            while i < len(rows):
-                row = [str(x).strip() for x in rows[i]]
-                
-                # Check Column 1 for 'Time'
-                is_time_row = False
-                if len(row) > 1 and (row[1].lower() == 'time' or 'time' in row[1].lower()):
-                    is_time_row = True
-                
-                if is_time_row:
-                    has_well_headers = any(well_pat.match(col) for col in row)
-
-                    if has_well_headers:
-                        header = row
-                        block_data = []
-                        i += 1
-                        
-                        while i < len(rows):
-                            data_row = rows[i]
-                            if not data_row or len(data_row) < 2 or not str(data_row[1]).strip():
-                                break
-                            
-                            try:
-                                data_row = [str(x).strip() for x in data_row]
-                                time_val = DataParser.parse_time(str(data_row[1]))
-                                
-                                row_dict = {'Time': time_val}
-                                for idx, val in enumerate(data_row):
-                                    if idx < len(header):
-                                        well = header[idx]
-                                        if well and well_pat.match(well): 
-                                            try:
-                                                row_dict[well] = float(val)
-                                            except:
-                                                row_dict[well] = np.nan
-                                block_data.append(row_dict)
-                                i += 1
-                            except ValueError:
-                                break
-                        
-                        if block_data:
-                            all_data.extend(block_data)
-                    else:
-                        i += 1
-                else:
-                    i += 1
-
-            if not all_data:
-                raise ValueError("No valid data blocks found. Ensure the file contains 'Time' in the second column (Column B) followed by Well IDs.")
-
-            df = pd.DataFrame(all_data)
-            df = df.groupby('Time').first().reset_index()
-            df = df.sort_values('Time')
-            
-            return df
-
-        except Exception as e:
-            raise e
-
-    @staticmethod
-    def parse_time(time_str):
-        s = str(time_str).strip()
-        if ':' in s:
-            parts = list(map(float, s.split(':')))
-            if len(parts) == 3: 
-                return parts[0]*60 + parts[1] + parts[2]/60
-            elif len(parts) == 2:
-                return parts[0]*60 + parts[1]
-        return float(s)
+# Per-well metrics of the plate heatmap: the kinetic features, then derived values
+HEATMAP_METRICS = {
+    **FEATURES,
+    'conc': "Concentration (µg/mL)",
+    'stock_conc': "Stock Concentration (µg/mL)",
+    'qc': "QC Flagged",
+}
 
 # --- Custom Widgets ---
 
@@ -136,6 +76,7 @@ class WellButton(QWidget):
         self.is_selected = False
         self.is_valid = True # Default to valid until data proves otherwise
         self.color = None
+        self.qc_flag = None # QC reason text, drawn as a corner marker
         self.setCursor(Qt.PointingHandCursor)
         self.setToolTip(well_id)
 
@@ -151,6 +92,12 @@ class WellButton(QWidget):
             self.setToolTip(self.well_id)
         self.update()
 
+    def set_qc_flag(self, reason):
+        self.qc_flag = reason or None
+        if self.is_valid:
+            self.setToolTip(f"{self.well_id} (QC: {reason})" if reason else self.well_id)
+        self.update()
+
     def set_color(self, color):
         self.color = color
         self.update()
@@ -190,6 +137,14 @@ class WellButton(QWidget):
             painter.setPen(QColor("#a0a0a0"))
             painter.drawRect(rect)
 
+        # QC FLAG MARKER (red corner triangle)
+        if self.qc_flag and self.is_valid:
+            size = max(rect.width() // 3, 5)
+            corner = rect.topRight()
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#dc2626"))
+            painter.drawPolygon(QPolygon([corner, corner - QPoint(size, 0), corner + QPoint(0, size)]))
+
         # SELECTION HIGHLIGHT
         if self.is_selected and self.is_valid:
             painter.setBrush(Qt.NoBrush)
@@ -202,78 +157,139 @@ class WellButton(QWidget):
 class PlateMapWidget(QWidget):
     selection_changed = Signal(list) 
 
+    # Grid geometry per format: (button size, header font size, spacing)
+    GEOMETRY = {96: (32, 10, 2), 384: (20, 8, 2), 1536: (12, 6, 1)}
+
     def __init__(self, format=96):
         super().__init__()
         self.format = format
         self.layout = QGridLayout(self)
         self.layout.setSpacing(2)
         self.wells = {} 
-        self.selected_wells = set()
-        self.valid_wells = None
+        self.buttons = [] # Plate order, so bit i of a mask is self.buttons[i]
+        self.selection = WellMask(format)
+        self.valid = None # WellMask of wells with data; None before data is loaded (all clickable)
+        self.valid_source = None # The valid well IDs as given, kept across format changes
+        self.assigned = WellMask(format) # Wells colored by a condition
+        self.qc_flags = {} # Well -> QC reason
         self.is_dragging = False
         self.drag_target_state = True 
         self.rebuild_grid()
 
+    @property
+    def selected_wells(self):
+        """Selected well IDs in plate order."""
+        return self.selection.wells()
+
+    @property
+    def valid_wells(self):
+        return None if self.valid is None else self.valid.wells()
+
     def set_valid_wells(self, valid_wells_list):
         """Updates which wells are clickable based on data presence."""
-        self.valid_wells = set(valid_wells_list) if valid_wells_list is not None else None
-        
-        for well_id, btn in self.wells.items():
-            if self.valid_wells is None:
-                btn.set_valid(True)
-            else:
-                # If well ID is in our list of valid data columns, it's valid.
-                btn.set_valid(well_id in self.valid_wells)
-        
+        self.valid_source = list(valid_wells_list) if valid_wells_list is not None else None
+        self.valid = WellMask.from_wells(self.valid_source, self.format) if self.valid_source is not None else None
+
+        for i, btn in enumerate(self.buttons):
+            btn.set_valid(self.valid is None or bool(self.valid.bits >> i & 1))
+        self._apply_selection(self.selection)
         self.update() # Force repaint
 
+    def set_qc_flags(self, flags):
+        """Marks wells flagged by the QC pass. `flags` maps well ID -> reason."""
+        self.qc_flags = dict(flags)
+        for well_id, btn in self.wells.items():
+            btn.set_qc_flag(self.qc_flags.get(well_id))
+
     def rebuild_grid(self):
         while self.layout.count():
             item = self.layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
         self.wells = {}
-        self.selected_wells.clear()
-
-        rows = 8 if self.format == 96 else 16
-        cols = 12 if self.format == 96 else 24
-        size = 32 if self.format == 96 else 20
-        font_size = 10 if self.format == 96 else 8
+        self.buttons = []
+        self.selection = WellMask(self.format)
+        self.assigned = WellMask(self.format)
+        self.valid = WellMask.from_wells(self.valid_source, self.format) if self.valid_source is not None else None
+
+        rows, cols = self.selection.shape
+        size, font_size, spacing = self.GEOMETRY[self.format]
+        self.layout.setSpacing(spacing)
+        font = QFont("Arial", font_size)
+        font.setBold(True)
 
-        # Headers
+        # Headers (click to toggle the whole column / row)
         for c in range(cols):
             lbl = QLabel(str(c+1))
             lbl.setAlignment(Qt.AlignCenter)
-            font = QFont("Arial", font_size)
-            font.setBold(True)
             lbl.setFont(font)
+            lbl.setProperty('col', c)
+            lbl.setCursor(Qt.PointingHandCursor)
+            lbl.setToolTip(f"Select column {c+1}")
             self.layout.addWidget(lbl, 0, c+1)
 
         for r in range(rows):
-            letter = chr(65 + r)
+            letter = row_label(r)
             lbl = QLabel(letter)
             lbl.setAlignment(Qt.AlignCenter)
-            font = QFont("Arial", font_size)
-            font.setBold(True)
             lbl.setFont(font)
+            lbl.setProperty('row', r)
+            lbl.setCursor(Qt.PointingHandCursor)
+            lbl.setToolTip(f"Select row {letter}")
             self.layout.addWidget(lbl, r+1, 0)
 
             for c in range(cols):
                 well_id = f"{letter}{c+1}"
                 btn = WellButton(well_id, size)
-                if self.valid_wells is not None:
-                    btn.set_valid(well_id in self.valid_wells)
+                if self.valid is not None:
+                    btn.set_valid(bool(self.valid.bits >> (r * cols + c) & 1))
+                btn.set_qc_flag(self.qc_flags.get(well_id))
                 self.layout.addWidget(btn, r+1, c+1)
                 self.wells[well_id] = btn
+                self.buttons.append(btn)
+
+    # --- Selection ---
+    def _apply_selection(self, mask):
+        """Makes `mask` (limited to wells with data) the selection; only the wells that change are repainted."""
+        if self.valid is not None:
+            mask = mask & self.valid
+        changed = WellMask(self.format, self.selection.bits ^ mask.bits)
+        self.selection = mask
+        for i in changed.indices():
+            self.buttons[i].set_selected(bool(mask.bits >> i & 1))
+
+    def select_mask(self, mask):
+        """Replaces the selection with a WellMask."""
+        self._apply_selection(mask)
+        self.selection_changed.emit(self.selected_wells)
+
+    def toggle_mask(self, mask):
+        """Adds the wells of `mask` to the selection, or removes them if they are all selected already."""
+        if self.valid is not None:
+            mask = mask & self.valid
+        self.select_mask(self.selection - mask if mask and (mask - self.selection).bits == 0 else self.selection | mask)
+
+    def select_checkerboard(self):
+        """Checkerboard from A1; selecting it again switches to the other half."""
+        mask = WellMask.checkerboard(self.format, 0)
+        if self.valid is not None:
+            mask = mask & self.valid
+        self.select_mask(WellMask.checkerboard(self.format, 1) if mask and self.selection == mask else mask)
+
+    def select_quadrant(self, q):
+        self.select_mask(WellMask.quadrant(self.format, q))
+
+    def invert_selection(self):
+        self.select_mask(~self.selection)
+
+    def select_unassigned(self):
+        """Keeps the selected wells that belong to no condition (all of them if nothing is selected)."""
+        base = self.selection if self.selection else WellMask.all(self.format)
+        self.select_mask(base - self.assigned)
 
     def set_selection(self, well_ids):
         """Programmatically select specific wells."""
-        self.clear_selection()
-        for wid in well_ids:
-            if wid in self.wells and self.wells[wid].is_valid:
-                self.wells[wid].set_selected(True)
-                self.selected_wells.add(wid)
-        self.selection_changed.emit(list(self.selected_wells))
+        self.select_mask(WellMask.from_wells(well_ids, self.format))
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -283,6 +299,12 @@ class PlateMapWidget(QWidget):
                 # Toggle logic: If clicking a selected well, target is deselect.
                 self.drag_target_state = not w.is_selected
                 self._set_well_state(w, self.drag_target_state)
+            elif isinstance(w, QLabel) and w.property('row') is not None:
+                self.is_dragging = False
+                self.toggle_mask(WellMask.row(self.format, w.property('row')))
+            elif isinstance(w, QLabel) and w.property('col') is not None:
+                self.is_dragging = False
+                self.toggle_mask(WellMask.column(self.format, w.property('col')))
             else:
                 # Clicking empty space doesn't clear in this logic to allow
                 # easier multi-select, but we can refine if needed.
@@ -296,26 +318,22 @@ class PlateMapWidget(QWidget):
                 self._set_well_state(w, self.drag_target_state)
 
     def mouseReleaseEvent(self, event):
-        if event.button() == Qt.LeftButton:
+        if event.button() == Qt.LeftButton and self.is_dragging:
             self.is_dragging = False
-            self.selection_changed.emit(list(self.selected_wells))
+            self.selection_changed.emit(self.selected_wells)
 
     def _set_well_state(self, btn, state):
-        if state:
-            self.selected_wells.add(btn.well_id)
-            btn.set_selected(True)
-        else:
-            if btn.well_id in self.selected_wells:
-                self.selected_wells.remove(btn.well_id)
-            btn.set_selected(False)
+        bit = WellMask.from_wells([btn.well_id], self.format)
+        self.selection = self.selection | bit if state else self.selection - bit
+        btn.set_selected(state)
 
     def clear_selection(self):
-        for wid in list(self.selected_wells):
-            self.wells[wid].set_selected(False)
-        self.selected_wells.clear()
+        self._apply_selection(WellMask(self.format))
         self.selection_changed.emit([])
 
     def assign_color(self, well_ids, color):
+        mask = WellMask.from_wells(well_ids, self.format)
+        self.assigned = self.assigned | mask if color else self.assigned - mask
         for wid in well_ids:
             if wid in self.wells:
                 self.wells[wid].set_color(color)
@@ -332,7 +350,7 @@ class HiBitApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("HiBit Quant")
-        self.setWindowIcon(QIcon('resources/icon.png'))
+        self.setWindowIcon(QIcon(resource_path('icon.png')))
         self.resize(1300, 850)
 
         # State
@@ -340,7 +358,31 @@ class HiBitApp(QMainWindow):
         self.conditions = [] 
         self.color_idx = 0
         self.standard_curves = {} # Dict to store curve metadata
+        self.curve_library = None # CurveLibrary, set by load_standard_curves
         self.editing_condition_index = None # Track if we are in edit mode
+        self.dose_fit = None # Last curve fitted on the dose plot
+        self.custom_curve_se = {} # Parameter errors of the fit copied into the Custom curve
+        self._quant_cache = OrderedDict() # Quant state -> QuantResult, most recent last
+        self._time_cache = OrderedDict() # Time course state -> TimeCourse, most recent last
+        self._well_results = None # QuantResult shown in the Wells tab
+        self._pending_views = set() # Views queued for the next redraw
+        self._drawn = {} # View -> state key it currently shows
+        self.qc = None # Per-well QC masks, see QCEngine.run
+        self.bg_mode = DEFAULT_BACKGROUND
+        self.signal = 'peak' # Well feature used as the quantified signal, see SIGNAL_FEATURES
+        self.smoothing = 'median'
+        self.workspace = PlateWorkspace()
+        self.data_version = 0 # Bumped whenever self.df is replaced
+        self.results_db = None # Opened on first use
+        self._hash_cache = {} # File path -> sha256
+        self._report_pool = ThreadPoolExecutor(max_workers=1) # Runs batch reports off the GUI thread
+        self._report = None # (future, progress) of the running batch report
+        self._stop_report = False # Set to make the running batch report skip its remaining plates
+        self._corrected = None # (cache key, blank-subtracted df)
+        self._other_cache = {} # Inactive plate id -> (cache key, blank-subtracted df, excluded wells)
+        self._features = None # (working df, smoothing, per-well feature table)
+        self._heat = None # Heatmap artists, rebuilt when the plate format changes
+        self.qc_settings = {'saturation': None, 'max_nan_frac': 0.2, 'method': 'robust-z', 'threshold': 3.5, 'exclude': True}
 
         # Central Widget
         self.central_widget = QWidget()
@@ -358,6 +400,7 @@ class HiBitApp(QMainWindow):
         self.setup_map_page()
         self.setup_plot_page()
         self.setup_quant_page()
+        self.setup_heatmap_page()
 
         # Load standard curves if available
         self.load_standard_curves()
@@ -373,7 +416,7 @@ class HiBitApp(QMainWindow):
         
         title = QLabel("HiBit Quant")
         logo = QLabel()
-        image = QPixmap("resources/icon.png").scaled(
+        image = QPixmap(resource_path("icon.png")).scaled(
             QSize(30,30),
             Qt.KeepAspectRatio,
             Qt.SmoothTransformation)
@@ -386,12 +429,23 @@ class HiBitApp(QMainWindow):
         
         header_layout.addStretch()
 
+        header_layout.addWidget(QLabel("Plate:"))
+        self.combo_plate = QComboBox()
+        self.combo_plate.setMinimumWidth(180)
+        self.combo_plate.activated.connect(lambda idx: self.switch_plate(self.combo_plate.itemData(idx)))
+        header_layout.addWidget(self.combo_plate)
+        btn_close_plate = QPushButton("Close Plate")
+        btn_close_plate.clicked.connect(self.close_plate)
+        header_layout.addWidget(btn_close_plate)
+        header_layout.addSpacing(20)
+
         self.btn_nav_upload = QPushButton("1. Upload")
         self.btn_nav_map = QPushButton("2. Map Plate")
         self.btn_nav_plot = QPushButton("3. Visualize")
         self.btn_nav_quant = QPushButton("4. Quantification")
+        self.btn_nav_heat = QPushButton("5. Heatmap")
         
-        self.nav_btns = [self.btn_nav_upload, self.btn_nav_map, self.btn_nav_plot, self.btn_nav_quant]
+        self.nav_btns = [self.btn_nav_upload, self.btn_nav_map, self.btn_nav_plot, self.btn_nav_quant, self.btn_nav_heat]
         for btn in self.nav_btns:
             btn.setCheckable(True)
             btn.clicked.connect(self.navigate)
@@ -418,7 +472,7 @@ class HiBitApp(QMainWindow):
                 self.btn_nav_map.setChecked(True)
                 sender.setChecked(False)
                 return
-            self.update_plots()
+            self.schedule_redraw('plots')
             self.stack.setCurrentIndex(2)
         elif sender == self.btn_nav_quant:
             if not self.conditions:
@@ -426,13 +480,69 @@ class HiBitApp(QMainWindow):
                 self.btn_nav_map.setChecked(True)
                 sender.setChecked(False)
                 return
-            self.update_quant_table()
-            self.update_quant_plot() # Initial plot update
+            self.schedule_redraw('quant_table', 'quant_plot')
             self.stack.setCurrentIndex(3)
+        elif sender == self.btn_nav_heat:
+            if self.df is None:
+                QMessageBox.warning(self, "Data Missing", "Please upload a file first.")
+                self.btn_nav_upload.setChecked(True)
+                sender.setChecked(False)
+                return
+            self.schedule_redraw('heatmap')
+            self.stack.setCurrentIndex(4)
         
         for b in self.nav_btns:
             if b != sender: b.setChecked(False)
 
+    # --- Redraw Scheduling ---
+    def schedule_redraw(self, *views, force=False):
+        """Queues 'plots', 'quant_table', 'quant_plot' and/or 'heatmap' for an update.
+
+        A burst of change signals is merged into one update per view on the
+        next event-loop tick. `force` redraws even if the inputs are unchanged.
+        """
+        if force:
+            for view in views:
+                self._drawn.pop(view, None)
+        if not self._pending_views:
+            QTimer.singleShot(0, self.flush_redraws)
+        self._pending_views.update(views)
+
+    def flush_redraws(self):
+        pending, self._pending_views = self._pending_views, set()
+        for view, update in [('plots', self.update_plots), ('quant_table', self.update_quant_table),
+                             ('quant_plot', self.update_quant_plot), ('heatmap', self.update_heatmap)]:
+            if view in pending:
+                update()
+
+    def view_is_current(self, view, key):
+        """True if `view` already shows the state `key`."""
+        return self._drawn.get(view) == key
+
+    def mark_drawn(self, view, key):
+        """Records `key` as the state `view` shows; called once its update has finished."""
+        self._drawn[view] = key
+
+    def workspace_state(self):
+        return tuple((pid, name, repr(self.workspace.get_conditions(pid))) for pid, name in self.workspace.names())
+
+    def plot_state(self):
+        """Everything the Visualize plots are drawn from."""
+        return (self.data_version, self.bg_mode, self.signal, self.smoothing, repr(self.conditions),
+                tuple(sorted(self.qc_excluded())), self.combo_fit_model.currentText(),
+                tuple(w.text() for w in [self.k_title, self.k_xlabel, self.k_ylabel, self.d_title, self.d_xlabel, self.d_ylabel]),
+                self.workspace_state() if self.check_overlay.isChecked() else None)
+
+    def quant_state(self):
+        """Everything the quantification results are computed from (curve inputs as typed)."""
+        name = self.combo_curve.currentText()
+        return (self.data_version, self.bg_mode, self.signal, self.smoothing, repr(self.conditions),
+                tuple(sorted(self.qc_excluded())), None if self.qc is None else tuple(self.qc['reason']),
+                name, repr(self.standard_curves.get(name)), repr(self.custom_curve_se), self.combo_model.currentText(),
+                self.input_m.text(), self.input_b.text(), self.input_params.text(),
+                self.check_bootstrap.isChecked(), self.spin_boot_iter.value(), self.spin_boot_seed.value(),
+                self.spin_boot_level.value(), self.combo_series_mode.currentData(), self.check_normalize.isChecked())
+
     # --- Page 1: Upload ---
     def setup_upload_page(self):
         page = QWidget()
@@ -446,7 +556,7 @@ class HiBitApp(QMainWindow):
         group_layout.setSpacing(20)
         group_layout.addStretch()
         
-        lbl = QLabel("Supports .csv and .xlsx from Biotek/Synergy")
+        lbl = QLabel("Supports .csv and .xlsx from Biotek/Synergy\nEach file is added to the workspace as a new plate")
         lbl.setAlignment(Qt.AlignCenter)
         
         btn = QPushButton("Browse Files")
@@ -456,9 +566,20 @@ class HiBitApp(QMainWindow):
         self.file_label = QLabel("No file loaded")
         self.file_label.setAlignment(Qt.AlignCenter)
         
+        budget_layout = QHBoxLayout()
+        budget_layout.addStretch()
+        budget_layout.addWidget(QLabel("Workspace Memory Budget (MB):"))
+        self.spin_budget = QSpinBox()
+        self.spin_budget.setRange(16, 65536)
+        self.spin_budget.setValue(self.workspace.budget_mb)
+        self.spin_budget.valueChanged.connect(self.workspace.set_budget)
+        budget_layout.addWidget(self.spin_budget)
+        budget_layout.addStretch()
+
         group_layout.addWidget(lbl)
         group_layout.addWidget(btn, 0, Qt.AlignCenter) 
         group_layout.addWidget(self.file_label)
+        group_layout.addLayout(budget_layout)
         group_layout.addStretch()
         
         h_layout.addWidget(group)
@@ -470,45 +591,131 @@ class HiBitApp(QMainWindow):
         self.stack.addWidget(page)
 
     def browse_file(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Open Data File", "", "Data Files (*.csv *.xlsx *.txt)")
+        path, _ = QFileDialog.getOpenFileName(self, "Open Data File", "", "Data Files (*.csv *.xlsx *.xls *.txt)")
         if path:
             try:
-                self.df = DataParser.parse_file(path)
-                self.file_label.setText(f"Loaded: {path.split('/')[-1]}")
-                palette = self.file_label.palette()
-                palette.setColor(QPalette.WindowText, Qt.darkGreen)
-                self.file_label.setPalette(palette)
-                
-                # --- Valid Well Detection ---
-                non_na_counts = self.df.notna().sum(axis=0)
-                valid_columns = non_na_counts[non_na_counts > 0].index.tolist()
-                valid_wells = [str(w) for w in valid_columns if w != 'Time']
-                
-                # --- Auto-detect Plate Format ---
-                is_384 = False
-                for w in valid_wells:
-                    match = re.match(r'^([A-Z])([0-9]+)$', w)
-                    if match:
-                        row_letter = match.group(1)
-                        col_num = int(match.group(2))
-                        if row_letter > 'H' or col_num > 12:
-                            is_384 = True
-                            break
-
-                self.plate_widget.set_valid_wells(valid_wells)
-                
-                target_index = 1 if is_384 else 0
-                if self.combo_fmt.currentIndex() != target_index:
-                    self.combo_fmt.setCurrentIndex(target_index)
-                
-                fmt_str = "384-Well" if is_384 else "96-Well"
-                QMessageBox.information(self, "Success", f"Parsed {len(self.df)} time points.\nFound {len(valid_wells)} valid wells (with data).\nDetected: {fmt_str}")
-                
-                self.stack.setCurrentIndex(1)
-                self.btn_nav_map.setChecked(True)
-                self.btn_nav_upload.setChecked(False)
+                df = DataParser.parse_file(path)
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to parse file:\n{str(e)}")
+                return
+
+            name = os.path.basename(path)
+            conditions = []
+            if self.conditions:
+                reply = QMessageBox.question(self, "Plate Layout", "Apply the current plate's conditions to the new plate?")
+                if reply == QMessageBox.Yes:
+                    conditions = copy.deepcopy(self.conditions)
+            pid = self.workspace.add(df, name, path, conditions)
+            self.combo_plate.addItem(name, pid)
+            self.switch_plate(pid)
+
+            self.file_label.setText(f"Loaded: {name}")
+            palette = self.file_label.palette()
+            palette.setColor(QPalette.WindowText, Qt.darkGreen)
+            self.file_label.setPalette(palette)
+
+            fmt_str = f"{self.plate_widget.format}-Well"
+            n_valid = len(self.plate_widget.valid_wells or [])
+            QMessageBox.information(self, "Success", f"Parsed {len(self.df)} time points.\nFound {n_valid} valid wells (with data).\nDetected: {fmt_str}")
+
+            self.stack.setCurrentIndex(1)
+            self.btn_nav_map.setChecked(True)
+            self.btn_nav_upload.setChecked(False)
+
+    def switch_plate(self, pid):
+        """Makes a workspace plate the active one (self.df / self.conditions)."""
+        if pid is None or pid not in self.workspace.plates: return
+        if self.editing_condition_index is not None:
+            self.cancel_edit_mode()
+        if self.workspace.active in self.workspace.plates:
+            self.workspace.set_conditions(self.workspace.active, self.conditions)
+
+        self.df = self.workspace.set_active(pid)
+        self.data_version += 1
+        self.conditions = self.workspace.get_conditions(pid)
+        self.combo_plate.setCurrentIndex(self.combo_plate.findData(pid))
+        self.file_label.setText(f"Active: {self.workspace.plates[pid]['name']}")
+
+        # --- Valid Well Detection ---
+        non_na_counts = self.df.notna().sum(axis=0)
+        valid_columns = non_na_counts[non_na_counts > 0].index.tolist()
+        valid_wells = [str(w) for w in valid_columns if w != 'Time']
+        
+        # --- Auto-detect Plate Format ---
+        self.plate_widget.set_valid_wells(valid_wells)
+        
+        target_index = self.combo_fmt.findData(plate_format(valid_wells))
+        if self.combo_fmt.currentIndex() != target_index:
+            self.combo_fmt.setCurrentIndex(target_index)
+
+        # Repaint the condition colors of this plate
+        self.plate_widget.assign_color(list(self.plate_widget.wells), None)
+        for cond in self.conditions:
+            self.plate_widget.assign_color(cond['wells'], cond['color'])
+        self.update_condition_list() # Also reruns QC
+
+        current = self.stack.currentIndex()
+        if current == 2 and self.conditions:
+            self.schedule_redraw('plots')
+        elif current == 3 and self.conditions:
+            self.schedule_redraw('quant_table', 'quant_plot')
+        elif current == 4:
+            self.schedule_redraw('heatmap')
+
+    def close_plate(self):
+        pid = self.combo_plate.currentData()
+        if pid is None: return
+        self.workspace.remove(pid)
+        self._other_cache.pop(pid, None)
+        self.combo_plate.removeItem(self.combo_plate.findData(pid))
+        if self.combo_plate.count():
+            self.switch_plate(self.combo_plate.itemData(0))
+        else:
+            self.df = None
+            self.data_version += 1
+            self.conditions = []
+            self.qc = None
+            self.plate_widget.assign_color(list(self.plate_widget.wells), None)
+            self.plate_widget.set_valid_wells(None)
+            self.plate_widget.set_qc_flags({})
+            self.condition_list.setRowCount(0)
+            self.file_label.setText("No file loaded")
+            self.stack.setCurrentIndex(0)
+            for b in self.nav_btns:
+                b.setChecked(b == self.btn_nav_upload)
+
+    def other_plates(self):
+        """(name, working df, conditions, excluded wells) for every inactive workspace plate.
+
+        Each plate gets its own blank subtraction and QC pass with the current
+        settings, cached per plate until its conditions or those settings change.
+        """
+        settings = {k: v for k, v in self.qc_settings.items() if k != 'exclude'}
+        for pid, name in self.workspace.names():
+            if pid == self.workspace.active: continue
+            conditions = self.workspace.get_conditions(pid)
+            key = (self.bg_mode, repr(sorted(self.qc_settings.items())), repr(conditions))
+            cached = self._other_cache.get(pid)
+            if cached is None or cached[0] != key:
+                df = self.workspace.get_df(pid)
+                excluded = set()
+                if self.qc_settings['exclude']:
+                    qc = QCEngine.run(df, conditions, **settings)
+                    excluded = set(qc.index[qc['flagged']])
+                blank_wells = [w for c in conditions if c.get('blank') for w in c['wells'] if w not in excluded]
+                cached = self._other_cache[pid] = (key, BackgroundEngine.correct(df, blank_wells, self.bg_mode), excluded)
+            yield name, cached[1], conditions, cached[2]
+
+    def closeEvent(self, event):
+        if self._report is not None and not self._report[0].done():
+            reply = QMessageBox.question(self, "Batch Report", "A batch report is still being generated. Stop it and quit?")
+            if reply != QMessageBox.Yes:
+                event.ignore()
+                return
+            self._stop_report = True
+        self._report_pool.shutdown(wait=False, cancel_futures=True)
+        self.workspace.close()
+        super().closeEvent(event)
 
     # --- Page 2: Map ---
     def setup_map_page(self):
@@ -521,19 +728,50 @@ class HiBitApp(QMainWindow):
         controls_layout = QHBoxLayout()
         lbl_fmt = QLabel("Format:")
         self.combo_fmt = QComboBox()
-        self.combo_fmt.addItems(["96 Well", "384 Well"])
+        for fmt in PLATE_SHAPES:
+            self.combo_fmt.addItem(f"{fmt} Well", fmt)
         self.combo_fmt.currentIndexChanged.connect(self.change_plate_format)
         
         self.btn_import_guide = QPushButton("Import Guide File")
         self.btn_import_guide.clicked.connect(self.import_guide_file)
 
+        self.lbl_qc = QLabel("QC: -")
+        btn_qc = QPushButton("QC Settings")
+        btn_qc.clicked.connect(self.edit_qc_settings)
+
         controls_layout.addWidget(lbl_fmt)
         controls_layout.addWidget(self.combo_fmt)
         controls_layout.addStretch()
+        controls_layout.addWidget(self.lbl_qc)
+        controls_layout.addWidget(btn_qc)
         controls_layout.addWidget(self.btn_import_guide)
         
         left_layout.addLayout(controls_layout)
 
+        self.plate_widget = PlateMapWidget(96)
+        self.plate_widget.selection_changed.connect(self.update_selection_info)
+
+        # Pattern selectors (row / column: click the plate headers)
+        select_layout = QHBoxLayout()
+        select_layout.addWidget(QLabel("Select:"))
+        selectors = [("Checkerboard", "Alternating wells from A1; click again for the other half",
+                      self.plate_widget.select_checkerboard)]
+        for q, start in enumerate(["A1", "A2", "B1", "B2"]):
+            selectors.append((f"Q{q + 1}", f"Quadrant {q + 1}: every other row and column from {start} "
+                              "(one 96-well plate of a 384, or one 384-well plate of a 1536)",
+                              lambda _=False, q=q: self.plate_widget.select_quadrant(q)))
+        selectors += [("Invert", "Swap selected and unselected wells", self.plate_widget.invert_selection),
+                      ("Unassigned Only", "Keep only selected wells that are in no condition "
+                       "(all unassigned wells if nothing is selected)", self.plate_widget.select_unassigned),
+                      ("Clear", "Clear the selection", self.plate_widget.clear_selection)]
+        for text, tip, slot in selectors:
+            btn = QPushButton(text)
+            btn.setToolTip(tip)
+            btn.clicked.connect(slot)
+            select_layout.addWidget(btn)
+        select_layout.addStretch()
+        left_layout.addLayout(select_layout)
+
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setFrameShape(QFrame.NoFrame)
@@ -542,9 +780,6 @@ class HiBitApp(QMainWindow):
         wrapper_layout = QGridLayout(wrapper) 
         wrapper_layout.setAlignment(Qt.AlignCenter)
         
-        self.plate_widget = PlateMapWidget(96)
-        self.plate_widget.selection_changed.connect(self.update_selection_info)
-        
         wrapper_layout.addWidget(self.plate_widget, 0, 0, Qt.AlignCenter)
         scroll.setWidget(wrapper)
         
@@ -571,6 +806,11 @@ class HiBitApp(QMainWindow):
         self.input_conc.setPlaceholderText("Optional (for Dose-Response plot only)")
         right_layout.addWidget(self.input_conc)
 
+        self.check_blank = QCheckBox("Blank (background) wells")
+        right_layout.addWidget(self.check_blank)
+        self.check_calibrator = QCheckBox("Reference calibrator (needs a concentration)")
+        right_layout.addWidget(self.check_calibrator)
+
         # Button Stack for Assign vs Save/Cancel
         self.btn_stack = QStackedWidget()
         
@@ -624,8 +864,7 @@ class HiBitApp(QMainWindow):
         self.stack.addWidget(page)
 
     def change_plate_format(self, index):
-        fmt = 96 if index == 0 else 384
-        self.plate_widget.set_format(fmt)
+        self.plate_widget.set_format(self.combo_fmt.itemData(index))
 
     def update_selection_info(self, selected_wells):
         self.lbl_sel_count.setText(f"{len(selected_wells)} wells selected")
@@ -640,95 +879,17 @@ class HiBitApp(QMainWindow):
         if not path: return
 
         try:
-            if path.endswith('.csv'):
-                df_guide = pd.read_csv(path)
-            else:
-                df_guide = pd.read_excel(path)
-
-            # --- Parse Guide File ---
-            # Assumption: Row indices in Col 0 (A, B, C), Column headers in Row 0 (1, 2, 3...)
-            # We iterate through the dataframe.
-            
-            # Map column headers to strings to find '1', '2' etc.
-            df_guide.columns = [str(c).strip() for c in df_guide.columns]
-            
-            # Find the "Row" identifier column if it exists, otherwise assume index 0
-            row_col_idx = 0
-            if 'Row' in df_guide.columns:
-                row_col_idx = df_guide.columns.get_loc('Row')
-            
-            new_conditions_map = {} # Key: Name, Value: {wells: [], conc: val, color: ...}
-
-                
-            for c in df_guide.columns:
-                # Check if column header is a number (1-24)
-                if c.isdigit():
-                    col_num = int(c)
-                    for r in range(len(df_guide)):
-                        row_letter = str(df_guide.iloc[r, row_col_idx]).strip().upper()
-                        if not re.match(r'^[A-P]$', row_letter): continue # Skip non-letter rows
-                        well_id = f"{row_letter}{col_num}"
-                        
-                        cell_val = str(df_guide.iloc[r][c]).strip()
-                        if not cell_val or cell_val.lower() == 'nan': continue
-                        
-                        # Parse {Name}@{Dilution}~{Conc}
-                        # Regex to handle optional parts
-                        match = re.match(r'^(?P<name>[^@~]+)(?:@(?P<dilution>[^~]+))?(?:~(?P<conc>.+))?$', cell_val)
-                        if not match: continue
-                        
-                        name = match.group('name').strip()
-                        dil_str = match.group('dilution')
-                        conc_str = match.group('conc')
-                        
-                        dilution = 1.0
-                        if dil_str:
-                            try: dilution = float(dil_str)
-                            except: pass
-                            
-                        conc = None
-                        if conc_str:
-                            try: conc = float(conc_str)
-                            except: pass
-                        
-                        if name not in new_conditions_map:
-                             color = COLORS[self.color_idx % len(COLORS)]
-                             self.color_idx += 1
-                             new_conditions_map[name] = {
-                                 'name': name,
-                                 'conc': conc,
-                                 'dilution': dilution,
-                                 'color': color,
-                                 'wells': []
-                             }
-                        
-                        # Consistency check
-                        if conc is not None and new_conditions_map[name]['conc'] is None:
-                             new_conditions_map[name]['conc'] = conc
-                        if dilution != 1.0 and new_conditions_map[name]['dilution'] == 1.0:
-                             new_conditions_map[name]['dilution'] = dilution
-                        
-                        new_conditions_map[name]['wells'].append(well_id)
-
-            # Apply to app
             count = 0
-            for name, data in new_conditions_map.items():
-                if not data['wells']: continue
-                
+            for data in DataParser.parse_guide_file(path):
                 # Remove these wells from any existing conditions
                 for cond in self.conditions:
                     cond['wells'] = [w for w in cond['wells'] if w not in data['wells']]
                 self.conditions = [c for c in self.conditions if c['wells']]
 
-                self.conditions.append({
-                    'id': f"{name}_{len(self.conditions)}",
-                    'name': name,
-                    'conc': data['conc'],
-                    'dilution': data['dilution'],
-                    'color': data['color'],
-                    'wells': data['wells']
-                })
-                self.plate_widget.assign_color(data['wells'], data['color'])
+                color = COLORS[self.color_idx % len(COLORS)]
+                self.color_idx += 1
+                self.conditions.append(dict(data, id=f"{data['name']}_{len(self.conditions)}", color=color))
+                self.plate_widget.assign_color(data['wells'], color)
                 count += 1
             
             self.update_condition_list()
@@ -780,7 +941,9 @@ class HiBitApp(QMainWindow):
             'conc': conc,
             'dilution': dilution,
             'color': color,
-            'wells': wells
+            'wells': wells,
+            'blank': self.check_blank.isChecked(),
+            'calibrator': self.check_calibrator.isChecked()
         }
         self.conditions.append(new_cond)
 
@@ -790,6 +953,8 @@ class HiBitApp(QMainWindow):
         self.input_conc.clear()
         self.input_dilution.clear()
         self.input_name.clear() 
+        self.check_blank.setChecked(False)
+        self.check_calibrator.setChecked(False)
 
     def edit_condition(self, index):
         """Enter Edit Mode for a specific condition."""
@@ -808,6 +973,8 @@ class HiBitApp(QMainWindow):
         # Handle dilution (if key missing in old saves, default to 1.0)
         dil = cond.get('dilution', 1.0)
         self.input_dilution.setText(str(dil))
+        self.check_blank.setChecked(cond.get('blank', False))
+        self.check_calibrator.setChecked(cond.get('calibrator', False))
             
         # 2. Select Wells on Grid
         self.plate_widget.set_selection(cond['wells'])
@@ -867,6 +1034,8 @@ class HiBitApp(QMainWindow):
         cond['conc'] = conc
         cond['dilution'] = dilution
         cond['wells'] = wells
+        cond['blank'] = self.check_blank.isChecked()
+        cond['calibrator'] = self.check_calibrator.isChecked()
         
         # Update Visuals
         self.plate_widget.assign_color(old_wells, None)
@@ -880,6 +1049,8 @@ class HiBitApp(QMainWindow):
         self.input_name.clear()
         self.input_conc.clear()
         self.input_dilution.clear()
+        self.check_blank.setChecked(False)
+        self.check_calibrator.setChecked(False)
         self.plate_widget.clear_selection()
         self.btn_stack.setCurrentIndex(0) # Back to Add mode
         self.condition_list.setEnabled(True)
@@ -889,10 +1060,13 @@ class HiBitApp(QMainWindow):
     def update_condition_list(self):
         # First, filter out any empty conditions that might have occurred during editing/stealing
         self.conditions = [c for c in self.conditions if c['wells']]
+        # Replicate groups changed, so the outlier masks must be recomputed
+        self.run_qc()
         
         self.condition_list.setRowCount(len(self.conditions))
         for i, cond in enumerate(self.conditions):
-            item_name = QTableWidgetItem(cond['name'])
+            item_name = QTableWidgetItem(cond['name'] + (" (Blank)" if cond.get('blank') else "")
+                                         + (" (Calibrator)" if cond.get('calibrator') else ""))
             item_name.setForeground(QColor(cond['color']))
             font = QFont()
             font.setBold(True)
@@ -918,6 +1092,103 @@ class HiBitApp(QMainWindow):
             btn_del.clicked.connect(lambda checked=False, idx=i: self.delete_condition(idx))
             self.condition_list.setCellWidget(i, 4, btn_del)
 
+    # --- Quality Control ---
+    def run_qc(self):
+        """Recomputes the QC masks for the whole plate and marks flagged wells on the plate map."""
+        if self.df is None: return
+        settings = {k: v for k, v in self.qc_settings.items() if k != 'exclude'}
+        self.qc = QCEngine.run(self.df, self.conditions, **settings)
+        flagged = self.qc[self.qc['flagged']]
+        self.plate_widget.set_qc_flags(flagged['reason'].to_dict())
+        self.lbl_qc.setText(f"QC: {len(flagged)} flagged" + (" (excluded)" if self.qc_settings['exclude'] and len(flagged) else ""))
+
+    def qc_excluded(self):
+        """Wells that downstream calculations should skip."""
+        if self.qc is None or not self.qc_settings['exclude']:
+            return set()
+        return set(self.qc.index[self.qc['flagged']])
+
+    def condition_wells(self, cond):
+        """The wells of a condition that have data and pass QC."""
+        excluded = self.qc_excluded()
+        return [w for w in cond['wells'] if w in self.df.columns and w not in excluded]
+
+    def working_df(self):
+        """Plate data after blank subtraction, cached until the data, blanks or mode change."""
+        if self.df is None: return None
+        blank_wells = sorted(w for c in self.conditions if c.get('blank') for w in self.condition_wells(c))
+        key = (self.data_version, self.bg_mode, tuple(blank_wells))
+        if self._corrected is None or self._corrected[0] != key:
+            self._corrected = (key, BackgroundEngine.correct(self.df, blank_wells, self.bg_mode))
+        return self._corrected[1]
+
+    def well_features(self):
+        """Per-well feature table of the working data, recomputed only when the data or smoothing changes."""
+        df = self.working_df()
+        if self._features is None or self._features[0] is not df or self._features[1] != self.smoothing:
+            self._features = (df, self.smoothing, well_features(df, self.smoothing))
+        return self._features[2]
+
+    def condition_signal(self, df, conditions, excluded):
+        """QuantEngine.condition_peaks with the selected signal (cached features for the current plate)."""
+        features = None
+        if self.signal != 'peak':
+            features = self.well_features() if df is self.working_df() else well_features(df, self.smoothing)
+        return QuantEngine.condition_peaks(df, conditions, excluded, self.signal, features)
+
+    def on_bg_mode_change(self, index):
+        self.bg_mode = self.combo_bg.currentData()
+        self.schedule_redraw('plots')
+
+    def on_signal_change(self, index):
+        self.signal = self.combo_signal.currentData()
+        self.smoothing = self.combo_smoothing.currentData()
+        if self.d_ylabel.text() in ("Max RLU", *FEATURES.values()): # Keep a custom axis label
+            self.d_ylabel.setText(FEATURES[self.signal])
+        self.schedule_redraw('plots')
+
+    def edit_qc_settings(self):
+        dlg = QDialog(self)
+        dlg.setWindowTitle("QC Settings")
+        form = QFormLayout(dlg)
+
+        sat = self.qc_settings['saturation']
+        input_sat = QLineEdit("" if sat is None else f"{sat:g}")
+        input_sat.setPlaceholderText("Overflow markers only")
+        input_nan = QLineEdit(f"{self.qc_settings['max_nan_frac']:g}")
+        combo_method = QComboBox()
+        combo_method.addItem("Robust Z-Score (MAD)", "robust-z")
+        combo_method.addItem("Grubbs (α = 0.05)", "grubbs")
+        combo_method.setCurrentIndex(max(combo_method.findData(self.qc_settings['method']), 0))
+        input_thresh = QLineEdit(f"{self.qc_settings['threshold']:g}")
+        check_exclude = QCheckBox("Exclude flagged wells from calculations")
+        check_exclude.setChecked(self.qc_settings['exclude'])
+
+        form.addRow("Saturation RLU:", input_sat)
+        form.addRow("Max Missing Fraction:", input_nan)
+        form.addRow("Outlier Test:", combo_method)
+        form.addRow("Robust Z Threshold:", input_thresh)
+        form.addRow(check_exclude)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dlg.accept)
+        buttons.rejected.connect(dlg.reject)
+        form.addRow(buttons)
+
+        if dlg.exec() != QDialog.Accepted: return
+        try:
+            sat_text = input_sat.text().strip()
+            self.qc_settings.update({
+                'saturation': float(sat_text) if sat_text else None,
+                'max_nan_frac': float(input_nan.text()),
+                'method': combo_method.currentData(),
+                'threshold': float(input_thresh.text()),
+                'exclude': check_exclude.isChecked(),
+            })
+        except ValueError:
+            QMessageBox.warning(self, "Input Error", "QC thresholds must be numbers.")
+            return
+        self.run_qc()
+
     def delete_condition(self, index):
         cond = self.conditions.pop(index)
         self.plate_widget.assign_color(cond['wells'], None) 
@@ -933,11 +1204,43 @@ class HiBitApp(QMainWindow):
         btn_export_csv.clicked.connect(self.export_csv)
         btn_save_fig = QPushButton("Save Figure")
         btn_save_fig.clicked.connect(self.save_figure)
+        btn_align = QPushButton("Align Plates")
+        btn_align.clicked.connect(self.align_plates)
+        btn_report = QPushButton("Batch Report")
+        btn_report.clicked.connect(self.batch_report)
+
+        self.combo_bg = QComboBox()
+        for mode, label in BackgroundEngine.MODES.items():
+            self.combo_bg.addItem(label, mode)
+        self.combo_bg.setCurrentIndex(self.combo_bg.findData(self.bg_mode))
+        self.combo_bg.currentIndexChanged.connect(self.on_bg_mode_change)
+
+        self.combo_signal = QComboBox()
+        for feature in SIGNAL_FEATURES:
+            self.combo_signal.addItem(FEATURES[feature], feature)
+        self.combo_signal.setToolTip("Per-well signal used for standard curves and quantification")
+        self.combo_smoothing = QComboBox()
+        for mode, label in SMOOTHING.items():
+            self.combo_smoothing.addItem(label, mode)
+        self.combo_smoothing.setToolTip("Smoothing of the traces for the smoothed peak, plateau, time to peak and decay rate")
+        self.combo_signal.currentIndexChanged.connect(self.on_signal_change)
+        self.combo_smoothing.currentIndexChanged.connect(self.on_signal_change)
+
+        self.check_overlay = QCheckBox("Overlay Plates")
+        self.check_overlay.stateChanged.connect(lambda: self.schedule_redraw('plots'))
 
         toolbar_layout.addWidget(QLabel("Results"))
         toolbar_layout.addStretch()
+        toolbar_layout.addWidget(self.check_overlay)
+        toolbar_layout.addWidget(QLabel("Background:"))
+        toolbar_layout.addWidget(self.combo_bg)
+        toolbar_layout.addWidget(QLabel("Signal:"))
+        toolbar_layout.addWidget(self.combo_signal)
+        toolbar_layout.addWidget(self.combo_smoothing)
+        toolbar_layout.addWidget(btn_align)
         toolbar_layout.addWidget(btn_export_csv)
         toolbar_layout.addWidget(btn_save_fig)
+        toolbar_layout.addWidget(btn_report)
         layout.addLayout(toolbar_layout)
 
         splitter = QSplitter(Qt.Horizontal)
@@ -958,7 +1261,7 @@ class HiBitApp(QMainWindow):
         self.k_ylabel = QLineEdit("RLU")
         
         for w in [self.k_title, self.k_xlabel, self.k_ylabel]:
-            w.returnPressed.connect(self.update_plots)
+            w.returnPressed.connect(lambda: self.schedule_redraw('plots'))
 
         k_form.addRow("Title:", self.k_title)
         k_form.addRow("X-Axis:", self.k_xlabel)
@@ -983,11 +1286,24 @@ class HiBitApp(QMainWindow):
         self.d_ylabel = QLineEdit("Max RLU")
 
         for w in [self.d_title, self.d_xlabel, self.d_ylabel]:
-            w.returnPressed.connect(self.update_plots)
+            w.returnPressed.connect(lambda: self.schedule_redraw('plots'))
+
+        self.combo_fit_model = QComboBox()
+        self.combo_fit_model.addItems(CURVE_MODELS)
+        self.combo_fit_model.currentIndexChanged.connect(lambda: self.schedule_redraw('plots'))
+        btn_use_fit = QPushButton("Use Fit for Quantification")
+        btn_use_fit.clicked.connect(self.use_dose_fit)
+        btn_save_curve = QPushButton("Save to Library")
+        btn_save_curve.clicked.connect(self.save_curve_to_library)
+        fit_row = QHBoxLayout()
+        fit_row.addWidget(self.combo_fit_model)
+        fit_row.addWidget(btn_use_fit)
+        fit_row.addWidget(btn_save_curve)
 
         d_form.addRow("Title:", self.d_title)
         d_form.addRow("X-Axis:", self.d_xlabel)
         d_form.addRow("Y-Axis:", self.d_ylabel)
+        d_form.addRow("Fit Model:", fit_row)
         d_layout.addLayout(d_form)
         
         splitter.addWidget(dose_container)
@@ -996,22 +1312,36 @@ class HiBitApp(QMainWindow):
         self.stack.addWidget(page)
 
     def update_plots(self):
+        if self.df is None: return
+        key = self.plot_state()
+        if self.view_is_current('plots', key): return
         self.ax_kinetic.clear()
         self.ax_dose.clear()
-
-        if self.df is None: return
+        df = self.working_df()
 
         for cond in self.conditions:
-            valid_wells = [w for w in cond['wells'] if w in self.df.columns]
+            valid_wells = self.condition_wells(cond)
             if not valid_wells: continue
             
-            subset = self.df[valid_wells]
+            subset = df[valid_wells]
             mean = subset.mean(axis=1)
             std = subset.std(axis=1)
-            time = self.df['Time']
+            time = df['Time']
 
             self.ax_kinetic.errorbar(time, mean, yerr=std, label=cond['name'], 
                                      color=cond['color'], fmt='-o', capsize=3, markersize=4, alpha=0.8)
+
+        # Same-named conditions from the other workspace plates
+        if self.check_overlay.isChecked():
+            styles = ['--', ':', '-.']
+            colors = {cond['name']: cond['color'] for cond in self.conditions}
+            for p, (plate, other_df, other_conds, excluded) in enumerate(self.other_plates()):
+                for cond in other_conds:
+                    if cond['name'] not in colors: continue
+                    wells = [w for w in cond['wells'] if w in other_df.columns and w not in excluded]
+                    if not wells: continue
+                    self.ax_kinetic.plot(other_df['Time'], other_df[wells].mean(axis=1), styles[p % len(styles)],
+                                         color=colors[cond['name']], alpha=0.7, label=f"{cond['name']} [{plate}]")
         
         self.ax_kinetic.set_title(self.k_title.text())
         self.ax_kinetic.set_xlabel(self.k_xlabel.text())
@@ -1024,12 +1354,13 @@ class HiBitApp(QMainWindow):
         self.canvas_kinetic.draw()
 
         dose_data = []
+        signal = self.well_features()[self.signal]
         for cond in self.conditions:
             if cond['conc'] is not None:
-                valid_wells = [w for w in cond['wells'] if w in self.df.columns]
+                valid_wells = self.condition_wells(cond)
                 if not valid_wells: continue
                 
-                max_vals = self.df[valid_wells].max(axis=0)
+                max_vals = signal.reindex(valid_wells)
                 mean_max = max_vals.mean()
                 std_max = max_vals.std()
                 
@@ -1050,13 +1381,30 @@ class HiBitApp(QMainWindow):
             for _, row in dose_df.iterrows():
                 self.ax_dose.scatter(row['conc'], row['mean'], color=row['color'], s=60, label=row['name'], zorder=2)
 
-            slope, intercept, r_value, p_value, std_err = linregress(dose_df['conc'], dose_df['mean'])
-            
-            x_range = np.linspace(dose_df['conc'].min(), dose_df['conc'].max(), 100)
-            y_pred = slope * x_range + intercept
-            self.ax_dose.plot(x_range, y_pred, 'k--', alpha=0.7, zorder=1)
-            
-            eq_text = f"y = {slope:.2f}x + {intercept:.2f}\nR² = {r_value**2:.4f}"
+            model = self.combo_fit_model.currentText()
+            try:
+                fit = QuantEngine.fit_curve(dose_df['conc'], dose_df['mean'], model)
+            except (ValueError, RuntimeError) as e:
+                fit = None
+                eq_text = f"{model} fit failed:\n{e}"
+            self.dose_fit = fit
+
+            if fit is not None:
+                x_min = dose_df['conc'].min()
+                if model == 'Log-Log' or model.endswith('PL'):
+                    x_min = dose_df['conc'][dose_df['conc'] > 0].min()
+                x_range = np.linspace(x_min, dose_df['conc'].max(), 100)
+                y_pred = QuantEngine.predict(x_range, QuantEngine.curve_arrays({'fit': fit}))
+                self.ax_dose.plot(x_range, y_pred, 'k--', alpha=0.7, zorder=1)
+
+                if model == 'Linear':
+                    eq_text = f"y = {fit['m']:.2f}x + {fit['b']:.2f}"
+                elif model == 'Log-Log':
+                    eq_text = f"log y = {fit['m']:.3f}·log x + {fit['b']:.3f}"
+                else:
+                    n_params = 4 if model == '4PL' else 5
+                    eq_text = "\n".join(f"{p} = {fit[p]:.4g}" for p in CURVE_PARAMS[:n_params])
+                eq_text += f"\nR² = {fit['r^2']:.4f}"
             self.ax_dose.text(0.05, 0.95, eq_text, transform=self.ax_dose.transAxes, 
                               verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
@@ -1065,28 +1413,82 @@ class HiBitApp(QMainWindow):
             self.ax_dose.set_title(self.d_title.text())
             self.ax_dose.grid(True, which='both', linestyle='--', alpha=0.5)
         else:
+            self.dose_fit = None
             self.ax_dose.text(0.5, 0.5, "Assign concentrations to at least\n2 conditions.", 
                              ha='center', va='center', transform=self.ax_dose.transAxes)
 
         self.fig_dose.tight_layout()
         self.canvas_dose.draw()
+        self.mark_drawn('plots', key)
+
+    def use_dose_fit(self):
+        """Copies the current dose plot fit into the Custom curve on the Quantification page."""
+        if not self.dose_fit:
+            QMessageBox.warning(self, "No Fit", "Fit a standard curve on the dose plot first.")
+            return
+        fit = self.dose_fit
+        self.custom_curve_se = {k: v for k, v in fit.items() if k.endswith('_SE')}
+        if self.combo_curve.findText("Custom") < 0:
+            self.combo_curve.addItem("Custom", None)
+        self.combo_curve.setCurrentText("Custom")
+        self.combo_model.setCurrentText(fit['Model'])
+        if fit['Model'] in ('Linear', 'Log-Log'):
+            self.input_m.setText(f"{fit['m']:.6g}")
+            self.input_b.setText(f"{fit['b']:.6g}")
+        else:
+            n_params = 4 if fit['Model'] == '4PL' else 5
+            self.input_params.setText(", ".join(f"{fit[p]:.6g}" for p in CURVE_PARAMS[:n_params]))
+        QMessageBox.information(self, "Curve Applied", f"{fit['Model']} fit set as the Custom curve on the Quantification page.")
 
     def export_csv(self):
         if self.df is None or not self.conditions: return
         
         path, _ = QFileDialog.getSaveFileName(self, "Export CSV", "processed_data.csv", "CSV Files (*.csv)")
         if path:
-            export_df = pd.DataFrame({'Time': self.df['Time']})
+            df = self.working_df()
+            export_df = pd.DataFrame({'Time': df['Time']})
             for cond in self.conditions:
-                valid_wells = [w for w in cond['wells'] if w in self.df.columns]
+                valid_wells = self.condition_wells(cond)
                 if valid_wells:
-                    subset = self.df[valid_wells]
+                    subset = df[valid_wells]
                     export_df[f"{cond['name']} (Mean)"] = subset.mean(axis=1)
                     export_df[f"{cond['name']} (Std)"] = subset.std(axis=1)
             
             export_df.to_csv(path, index=False)
             QMessageBox.information(self, "Export", "Data exported successfully.")
 
+    def align_plates(self):
+        """Aligns other runs of the same layout onto a common time grid with the current plate
+        and exports the cross-plate mean/std trace of every condition."""
+        if self.df is None or not self.conditions: return
+        paths, _ = QFileDialog.getOpenFileNames(self, "Select Plates to Align", "", "Data Files (*.csv *.xlsx *.xls *.txt)")
+        if not paths: return
+        try:
+            dfs = [self.df] + [DataParser.parse_file(p) for p in paths]
+            grid, wells, cube = TimeAligner.align(dfs)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to align plates:\n{str(e)}")
+            return
+
+        col = {w: i for i, w in enumerate(wells)}
+        export_df = pd.DataFrame({'Time': grid})
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            for cond in self.conditions:
+                idx = [col[w] for w in cond['wells'] if w in col and w not in self.qc_excluded()]
+                if not idx: continue
+                # Replicate mean per plate, then mean/std across plates
+                per_plate = np.nanmean(cube[:, :, idx], axis=2)
+                export_df[f"{cond['name']} (Mean)"] = np.nanmean(per_plate, axis=0)
+                export_df[f"{cond['name']} (Std)"] = np.nanstd(per_plate, axis=0, ddof=1)
+                export_df[f"{cond['name']} (Plates)"] = np.sum(np.isfinite(per_plate), axis=0)
+
+        path, _ = QFileDialog.getSaveFileName(self, "Export Aligned Data", "aligned_plates.csv", "CSV Files (*.csv)")
+        if path:
+            export_df.to_csv(path, index=False)
+            QMessageBox.information(self, "Export", f"Aligned {len(dfs)} plates onto {len(grid)} time points "
+                                                    f"({grid[0]:.2f}-{grid[-1]:.2f} min).")
+
     def save_figure(self):
         msg = QMessageBox()
         msg.setWindowTitle("Save Figure")
@@ -1108,6 +1510,107 @@ class HiBitApp(QMainWindow):
                 target_fig.savefig(path, dpi=300, bbox_inches='tight')
                 QMessageBox.information(self, "Saved", f"Figure saved to {path}")
 
+    def batch_report(self):
+        """Renders the kinetic, standard curve and quant figures of many plates in a background process pool."""
+        if self.df is None: return
+        if self._report is not None and not self._report[0].done():
+            QMessageBox.information(self, "Batch Report", "A report is already being generated.")
+            return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Batch Report")
+        form = QFormLayout(dlg)
+        check_workspace = QCheckBox(f"All workspace plates ({len(self.workspace.plates)})")
+        check_workspace.setChecked(True)
+        extra_files = []
+        lbl_files = QLabel("No extra files")
+        btn_files = QPushButton("Add Files...")
+
+        def add_files():
+            paths, _ = QFileDialog.getOpenFileNames(dlg, "Add Plates", "", "Data Files (*.csv *.xlsx *.xls *.txt)")
+            extra_files.extend(paths)
+            lbl_files.setText(f"{len(extra_files)} extra files (current layout)")
+
+        btn_files.clicked.connect(add_files)
+        combo_fmt = QComboBox()
+        combo_fmt.addItem("PDF (one file)", 'pdf')
+        combo_fmt.addItem("PNG files", 'png')
+        combo_fmt.addItem("SVG files", 'svg')
+        checks = {kind: QCheckBox(label) for kind, label in
+                  zip(FIGURES, ["Kinetic Trace", "Standard Curve", "Concentrations"])}
+        spin_workers = QSpinBox()
+        spin_workers.setRange(1, os.cpu_count() or 1)
+        spin_workers.setValue(os.cpu_count() or 1)
+
+        form.addRow(check_workspace)
+        form.addRow(btn_files, lbl_files)
+        form.addRow("Format:", combo_fmt)
+        for check in checks.values():
+            check.setChecked(True)
+            form.addRow(check)
+        form.addRow("Worker Processes:", spin_workers)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dlg.accept)
+        buttons.rejected.connect(dlg.reject)
+        form.addRow(buttons)
+        if dlg.exec() != QDialog.Accepted: return
+
+        figures = [kind for kind, check in checks.items() if check.isChecked()]
+        fmt = combo_fmt.currentData()
+        if fmt == 'pdf':
+            out, _ = QFileDialog.getSaveFileName(self, "Save Report", "report.pdf", "PDF (*.pdf)")
+        else:
+            out = QFileDialog.getExistingDirectory(self, "Report Folder")
+        if not out or not figures: return
+
+        try:
+            curve = self.current_curve()
+        except ValueError:
+            curve = None
+        settings = dict(background=self.bg_mode, qc_settings={k: v for k, v in self.qc_settings.items() if k != 'exclude'},
+                        exclude_flagged=self.qc_settings['exclude'], fit_model=self.combo_fit_model.currentText(),
+                        stock=self.check_stock.isChecked(), curve=curve, feature=self.signal, smoothing=self.smoothing)
+        jobs = []
+        if check_workspace.isChecked():
+            for pid, name in self.workspace.names():
+                rec = self.workspace.plates[pid]
+                conditions = self.conditions if pid == self.workspace.active else rec['conditions']
+                # Workers re-read plates from disk when possible so evicted plates are not reloaded here
+                if rec['path'] and os.path.exists(rec['path']):
+                    jobs.append(plate_job(name, path=rec['path'], conditions=conditions, **settings))
+                else:
+                    jobs.append(plate_job(name, df=self.workspace.get_df(pid), conditions=conditions, **settings))
+        jobs += [plate_job(os.path.basename(p), path=p, conditions=self.conditions, **settings) for p in extra_files]
+        if not jobs: return
+
+        progress = [0, len(jobs)]
+        def on_progress(done, total):
+            progress[0] = done
+        self._stop_report = False
+        future = self._report_pool.submit(generate_report, jobs, out, fmt=fmt, figures=figures,
+                                          workers=spin_workers.value(), progress=on_progress,
+                                          stop=lambda: self._stop_report)
+        self._report = (future, progress)
+        self.poll_report()
+
+    def poll_report(self):
+        """Shows batch report progress in the status bar until the report finishes."""
+        future, progress = self._report
+        if not future.done():
+            self.statusBar().showMessage(f"Generating report: {progress[0]}/{progress[1]} plates")
+            QTimer.singleShot(250, self.poll_report)
+            return
+        self.statusBar().clearMessage()
+        try:
+            result = future.result()
+        except Exception as e:
+            QMessageBox.critical(self, "Report Error", f"Failed to generate report:\n{str(e)}")
+            return
+        msg = f"Wrote {len(result['files'])} file(s) for {progress[1] - len(result['errors'])} plate(s)."
+        if result['errors']:
+            msg += "\n\nFailed plates:\n" + "\n".join(f"{k}: {v}" for k, v in result['errors'].items())
+        QMessageBox.information(self, "Batch Report", msg)
+
     # --- Page 4: Quantification ---
     def setup_quant_page(self):
         page = QWidget()
@@ -1122,22 +1625,53 @@ class HiBitApp(QMainWindow):
         h_layout.addWidget(self.combo_curve)
         
         h_layout.addSpacing(20)
-        h_layout.addWidget(QLabel("Equation: y = mx + b"))
+        h_layout.addWidget(QLabel("Model:"))
+        self.combo_model = QComboBox()
+        self.combo_model.addItems(CURVE_MODELS)
+        self.combo_model.currentTextChanged.connect(self.on_curve_model_change)
+        h_layout.addWidget(self.combo_model)
+
+        self.lbl_equation = QLabel(f"Equation: {CURVE_EQUATIONS['Linear']}")
+        h_layout.addWidget(self.lbl_equation)
         
         self.input_m = QLineEdit()
         self.input_m.setPlaceholderText("Slope (m)")
         self.input_b = QLineEdit()
         self.input_b.setPlaceholderText("Intercept (b)")
         
-        h_layout.addWidget(QLabel("m:"))
+        self.lbl_m = QLabel("m:")
+        self.lbl_b = QLabel("b:")
+        h_layout.addWidget(self.lbl_m)
         h_layout.addWidget(self.input_m)
-        h_layout.addWidget(QLabel("b:"))
+        h_layout.addWidget(self.lbl_b)
         h_layout.addWidget(self.input_b)
+
+        # Logistic models take their parameters as one comma separated list
+        self.input_params = QLineEdit()
+        self.input_params.setPlaceholderText("Bottom, Top, EC50, Hill")
+        self.input_params.setVisible(False)
+        h_layout.addWidget(self.input_params)
         
         btn_calc = QPushButton("Recalculate")
-        btn_calc.clicked.connect(lambda: (self.update_quant_table(), self.update_quant_plot()))
+        btn_calc.clicked.connect(lambda: self.schedule_redraw('quant_table', 'quant_plot', force=True))
         h_layout.addWidget(btn_calc)
 
+        btn_compare = QPushButton("Compare Curves")
+        btn_compare.clicked.connect(self.show_curve_comparison)
+        h_layout.addWidget(btn_compare)
+
+        btn_drift = QPushButton("Curve Drift")
+        btn_drift.clicked.connect(self.show_curve_drift)
+        h_layout.addWidget(btn_drift)
+
+        btn_metrics = QPushButton("Assay Metrics")
+        btn_metrics.clicked.connect(self.show_assay_metrics)
+        h_layout.addWidget(btn_metrics)
+
+        btn_hits = QPushButton("Top Hits")
+        btn_hits.clicked.connect(self.show_top_hits)
+        h_layout.addWidget(btn_hits)
+
         # Added Export Button here
         btn_export_quant = QPushButton("Export Quant Data")
         btn_export_quant.clicked.connect(self.export_quant_data)
@@ -1145,26 +1679,114 @@ class HiBitApp(QMainWindow):
 
         self.check_alerts = QCheckBox("Show Range Alerts")
         self.check_alerts.setChecked(True)
-        self.check_alerts.stateChanged.connect(self.update_quant_plot)
+        self.check_alerts.stateChanged.connect(lambda: self.schedule_redraw('quant_plot'))
         h_layout.addWidget(self.check_alerts)
 
         # Added Stock Conc Toggle
         self.check_stock = QCheckBox("Plot Stock Conc")
-        self.check_stock.stateChanged.connect(self.update_quant_plot)
+        self.check_stock.stateChanged.connect(lambda: self.schedule_redraw('quant_plot'))
         h_layout.addWidget(self.check_stock)
 
         h_layout.addStretch()
         
         layout.addLayout(h_layout)
 
+        # Bootstrap uncertainty settings
+        b_layout = QHBoxLayout()
+        self.check_bootstrap = QCheckBox("Bootstrap CI")
+        self.check_bootstrap.setChecked(True)
+        self.check_bootstrap.stateChanged.connect(lambda: self.schedule_redraw('quant_table', 'quant_plot'))
+        b_layout.addWidget(self.check_bootstrap)
+
+        b_layout.addWidget(QLabel("Iterations:"))
+        self.spin_boot_iter = QSpinBox()
+        self.spin_boot_iter.setRange(100, 100000)
+        self.spin_boot_iter.setSingleStep(500)
+        self.spin_boot_iter.setValue(2000)
+        b_layout.addWidget(self.spin_boot_iter)
+
+        b_layout.addWidget(QLabel("Seed:"))
+        self.spin_boot_seed = QSpinBox()
+        self.spin_boot_seed.setRange(0, 2**31 - 1)
+        self.spin_boot_seed.setValue(0)
+        b_layout.addWidget(self.spin_boot_seed)
+
+        b_layout.addWidget(QLabel("CI (%):"))
+        self.spin_boot_level = QSpinBox()
+        self.spin_boot_level.setRange(50, 99)
+        self.spin_boot_level.setValue(95)
+        b_layout.addWidget(self.spin_boot_level)
+        b_layout.addSpacing(20)
+        self.check_quant_overlay = QCheckBox("Overlay Plates")
+        self.check_quant_overlay.stateChanged.connect(lambda: self.schedule_redraw('quant_plot'))
+        b_layout.addWidget(self.check_quant_overlay)
+        self.check_normalize = QCheckBox("Normalize to Calibrators")
+        self.check_normalize.setToolTip("Scale each plate's signal so its reference calibrators read their concentration on the curve")
+        self.check_normalize.stateChanged.connect(self.on_normalize_change)
+        b_layout.addWidget(self.check_normalize)
+        self.label_scale = QLabel("")
+        b_layout.addWidget(self.label_scale)
+        b_layout.addStretch()
+        self.check_record = QCheckBox("Record Runs")
+        self.check_record.setToolTip(f"Save every quantification shown to {ResultsDatabase.DEFAULT_PATH} (each curve or setting change is a new run)")
+        self.check_record.setChecked(False)
+        b_layout.addWidget(self.check_record)
+        btn_db = QPushButton("Results DB")
+        btn_db.clicked.connect(self.show_results_db)
+        b_layout.addWidget(btn_db)
+
+        layout.addLayout(b_layout)
+
         splitter = QSplitter(Qt.Horizontal)
 
         # Table
         self.quant_table = QTableWidget()
-        self.quant_table.setColumnCount(6)
-        self.quant_table.setHorizontalHeaderLabels(["Condition", "Avg Peak RLU", "Concentration (µg/mL)", "Std Dev", "Dilution", "Stock Conc (µg/mL)"])
+        self.quant_table.setColumnCount(8)
+        self.quant_table.setHorizontalHeaderLabels(["Condition", "Avg Peak RLU", "Concentration (µg/mL)", "Std Dev", "Dilution", "Stock Conc (µg/mL)", "CI Low (µg/mL)", "CI High (µg/mL)"])
         self.quant_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        splitter.addWidget(self.quant_table)
+
+        # Dilution series: one stock concentration per sample name
+        samples_page = QWidget()
+        s_layout = QVBoxLayout(samples_page)
+        s_controls = QHBoxLayout()
+        s_controls.addWidget(QLabel("Dilution Series:"))
+        self.combo_series_mode = QComboBox()
+        self.combo_series_mode.addItem("Best In-Range Dilution", "best")
+        self.combo_series_mode.addItem("Average In-Range Dilutions", "average")
+        self.combo_series_mode.currentIndexChanged.connect(lambda: self.schedule_redraw('quant_table'))
+        s_controls.addWidget(self.combo_series_mode)
+        s_controls.addStretch()
+        s_layout.addLayout(s_controls)
+
+        self.sample_table = QTableWidget()
+        self.sample_table.setColumnCount(7)
+        self.sample_table.setHorizontalHeaderLabels(["Sample", "Dilutions", "In Range", "Selected Dilution", "Stock Conc (µg/mL)", "Stock Std Dev", "Status"])
+        self.sample_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        s_layout.addWidget(self.sample_table)
+
+        # Per-well drill-down of the condition rows
+        wells_page = QWidget()
+        w_layout = QVBoxLayout(wells_page)
+        w_controls = QHBoxLayout()
+        w_controls.addWidget(QLabel("Condition:"))
+        self.combo_well_filter = QComboBox()
+        self.combo_well_filter.currentIndexChanged.connect(self.fill_well_table)
+        w_controls.addWidget(self.combo_well_filter)
+        w_controls.addStretch()
+        w_layout.addLayout(w_controls)
+
+        self.well_table = QTableWidget()
+        self.well_table.setColumnCount(8)
+        self.well_table.setHorizontalHeaderLabels(["Well", "Condition", "Dilution", "Peak RLU", "Concentration (µg/mL)", "Stock Conc (µg/mL)", "In Range", "QC Flag"])
+        self.well_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        w_layout.addWidget(self.well_table)
+        self.quant_table.cellDoubleClicked.connect(self.drill_down)
+
+        self.quant_tabs = QTabWidget()
+        self.quant_tabs.addTab(self.quant_table, "Conditions")
+        self.quant_tabs.addTab(samples_page, "Samples")
+        self.quant_tabs.addTab(wells_page, "Wells")
+        splitter.addWidget(self.quant_tabs)
 
         # Bar Plot
         self.fig_quant = Figure(figsize=(5, 4), dpi=100)
@@ -1182,136 +1804,679 @@ class HiBitApp(QMainWindow):
         
         self.stack.addWidget(page)
 
-    def load_standard_curves(self):
+    def load_standard_curves(self, select=None):
+        library = CurveLibrary()
+        if not library.exists():
+            QMessageBox.warning(self, "Standard Curves", f"Standard curve library not found:\n{library.path}\n\nOnly custom curves are available.")
+            curves = {}
+        else:
+            try:
+                curves = library.load()
+            except Exception as e:
+                QMessageBox.warning(self, "Standard Curves", f"Error loading standard curves from {library.path}:\n{str(e)}")
+                curves = {}
+        self.curve_library = library
+
+        self.combo_curve.blockSignals(True)
+        self.combo_curve.clear()
+        self.standard_curves = dict(curves)
+        self.combo_curve.addItems(list(curves))
+        self.combo_curve.addItem("Custom", None)
+        if select in curves:
+            self.combo_curve.setCurrentText(select)
+        self.combo_curve.blockSignals(False)
+        self.on_std_curve_change(self.combo_curve.currentIndex())
+
+    def save_curve_to_library(self):
+        """Saves the current dose plot fit into the curve library as a new version."""
+        if not self.dose_fit:
+            QMessageBox.warning(self, "No Fit", "Fit a standard curve on the dose plot first.")
+            return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Save Curve to Library")
+        form = QFormLayout(dlg)
+        combo_name = QComboBox()
+        combo_name.setEditable(True)
+        combo_name.addItems(list(self.standard_curves))
+        combo_name.setCurrentText("")
+        concs = [c['conc'] for c in self.conditions if c['conc'] is not None]
+        input_low = QLineEdit(f"{min(concs):g}" if concs else "")
+        input_high = QLineEdit(f"{max(concs):g}" if concs else "")
+        input_notes = QLineEdit()
+        form.addRow("Name:", combo_name)
+        form.addRow("Model:", QLabel(f"{self.dose_fit['Model']} (R² = {self.dose_fit['r^2']:.4f})"))
+        form.addRow("Low (µg/mL):", input_low)
+        form.addRow("High (µg/mL):", input_high)
+        form.addRow("Notes:", input_notes)
+        buttons = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dlg.accept)
+        buttons.rejected.connect(dlg.reject)
+        form.addRow(buttons)
+        if dlg.exec() != QDialog.Accepted: return
+
+        name = combo_name.currentText().strip()
+        if not name or name == "Custom":
+            QMessageBox.warning(self, "Input Error", "Please provide a curve name.")
+            return
         try:
-            if os.path.exists("resources/HiBit_quant_standard_curve.csv"):
-                df_curves = pd.read_csv("resources/HiBit_quant_standard_curve.csv")
-                self.combo_curve.clear()
-                self.standard_curves = {}
-                
-                for _, row in df_curves[::-1].iterrows():
-                    name = str(row['Name'])
-                    self.standard_curves[name] = row.to_dict()
-                    self.combo_curve.addItem(name)
-                
-                self.combo_curve.addItem("Custom", None)
-        except Exception as e:
-            print(f"Error loading standard curves: {e}")
+            low = float(input_low.text()) if input_low.text().strip() else np.nan
+            high = float(input_high.text()) if input_high.text().strip() else np.nan
+        except ValueError:
+            QMessageBox.warning(self, "Input Error", "Low and High must be numbers.")
+            return
+
+        curve = dict(self.dose_fit, Name=name, Low=low, High=high, Notes=input_notes.text().strip())
+        try:
+            version = self.curve_library.save_curve(curve)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Failed to save curve:\n{str(e)}")
+            return
+        self.load_standard_curves(select=name)
+        QMessageBox.information(self, "Saved", f"Saved '{name}' as version {version} in\n{self.curve_library.path}")
+
+    def show_curve_drift(self):
+        """Charts how a curve's parameters changed across its saved calibrations."""
+        history = self.curve_library.history() if self.curve_library.exists() else pd.DataFrame()
+        if history.empty:
+            QMessageBox.information(self, "Curve Drift", "No curve history recorded yet.")
+            return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Standard Curve Drift")
+        dlg.resize(900, 650)
+        d_layout = QVBoxLayout(dlg)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Curve:"))
+        combo = QComboBox()
+        combo.addItems(list(dict.fromkeys(history['Name'])))
+        if self.combo_curve.currentText() in self.standard_curves:
+            combo.setCurrentText(self.combo_curve.currentText())
+        controls.addWidget(combo)
+        controls.addWidget(QLabel("Recalibration Tolerance (%):"))
+        spin_tol = QSpinBox()
+        spin_tol.setRange(1, 100)
+        spin_tol.setValue(10)
+        controls.addWidget(spin_tol)
+        controls.addStretch()
+        d_layout.addLayout(controls)
+
+        fig = Figure(figsize=(6, 4), dpi=100)
+        canvas = FigureCanvas(fig)
+        d_layout.addWidget(canvas)
+        lbl_status = QLabel()
+        d_layout.addWidget(lbl_status)
+        table = QTableWidget()
+        table.verticalHeader().setVisible(False)
+        d_layout.addWidget(table)
+
+        def redraw():
+            drift, params = self.curve_library.drift(combo.currentText())
+            tol = spin_tol.value()
+            fig.clear()
+            ax = fig.add_subplot(111)
+            for p in params:
+                ax.plot(drift['Version'], drift[f"{p} Change (%)"], '-o', label=p)
+            ax.axhspan(-tol, tol, color='#16a34a', alpha=0.1, label=f"±{tol}% tolerance")
+            ax.axhline(0, color='black', linewidth=0.8)
+            ax.set_xlabel("Calibration Version")
+            ax.set_ylabel("Change from Version 1 (%)")
+            ax.set_title(f"Parameter Drift: {combo.currentText()}")
+            ax.set_xticks(drift['Version'])
+            ax.grid(True, linestyle='--', alpha=0.5)
+            ax.legend()
+            fig.tight_layout()
+            canvas.draw()
+
+            latest = drift.iloc[-1]
+            drifted = [p for p in params if abs(latest[f"{p} Change (%)"]) > tol]
+            if drifted:
+                lbl_status.setText(f"Recalibration recommended: {', '.join(drifted)} drifted more than {tol}% since version 1.")
+                lbl_status.setStyleSheet("color: #dc2626; font-weight: bold;")
+            else:
+                lbl_status.setText(f"All parameters within ±{tol}% of version 1.")
+                lbl_status.setStyleSheet("color: #16a34a;")
+
+            table.setColumnCount(len(drift.columns))
+            table.setHorizontalHeaderLabels(list(drift.columns))
+            table.setRowCount(len(drift))
+            for r, rec in enumerate(drift.itertuples(index=False)):
+                for c, val in enumerate(rec):
+                    table.setItem(r, c, QTableWidgetItem(f"{val:.4g}" if isinstance(val, float) else str(val)))
+            table.resizeColumnsToContents()
+
+        combo.currentIndexChanged.connect(redraw)
+        spin_tol.valueChanged.connect(redraw)
+        redraw()
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(dlg.reject)
+        d_layout.addWidget(buttons)
+        dlg.exec()
+
+    def show_assay_metrics(self):
+        """Z'-factor, S/B, replicate CVs and agreement of every workspace plate, checked against thresholds."""
+        if self.df is None or not self.workspace.plates: return
+        dfs, layouts, names = [], [], []
+        for pid, name in self.workspace.names():
+            active = pid == self.workspace.active
+            dfs.append(self.df if active else self.workspace.get_df(pid))
+            layouts.append(self.conditions if active else self.workspace.get_conditions(pid))
+            names.append(name)
+        settings = {k: v for k, v in self.qc_settings.items() if k != 'exclude'}
+        try:
+            summary, conditions = assay_metrics(dfs, layouts, names, feature=self.signal, smoothing=self.smoothing,
+                                                qc_settings=settings, exclude_flagged=self.qc_settings['exclude'])
+        except ValueError as e:
+            QMessageBox.warning(self, "Assay Metrics", str(e))
+            return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Assay Metrics")
+        dlg.resize(1000, 500)
+        d_layout = QVBoxLayout(dlg)
+        d_layout.addWidget(QLabel(f"{FEATURES[self.signal]} of the raw wells that pass QC. Positive controls: calibrators or "
+                                  "names starting with 'Pos'; negative controls: blanks or names starting with 'Neg'."))
+        controls = QHBoxLayout()
+        spins = {}
+        for metric, (limit, higher) in THRESHOLDS.items():
+            controls.addWidget(QLabel(f"{METRICS[metric]} {'≥' if higher else '≤'}"))
+            spin = QDoubleSpinBox()
+            spin.setRange(-10.0, 1000.0)
+            spin.setDecimals(2)
+            spin.setSingleStep(0.05 if abs(limit) < 5 else 1.0)
+            spin.setValue(limit)
+            controls.addWidget(spin)
+            spins[metric] = spin
+        controls.addStretch()
+        d_layout.addLayout(controls)
+        lbl_status = QLabel()
+        d_layout.addWidget(lbl_status)
+
+        columns = ['plate', 'n_wells', *METRICS, 'pos_mean', 'neg_mean', 'flags']
+        headers = ["Plate", "Wells", *METRICS.values(), "Positive Mean", "Negative Mean", "Failed Checks"]
+        table = QTableWidget(len(summary), len(columns))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        d_layout.addWidget(table)
+        flagged = {}
+
+        def refresh():
+            flagged['summary'] = res = AssayMetrics.flag(summary, {m: spin.value() for m, spin in spins.items()})
+            for r in range(len(res)):
+                for c, col in enumerate(columns):
+                    val = res[col].iloc[r]
+                    item = QTableWidgetItem(f"{val:.4g}" if isinstance(val, float) else str(val))
+                    if col in THRESHOLDS and np.isfinite(val):
+                        limit, higher = spins[col].value(), THRESHOLDS[col][1]
+                        if (val < limit) if higher else (val > limit):
+                            item.setForeground(QColor("#dc2626"))
+                    if c == 0 and not res['pass'].iloc[r]:
+                        item.setBackground(QColor("#fee2e2"))
+                    table.setItem(r, c, item)
+            table.resizeColumnsToContents()
+            n_fail = int((~res['pass']).sum())
+            lbl_status.setText(f"{n_fail} of {len(summary)} plate(s) fail the thresholds." if n_fail
+                               else f"All {len(summary)} plate(s) pass.")
+            lbl_status.setStyleSheet("color: #dc2626; font-weight: bold;" if n_fail else "color: #16a34a;")
+
+        def export():
+            path, _ = QFileDialog.getSaveFileName(dlg, "Export Assay Metrics", "assay_metrics.csv", "CSV (*.csv)")
+            if path:
+                flagged['summary'].to_csv(path, index=False)
+                cond_path = os.path.splitext(path)[0] + "_conditions.csv"
+                conditions.to_csv(cond_path, index=False)
+                QMessageBox.information(dlg, "Export", f"Assay metrics exported; per-condition CVs saved to "
+                                                       f"{os.path.basename(cond_path)}.")
+
+        for spin in spins.values():
+            spin.valueChanged.connect(refresh)
+        refresh()
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.addButton("Export", QDialogButtonBox.ActionRole).clicked.connect(export)
+        buttons.rejected.connect(dlg.reject)
+        d_layout.addWidget(buttons)
+        dlg.exec()
+
+    def show_top_hits(self):
+        """Ranks the highest concentrations across all workspace plates; double-click a hit to show its wells."""
+        if self.df is None or not self.workspace.plates: return
+        try:
+            curve = self.current_curve()
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Input", "Please enter valid numeric values for the curve parameters.")
+            return
+        pids, dfs, layouts, names = [], [], [], []
+        for pid, name in self.workspace.names():
+            active = pid == self.workspace.active
+            pids.append(pid)
+            dfs.append(self.df if active else self.workspace.get_df(pid))
+            layouts.append(self.conditions if active else self.workspace.get_conditions(pid))
+            names.append(name)
+        settings = {k: v for k, v in self.qc_settings.items() if k != 'exclude'}
+        try:
+            results = quantify_batch(dfs, layouts, curve, normalize=self.check_normalize.isChecked(), names=names,
+                                     background=self.bg_mode, qc_settings=settings,
+                                     exclude_flagged=self.qc_settings['exclude'], feature=self.signal,
+                                     smoothing=self.smoothing)
+        except ValueError as e:
+            QMessageBox.warning(self, "Top Hits", str(e))
+            return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Top Hits")
+        dlg.resize(1000, 600)
+        d_layout = QVBoxLayout(dlg)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Top:"))
+        spin_k = QSpinBox()
+        spin_k.setRange(1, 10000)
+        spin_k.setValue(50)
+        controls.addWidget(spin_k)
+        combo_level = QComboBox()
+        for key, label in RANK_LEVELS.items():
+            combo_level.addItem(label, key)
+        controls.addWidget(combo_level)
+        controls.addWidget(QLabel("By:"))
+        combo_value = QComboBox()
+        for key, label in RANK_VALUES.items():
+            combo_value.addItem(label, key)
+        controls.addWidget(combo_value)
+        check_range = QCheckBox("In Range Only")
+        controls.addWidget(check_range)
+        check_qc = QCheckBox("QC Pass Only")
+        controls.addWidget(check_qc)
+        controls.addWidget(QLabel("Min Replicates:"))
+        spin_reps = QSpinBox()
+        spin_reps.setRange(1, 96)
+        controls.addWidget(spin_reps)
+        controls.addStretch()
+        d_layout.addLayout(controls)
+        lbl_status = QLabel()
+        d_layout.addWidget(lbl_status)
+        table = QTableWidget()
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        d_layout.addWidget(table)
+        ranked = {}
+
+        def rank():
+            ranker = HitRanker(spin_k.value(), combo_level.currentData(), combo_value.currentData(),
+                               check_range.isChecked(), check_qc.isChecked(), spin_reps.value())
+            for name, result in zip(names, results):
+                ranker.add(name, result)
+            ranked['df'] = hits = ranker.ranked()
+            table.setColumnCount(len(hits.columns))
+            table.setHorizontalHeaderLabels(list(hits.columns))
+            table.setRowCount(len(hits))
+            for r, rec in enumerate(hits.itertuples(index=False)):
+                for c, val in enumerate(rec):
+                    table.setItem(r, c, QTableWidgetItem(f"{val:.4g}" if isinstance(val, float) else str(val)))
+            table.resizeColumnsToContents()
+            lbl_status.setText(f"{len(hits)} of {ranker.n_candidates} {combo_level.currentText().lower()} passing the "
+                               f"filters across {ranker.n_plates} plate(s). Double-click a hit to show its wells.")
+
+        def show_hit(row, column):
+            hit = ranked['df'].iloc[row]
+            wells = [hit['well']] if 'well' in hit else hit['wells'].split(', ')
+            self.switch_plate(pids[names.index(hit['plate'])])
+            self.btn_nav_map.click()
+            self.plate_widget.set_selection(wells)
+            dlg.accept()
+
+        def export():
+            path, _ = QFileDialog.getSaveFileName(dlg, "Export Top Hits", "top_hits.csv", "CSV (*.csv)")
+            if path:
+                ranked['df'].to_csv(path, index=False)
+                QMessageBox.information(dlg, "Export", "Top hits exported successfully.")
+
+        for w in [spin_k, spin_reps]:
+            w.valueChanged.connect(rank)
+        for w in [combo_level, combo_value]:
+            w.currentIndexChanged.connect(rank)
+        for w in [check_range, check_qc]:
+            w.stateChanged.connect(rank)
+        table.cellDoubleClicked.connect(show_hit)
+        rank()
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.addButton("Export", QDialogButtonBox.ActionRole).clicked.connect(export)
+        buttons.rejected.connect(dlg.reject)
+        d_layout.addWidget(buttons)
+        dlg.exec()
 
     def on_std_curve_change(self, index):
         name = self.combo_curve.currentText()
         if name in self.standard_curves:
             data = self.standard_curves[name]
+            model = CURVE_MODELS[QuantEngine.model_code(data.get('Model', 'Linear'))]
+            self.combo_model.blockSignals(True)
+            self.combo_model.setCurrentText(model)
+            self.combo_model.blockSignals(False)
+            self.on_curve_model_change(model)
             self.input_m.setText(str(data['m']))
             self.input_b.setText(str(data['b']))
+            n_params = 4 if model == '4PL' else 5
+            self.input_params.setText(", ".join(str(data.get(p, '')) for p in CURVE_PARAMS[:n_params]))
             # Trigger update
-            self.update_quant_table()
-            self.update_quant_plot()
+            self.schedule_redraw('quant_table', 'quant_plot')
+
+    def on_curve_model_change(self, model):
+        """Shows the inputs that belong to the selected curve model."""
+        linear_type = model in ('Linear', 'Log-Log')
+        for w in [self.lbl_m, self.input_m, self.lbl_b, self.input_b]:
+            w.setVisible(linear_type)
+        self.input_params.setVisible(not linear_type)
+        self.input_params.setPlaceholderText(", ".join(CURVE_PARAMS[:4 if model == '4PL' else 5]))
+        self.lbl_equation.setText(f"Equation: {CURVE_EQUATIONS[model]}")
+
+    def current_curve(self):
+        """Builds the curve used for quantification from the selected library entry and the equation inputs.
+
+        Raises ValueError if the inputs are not numeric.
+        """
+        name = self.combo_curve.currentText()
+        curve = dict(self.standard_curves.get(name, self.custom_curve_se if name == "Custom" else {}))
+        model = self.combo_model.currentText()
+        curve['Model'] = model
+        if model in ('Linear', 'Log-Log'):
+            curve['m'] = float(self.input_m.text())
+            curve['b'] = float(self.input_b.text())
+        else:
+            values = [float(v) for v in self.input_params.text().split(',') if v.strip()]
+            n_params = 4 if model == '4PL' else 5
+            if len(values) != n_params:
+                raise ValueError(f"{model} needs {n_params} parameters.")
+            curve.update(dict(zip(CURVE_PARAMS, values)))
+        return curve
+
+    def on_normalize_change(self):
+        if self.check_normalize.isChecked() and not CalibrationEngine.calibrators(self.conditions):
+            QMessageBox.warning(self, "No Calibrators",
+                                "Mark a condition with a known concentration as a reference calibrator first.")
+            self.check_normalize.setChecked(False)
+            return
+        self.schedule_redraw('quant_table', 'quant_plot')
 
     def update_quant_table(self):
         if self.df is None: return
+        key = self.quant_state() + (self.check_record.isChecked(),)
+        if self.view_is_current('quant_table', key): return
         
         try:
-            m = float(self.input_m.text())
-            b = float(self.input_b.text())
+            curve = self.current_curve()
         except ValueError:
-            QMessageBox.warning(self, "Invalid Input", "Please enter valid numeric values for m and b.")
+            QMessageBox.warning(self, "Invalid Input", "Please enter valid numeric values for the curve parameters.")
             return
+        result = self.quant_result(curve)
+        is_flat = not result.valid
+        has_ci = self.check_bootstrap.isChecked() and not is_flat
+        self.quant_table.horizontalHeaderItem(1).setText(f"Avg {FEATURES[result.feature]}")
+        self.label_scale.setText(f"Scale ×{result.scale:.4g}" if self.check_normalize.isChecked() else "")
 
         self.quant_table.setRowCount(0)
-        
-        for cond in self.conditions:
-            valid_wells = [w for w in cond['wells'] if w in self.df.columns]
-            if not valid_wells: continue
-            
-            max_vals = self.df[valid_wells].max(axis=0)
-            mean_max = max_vals.mean()
-            std_max = max_vals.std()
-            
-            if m != 0:
-                calc_conc = (mean_max - b) / m
-                # Propagate error: std(Conc) = std(RLU) / m
-                std_conc = std_max / abs(m)
-                
-                dil = cond.get('dilution', 1.0)
-                stock_conc = calc_conc * dil
-                
-                conc_str = f"{calc_conc:.4f}"
-                std_str = f"{std_conc:.4f}"
-                dil_str = f"{dil}"
-                stock_str = f"{stock_conc:.4f}"
+        for rec in result.conditions.itertuples(index=False):
+            if not is_flat:
+                conc_str = f"{rec.conc:.4f}"
+                std_str = f"{rec.std:.4f}"
+                dil_str = f"{rec.dilution}"
+                stock_str = f"{rec.stock_conc:.4f}"
+                ci_low_str = f"{rec.ci_low:.4f}" if has_ci else "-"
+                ci_high_str = f"{rec.ci_high:.4f}" if has_ci else "-"
             else:
                 conc_str = "Error (m=0)"
                 std_str = "-"
                 dil_str = "-"
                 stock_str = "-"
+                ci_low_str = ci_high_str = "-"
             
             row = self.quant_table.rowCount()
             self.quant_table.insertRow(row)
-            self.quant_table.setItem(row, 0, QTableWidgetItem(cond['name']))
-            self.quant_table.setItem(row, 1, QTableWidgetItem(f"{mean_max:.2f}"))
+            self.quant_table.setItem(row, 0, QTableWidgetItem(rec.sample))
+            self.quant_table.setItem(row, 1, QTableWidgetItem(f"{rec.mean_rlu:.2f}"))
             self.quant_table.setItem(row, 2, QTableWidgetItem(conc_str))
             self.quant_table.setItem(row, 3, QTableWidgetItem(std_str))
             self.quant_table.setItem(row, 4, QTableWidgetItem(dil_str))
             self.quant_table.setItem(row, 5, QTableWidgetItem(stock_str))
+            self.quant_table.setItem(row, 6, QTableWidgetItem(ci_low_str))
+            self.quant_table.setItem(row, 7, QTableWidgetItem(ci_high_str))
+
+        self.update_sample_table(result)
+        self.update_well_table(result)
+
+        self.mark_drawn('quant_table', key)
+        if self.check_record.isChecked() and not is_flat:
+            self.record_run(curve, result)
+
+    def record_run(self, curve, result):
+        """Persists the current quantification to the local results database."""
+        rec = self.workspace.plates.get(self.workspace.active, {})
+        path = rec.get('path')
+        if path and path not in self._hash_cache and os.path.exists(path):
+            self._hash_cache[path] = ResultsDatabase.file_hash(path)
+        run_date = (datetime.fromtimestamp(os.path.getmtime(path)) if path and os.path.exists(path) else datetime.now())
+        params = {k: v for k, v in curve.items() if k in ['m', 'b'] + CURVE_PARAMS}
+        if result.feature != 'peak': # Raw peak runs keep their original run keys
+            params.update(signal=result.feature, smoothing=self.smoothing)
+        if result.scale != 1.0:
+            params['scale'] = result.scale
+        try:
+            if self.results_db is None:
+                self.results_db = ResultsDatabase()
+            self.results_db.record_run({
+                'plate_id': os.path.splitext(rec.get('name', 'plate'))[0],
+                'file_name': rec.get('name'),
+                'file_hash': self._hash_cache.get(path),
+                'curve': self.combo_curve.currentText(),
+                'model': curve['Model'],
+                'params': params,
+                'run_date': run_date.isoformat(timespec='seconds'),
+            }, result.conditions.assign(in_range=result.conditions['in_range'].astype(int)), result.wells)
+        except (sqlite3.Error, OSError) as e:
+            self.check_record.setChecked(False) # Warn once rather than on every redraw
+            QMessageBox.warning(self, "Database Error", f"Could not record the run, so recording was turned off:\n{str(e)}")
+
+    def show_results_db(self):
+        """Browse and filter recorded runs across experiments."""
+        try:
+            if self.results_db is None:
+                self.results_db = ResultsDatabase()
+        except (sqlite3.Error, OSError) as e:
+            QMessageBox.critical(self, "Database Error", f"Could not open results database:\n{str(e)}")
+            return
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Results Database")
+        dlg.resize(1000, 600)
+        d_layout = QVBoxLayout(dlg)
+        d_layout.addWidget(QLabel(f"Database: {self.results_db.path}"))
+
+        filters = QHBoxLayout()
+        inputs = {}
+        for key, label, hint in [('sample', "Sample:", "name or pattern with %"), ('curve', "Curve:", "any"),
+                                 ('since', "From:", "YYYY-MM-DD"), ('until', "To:", "YYYY-MM-DD")]:
+            filters.addWidget(QLabel(label))
+            inputs[key] = QLineEdit()
+            inputs[key].setPlaceholderText(hint)
+            filters.addWidget(inputs[key])
+        check_wells = QCheckBox("Per Well")
+        filters.addWidget(check_wells)
+        btn_search = QPushButton("Search")
+        filters.addWidget(btn_search)
+        d_layout.addLayout(filters)
+
+        table = QTableWidget()
+        table.verticalHeader().setVisible(False)
+        d_layout.addWidget(table)
+        lbl_count = QLabel()
+        d_layout.addWidget(lbl_count)
+        state = {'df': pd.DataFrame()}
+
+        def search():
+            args = {k: w.text().strip() or None for k, w in inputs.items()}
+            df = self.results_db.query(wells=check_wells.isChecked(), limit=5000, **args)
+            state['df'] = df
+            table.setColumnCount(len(df.columns))
+            table.setHorizontalHeaderLabels(list(df.columns))
+            table.setRowCount(len(df))
+            for r, rec in enumerate(df.itertuples(index=False)):
+                for c, val in enumerate(rec):
+                    text = f"{val:.4f}" if isinstance(val, float) else ("" if val is None else str(val))
+                    table.setItem(r, c, QTableWidgetItem(text))
+            table.resizeColumnsToContents()
+            lbl_count.setText(f"{len(df)} results")
+
+        def export():
+            path, _ = QFileDialog.getSaveFileName(dlg, "Export Query Results", "query_results.csv", "CSV (*.csv)")
+            if path:
+                state['df'].to_csv(path, index=False)
+
+        btn_search.clicked.connect(search)
+        for w in inputs.values():
+            w.returnPressed.connect(search)
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.addButton("Export", QDialogButtonBox.ActionRole).clicked.connect(export)
+        buttons.rejected.connect(dlg.reject)
+        d_layout.addWidget(buttons)
+        search()
+        dlg.exec()
+
+    def quant_result(self, curve):
+        """Quantification of the current plate against `curve` (a hibitquant QuantResult).
+
+        The most recent results are cached on their inputs, so the table and the bar plot
+        share one run (and one bootstrap) and switching back to an earlier curve is instant.
+        With "Normalize to Calibrators" the signal is scaled to the plate's calibrator conditions.
+        """
+        boot = None
+        if self.check_bootstrap.isChecked():
+            boot = {'n_iter': self.spin_boot_iter.value(), 'seed': self.spin_boot_seed.value(),
+                    'level': self.spin_boot_level.value()}
+        excluded = self.qc_excluded()
+        series_mode = self.combo_series_mode.currentData()
+        normalize = self.check_normalize.isChecked()
+        key = (self.data_version, self.bg_mode, self.signal, self.smoothing, repr(self.conditions),
+               repr(sorted(curve.items(), key=str)), tuple(sorted(excluded)), repr(boot), series_mode,
+               None if self.qc is None else tuple(self.qc['reason']), normalize)
+        if key in self._quant_cache:
+            self._quant_cache.move_to_end(key)
+        else:
+            df = self.working_df()
+            features = self.well_features() if self.signal != 'peak' else None
+            scale = 1.0
+            if normalize:
+                try:
+                    scale = calibrator_scales([(df, self.conditions, self.qc, excluded, features)], curve,
+                                              self.signal)[0]
+                except ValueError as e:
+                    QMessageBox.warning(self, "Normalization", f"{e}\nResults are not normalized.")
+            self._quant_cache[key] = quantify(df, self.conditions, curve, exclude=excluded, qc=self.qc,
+                                              bootstrap=boot, series_mode=series_mode, feature=self.signal,
+                                              features=features, scale=scale)
+            while len(self._quant_cache) > 16:
+                self._quant_cache.popitem(last=False)
+        return self._quant_cache[key]
+
+    def update_well_table(self, result):
+        """Refreshes the Wells tab, keeping the selected condition filter."""
+        self._well_results = result
+        current = self.combo_well_filter.currentData()
+        self.combo_well_filter.blockSignals(True)
+        self.combo_well_filter.clear()
+        self.combo_well_filter.addItem("All Conditions", None)
+        for rec in result.conditions.itertuples(index=False):
+            self.combo_well_filter.addItem(f"{rec.sample} @{rec.dilution:g}", int(rec.condition))
+        self.combo_well_filter.setCurrentIndex(max(self.combo_well_filter.findData(current), 0))
+        self.combo_well_filter.blockSignals(False)
+        self.fill_well_table()
+
+    def fill_well_table(self):
+        result = self._well_results
+        self.well_table.setRowCount(0)
+        if result is None: return
+        wells = result.wells
+        cond = self.combo_well_filter.currentData()
+        if cond is not None:
+            wells = wells[wells['condition'] == cond]
+        is_flat = not result.valid
+        self.well_table.horizontalHeaderItem(3).setText(FEATURES[result.feature])
+        self.well_table.setRowCount(len(wells))
+        for row, rec in enumerate(wells.itertuples(index=False)):
+            items = [rec.well, rec.sample, f"{rec.dilution:g}", f"{rec.peak_rlu:.2f}",
+                     "-" if is_flat else f"{rec.conc:.4f}", "-" if is_flat else f"{rec.stock_conc:.4f}",
+                     "-" if is_flat else ("Yes" if rec.in_range else "No"), rec.qc_flag]
+            for col, text in enumerate(items):
+                self.well_table.setItem(row, col, QTableWidgetItem(text))
+
+    def drill_down(self, row, column):
+        """Shows the wells behind a condition row."""
+        if self._well_results is None or row >= len(self._well_results.conditions): return
+        cond = int(self._well_results.conditions['condition'].iloc[row])
+        self.combo_well_filter.setCurrentIndex(max(self.combo_well_filter.findData(cond), 0))
+        self.quant_tabs.setCurrentIndex(2)
+
+    def update_sample_table(self, result):
+        """Groups conditions into sample → dilution series and reports one stock concentration per sample."""
+        self.sample_table.setRowCount(0)
+        series = result.samples
+        if not len(series): return
+
+        self.sample_table.setRowCount(len(series))
+        for r, rec in enumerate(series.itertuples(index=False)):
+            for col, val in enumerate(rec):
+                text = f"{val:.4f}" if isinstance(val, float) else str(val)
+                item = QTableWidgetItem(text)
+                if col == 6 and val != "OK":
+                    item.setForeground(QColor("#dc2626"))
+                self.sample_table.setItem(r, col, item)
 
     def update_quant_plot(self):
         if self.df is None: return
+        overlay = self.check_quant_overlay.isChecked()
+        key = self.quant_state() + (self.check_stock.isChecked(), self.check_alerts.isChecked(), overlay,
+                                    self.workspace_state() if overlay else None)
+        if self.view_is_current('quant_plot', key): return
         try:
-            m = float(self.input_m.text())
-            b = float(self.input_b.text())
-            if m == 0: raise ValueError("m cannot be 0")
+            curve = self.current_curve()
+            if curve['Model'] == 'Linear' and curve['m'] == 0: raise ValueError("m cannot be 0")
         except ValueError:
              return # User warned in table update already
+        curves = QuantEngine.curve_arrays({'current': curve})
 
         self.ax_quant.clear()
-        
-        names = []
-        means = []
-        stds = []
-        colors = []
-        raw_means = [] # To check against limits
+
+        if self.check_quant_overlay.isChecked() and len(self.workspace.plates) > 1:
+            self.plot_quant_overlay(curve)
+            self.mark_drawn('quant_plot', key)
+            return
         
         # Get thresholds for current curve
-        curve_name = self.combo_curve.currentText()
-        low_limit = -np.inf
-        high_limit = np.inf
-        
-        if curve_name in self.standard_curves:
-            try:
-                low_limit = float(self.standard_curves[curve_name]['Low'])
-                high_limit = float(self.standard_curves[curve_name]['High'])
-            except:
-                pass 
+        low_limit = curves['low'][0]
+        high_limit = curves['high'][0]
 
         is_stock_mode = self.check_stock.isChecked()
 
-        for cond in self.conditions:
-            valid_wells = [w for w in cond['wells'] if w in self.df.columns]
-            if not valid_wells: continue
-            
-            max_rlus = self.df[valid_wells].max(axis=0)
-            # Calculated Concentration (Pre-dilution)
-            concs = (max_rlus - b) / m
-            
-            raw_mean = concs.mean()
-            raw_std = concs.std()
-            
-            names.append(cond['name'])
-            colors.append(cond['color'])
-            raw_means.append(raw_mean)
-            
-            if is_stock_mode:
-                dil = cond.get('dilution', 1.0)
-                means.append(raw_mean * dil)
-                stds.append(raw_std * dil)
-            else:
-                means.append(raw_mean)
-                stds.append(raw_std)
+        # The same per-condition rows as the table (means of the per-well concentrations)
+        cond = self.quant_result(curve).conditions
+        name_counts = pd.Series([c['name'] for c in self.conditions]).value_counts()
+        names = [f"{self.conditions[i]['name']} @{self.conditions[i].get('dilution', 1.0):g}"
+                 if name_counts[self.conditions[i]['name']] > 1 else self.conditions[i]['name'] for i in cond['condition']]
+        colors = [self.conditions[i]['color'] for i in cond['condition']]
+        raw_means = list(cond['conc']) # To check against limits
+        scale = cond['dilution'].to_numpy() if is_stock_mode else np.ones(len(cond))
+        means = list(cond['stock_conc'] if is_stock_mode else cond['conc'])
+        stds = list(cond['stock_std'] if is_stock_mode else cond['std'])
+
+        if self.check_bootstrap.isChecked():
+            lo = cond['ci_low'].to_numpy() * scale
+            hi = cond['ci_high'].to_numpy() * scale
+            mean_arr = np.array(means, dtype=float)
+            yerr = np.vstack([np.clip(mean_arr - lo, 0, None), np.clip(hi - mean_arr, 0, None)])
+            stds = list(yerr[1]) # Labels/alerts sit above the upper CI
+        else:
+            yerr = stds
 
         x_pos = np.arange(len(names))
         
-        bars = self.ax_quant.bar(x_pos, means, yerr=stds, align='center', alpha=0.7, ecolor='black', capsize=10, color=colors)
+        bars = self.ax_quant.bar(x_pos, means, yerr=yerr, align='center', alpha=0.7, ecolor='black', capsize=10, color=colors)
         
         # Labels and Titles based on Mode
         if is_stock_mode:
@@ -1366,6 +2531,140 @@ class HiBitApp(QMainWindow):
 
         self.fig_quant.tight_layout()
         self.canvas_quant.draw()
+        self.mark_drawn('quant_plot', key)
+
+    def show_curve_comparison(self):
+        """Quantifies every condition against every library curve and recommends one per condition."""
+        if self.df is None or not self.conditions: return
+        if not self.standard_curves:
+            QMessageBox.warning(self, "No Curves", "No standard curves are loaded.")
+            return
+
+        features = self.well_features() if self.signal != 'peak' else None
+        result = QuantEngine.compare_curves(self.working_df(), self.conditions, self.standard_curves, self.qc_excluded(),
+                                            self.signal, features)
+        curve_names = result['curves']['names']
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Curve Comparison")
+        dlg.resize(900, 500)
+        d_layout = QVBoxLayout(dlg)
+        d_layout.addWidget(QLabel("Concentration (µg/mL) per curve. Green cells are inside the curve's Low/High range; "
+                                  "(n/N) = replicate wells in range."))
+
+        table = QTableWidget(len(self.conditions), len(curve_names) + 2)
+        table.setHorizontalHeaderLabels(["Condition"] + curve_names + ["Recommended"])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.verticalHeader().setVisible(False)
+
+        rows = []
+        for i, cond in enumerate(self.conditions):
+            table.setItem(i, 0, QTableWidgetItem(cond['name']))
+            row_data = {'Condition': cond['name']}
+            for j, curve in enumerate(curve_names):
+                conc = result['mean_conc'][i, j]
+                text = f"{conc:.4f} ({result['wells_in_range'][i, j]}/{result['n_wells'][i, j]})"
+                item = QTableWidgetItem(text)
+                if result['in_range'][i, j]:
+                    item.setBackground(QColor("#dcfce7"))
+                else:
+                    item.setForeground(QColor("#dc2626"))
+                table.setItem(i, j + 1, item)
+                row_data[f"{curve} (µg/mL)"] = conc
+                row_data[f"{curve} In Range"] = bool(result['in_range'][i, j])
+
+            best = result['best'][i]
+            best_name = curve_names[best] if best >= 0 else "-"
+            if best >= 0 and not result['in_range'][i, best]:
+                best_name += " (none in range)"
+            item_best = QTableWidgetItem(best_name)
+            font = QFont()
+            font.setBold(True)
+            item_best.setFont(font)
+            table.setItem(i, len(curve_names) + 1, item_best)
+            row_data['Recommended'] = best_name
+            rows.append(row_data)
+
+        d_layout.addWidget(table)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        btn_use = buttons.addButton("Use Most Recommended", QDialogButtonBox.ActionRole)
+        btn_export = buttons.addButton("Export", QDialogButtonBox.ActionRole)
+        buttons.rejected.connect(dlg.reject)
+
+        def use_recommended():
+            valid = result['best'][result['best'] >= 0]
+            if len(valid) == 0: return
+            top = curve_names[np.bincount(valid).argmax()]
+            self.combo_curve.setCurrentText(top)
+            dlg.accept()
+
+        def export():
+            path, _ = QFileDialog.getSaveFileName(dlg, "Export Curve Comparison", "curve_comparison.csv", "CSV (*.csv)")
+            if path:
+                pd.DataFrame(rows).to_csv(path, index=False)
+                QMessageBox.information(dlg, "Export", "Curve comparison exported successfully.")
+
+        btn_use.clicked.connect(use_recommended)
+        btn_export.clicked.connect(export)
+        d_layout.addWidget(buttons)
+        dlg.exec()
+
+    def plot_quant_overlay(self, curve):
+        """Grouped bars: one group per condition name, one bar per workspace plate.
+
+        With "Normalize to Calibrators" the scale factors of all plates are computed together and the
+        wells of every plate are scaled and inverted in one pass; plates without a usable calibrator are
+        drawn unscaled.
+        """
+        curves = QuantEngine.curve_arrays({'current': curve})
+        is_stock_mode = self.check_stock.isChecked()
+        plates = [(self.workspace.plates[self.workspace.active]['name'], self.working_df(), self.conditions, self.qc_excluded())]
+        plates += list(self.other_plates())
+
+        names = list(dict.fromkeys(cond['name'] for cond in self.conditions))
+        width = 0.8 / len(plates)
+        x_pos = np.arange(len(names))
+        hatches = ['', '//', '..', 'xx', '\\\\', '--']
+        colors = {cond['name']: cond['color'] for cond in self.conditions}
+
+        signals = [self.condition_signal(df, conds, excluded) for _, df, conds, excluded in plates]
+        factors = np.ones(len(plates))
+        if self.check_normalize.isChecked():
+            observed = [CalibrationEngine.observed(peaks, cond_idx, conds)
+                        for (_, peaks, cond_idx), (_, _, conds, _) in zip(signals, plates)]
+            factors = CalibrationEngine.scale_factors(CalibrationEngine.pad([o[0] for o in observed]),
+                                                      CalibrationEngine.pad([o[1] for o in observed]), curve)
+        plate_idx = np.repeat(np.arange(len(plates)), [len(peaks) for _, peaks, _ in signals])
+        all_peaks = np.concatenate([peaks for _, peaks, _ in signals])
+        all_concs = QuantEngine.invert(CalibrationEngine.apply(all_peaks, plate_idx, np.nan_to_num(factors, nan=1.0)),
+                                       curves)
+        splits = np.split(all_concs, np.cumsum([len(peaks) for _, peaks, _ in signals])[:-1])
+
+        for p, (plate, df, conds, excluded) in enumerate(plates):
+            cond_idx = signals[p][2]
+            concs = splits[p]
+            if not np.isfinite(factors[p]):
+                plate += " (no calibrator)"
+            if is_stock_mode:
+                concs = concs * np.array([conds[i].get('dilution', 1.0) for i in cond_idx])
+            mean, std, counts = QuantEngine.group_stats(concs, cond_idx, len(conds))
+            # Conditions sharing a name (dilution series) are pooled per plate
+            by_name = pd.DataFrame({'name': [c['name'] for c in conds], 'mean': mean, 'std': std})
+            by_name = by_name[counts > 0].groupby('name').mean().reindex(names)
+            self.ax_quant.bar(x_pos + (p - (len(plates) - 1) / 2) * width, by_name['mean'], width,
+                              yerr=by_name['std'], color=[colors[n] for n in names], alpha=0.7,
+                              hatch=hatches[p % len(hatches)], edgecolor='black', ecolor='black', capsize=4,
+                              label=plate)
+
+        self.ax_quant.set_ylabel('Stock Concentration (µg/mL)' if is_stock_mode else 'Concentration (µg/mL)')
+        self.ax_quant.set_title('Concentrations by Plate')
+        self.ax_quant.set_xticks(x_pos)
+        self.ax_quant.set_xticklabels(names, rotation=45, ha='right')
+        self.ax_quant.yaxis.grid(True)
+        self.ax_quant.legend(fontsize=8)
+        self.fig_quant.tight_layout()
+        self.canvas_quant.draw()
 
     def export_quant_data(self):
         path, _ = QFileDialog.getSaveFileName(self, "Export Quant Results", "quant_results.csv", "CSV (*.csv)")
@@ -1381,9 +2680,370 @@ class HiBitApp(QMainWindow):
             
             df = pd.DataFrame(data)
             df.to_csv(path, index=False)
-            QMessageBox.information(self, "Export", "Quantification data exported successfully.")
+
+            msg = "Quantification data exported successfully."
+            if self.sample_table.rowCount():
+                s_headers = [self.sample_table.horizontalHeaderItem(i).text() for i in range(self.sample_table.columnCount())]
+                samples = [{h: (self.sample_table.item(r, c).text() if self.sample_table.item(r, c) else "")
+                            for c, h in enumerate(s_headers)} for r in range(self.sample_table.rowCount())]
+                sample_path = os.path.splitext(path)[0] + "_samples.csv"
+                pd.DataFrame(samples).to_csv(sample_path, index=False)
+                msg += f"\nPer-sample stock concentrations saved to {os.path.basename(sample_path)}."
+            if self._well_results is not None and len(self._well_results.wells):
+                wells = self._well_results.wells.drop(columns='condition').rename(columns={
+                    'well': "Well", 'sample': "Condition", 'dilution': "Dilution",
+                    'peak_rlu': FEATURES[self._well_results.feature], 'conc': "Concentration (µg/mL)",
+                    'stock_conc': "Stock Conc (µg/mL)", 'in_range': "In Range", 'qc_flag': "QC Flag"})
+                well_path = os.path.splitext(path)[0] + "_wells.csv"
+                wells.to_csv(well_path, index=False)
+                msg += f"\nPer-well concentrations saved to {os.path.basename(well_path)}."
+            QMessageBox.information(self, "Export", msg)
+
+    # --- Page 5: Plate Heatmap ---
+    def setup_heatmap_page(self):
+        page = QWidget()
+        layout = QVBoxLayout(page)
+
+        toolbar_layout = QHBoxLayout()
+        self.combo_heat_metric = QComboBox()
+        for key, label in HEATMAP_METRICS.items():
+            self.combo_heat_metric.addItem(label, key)
+        self.combo_heat_metric.currentIndexChanged.connect(lambda: self.schedule_redraw('heatmap'))
+        self.check_heat_log = QCheckBox("Log Scale")
+        self.check_heat_log.stateChanged.connect(lambda: self.schedule_redraw('heatmap'))
+
+        toolbar_layout.addWidget(QLabel("Plate Overview"))
+        toolbar_layout.addStretch()
+        toolbar_layout.addWidget(QLabel("Metric:"))
+        toolbar_layout.addWidget(self.combo_heat_metric)
+        toolbar_layout.addWidget(self.check_heat_log)
+        btn_time = QPushButton("Concentration over Time")
+        btn_time.setToolTip("Invert every read of every well to follow the apparent concentration through the read")
+        btn_time.clicked.connect(self.show_time_course)
+        toolbar_layout.addWidget(btn_time)
+        layout.addLayout(toolbar_layout)
+
+        splitter = QSplitter(Qt.Horizontal)
+
+        heat_container = QGroupBox("Heatmap")
+        h_layout = QVBoxLayout(heat_container)
+        self.fig_heat = Figure(figsize=(7, 4), dpi=100)
+        self.canvas_heat = FigureCanvas(self.fig_heat)
+        self.ax_heat = self.fig_heat.add_subplot(111)
+        self.canvas_heat.mpl_connect('button_press_event', self.on_heatmap_click)
+        h_layout.addWidget(self.canvas_heat)
+        h_layout.addWidget(NavigationToolbar(self.canvas_heat, heat_container))
+        self.lbl_heat_note = QLabel("Click a well to show its trace.")
+        h_layout.addWidget(self.lbl_heat_note)
+        splitter.addWidget(heat_container)
+
+        trace_container = QGroupBox("Well Trace")
+        t_layout = QVBoxLayout(trace_container)
+        self.fig_well = Figure(figsize=(4, 4), dpi=100)
+        self.canvas_well = FigureCanvas(self.fig_well)
+        self.ax_well = self.fig_well.add_subplot(111)
+        t_layout.addWidget(self.canvas_well)
+        self.lbl_well_info = QLabel()
+        self.lbl_well_info.setWordWrap(True)
+        t_layout.addWidget(self.lbl_well_info)
+        splitter.addWidget(trace_container)
+        splitter.setSizes([800, 400])
+
+        layout.addWidget(splitter)
+        self.stack.addWidget(page)
+
+    def heatmap_values(self, metric):
+        """(wells, values, note) of a heatmap metric, taken from the cached feature table."""
+        features = self.well_features()
+        wells = list(features.index)
+        if metric in FEATURES:
+            return wells, features[metric].to_numpy(), ""
+        if metric == 'qc':
+            if self.qc is None:
+                return wells, np.full(len(wells), np.nan), "QC has not been run."
+            return wells, self.qc['flagged'].reindex(wells).astype(float).to_numpy(), ""
+        try:
+            curve = self.current_curve()
+        except ValueError:
+            return wells, np.full(len(wells), np.nan), "Enter a valid standard curve on the Quantification page."
+        conc = QuantEngine.invert(features[self.signal].to_numpy(), QuantEngine.curve_arrays({'current': curve}))
+        if metric == 'stock_conc':
+            dilution = {w: cond.get('dilution', 1.0) for cond in self.conditions for w in cond['wells']}
+            conc = conc * np.array([dilution.get(w, np.nan) for w in wells])
+            return wells, conc, "Wells without a condition have no dilution and are blank."
+        return wells, conc, f"{FEATURES[self.signal]} of every well inverted through {self.combo_curve.currentText()}."
+
+    def update_heatmap(self):
+        """Draws the selected per-well metric as one image; switching metrics only swaps the image data."""
+        if self.df is None: return
+        metric = self.combo_heat_metric.currentData()
+        log = self.check_heat_log.isChecked() and metric != 'qc'
+        key = (self.data_version, self.bg_mode, self.smoothing, repr(self.conditions), metric, log, self.plate_widget.format,
+               self.quant_state() if metric in ('conc', 'stock_conc') else None,
+               None if self.qc is None else tuple(self.qc['reason']))
+        if self.view_is_current('heatmap', key): return
+
+        wells, values, note = self.heatmap_values(metric)
+        fmt = max(plate_format(wells), self.plate_widget.format)
+        mat = plate_matrix(wells, values, fmt)
+        if log:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mat = np.where(mat > 0, np.log10(mat), np.nan)
+
+        if self._heat is None or self._heat['fmt'] != fmt:
+            self.fig_heat.clear()
+            self.ax_heat = self.fig_heat.add_subplot(111)
+            image = self.ax_heat.imshow(mat, interpolation='nearest', aspect='equal')
+            n_rows, n_cols = mat.shape
+            step = 1 if n_cols <= 24 else 2
+            self.ax_heat.set_xticks(np.arange(0, n_cols, step))
+            self.ax_heat.set_xticklabels([str(c + 1) for c in range(0, n_cols, step)], fontsize=7)
+            self.ax_heat.set_yticks(np.arange(0, n_rows, step))
+            self.ax_heat.set_yticklabels([row_label(r) for r in range(0, n_rows, step)], fontsize=7)
+            self.ax_heat.xaxis.tick_top()
+            marker = Rectangle((-10, -10), 1, 1, fill=False, edgecolor='black', linewidth=2)
+            self.ax_heat.add_patch(marker)
+            self._heat = {'fmt': fmt, 'image': image, 'marker': marker,
+                          'colorbar': self.fig_heat.colorbar(image, ax=self.ax_heat)}
+        else:
+            self._heat['image'].set_data(mat)
+
+        image = self._heat['image']
+        image.set_cmap(matplotlib.colormaps['Reds' if metric == 'qc' else 'viridis'].with_extremes(bad='#e5e7eb'))
+        finite = mat[np.isfinite(mat)]
+        image.set_clim((finite.min(), finite.max()) if finite.size and finite.min() < finite.max() else (0, max(finite.max(initial=0), 1)))
+        self._heat['colorbar'].set_label(HEATMAP_METRICS[metric] + (" (log10)" if log else ""))
+        self._heat['values'] = dict(zip(wells, values))
+        self.lbl_heat_note.setText(note or "Click a well to show its trace.")
+        self.canvas_heat.draw_idle()
+        self.mark_drawn('heatmap', key)
+
+    def on_heatmap_click(self, event):
+        if event.inaxes is not self.ax_heat or self._heat is None or event.xdata is None: return
+        row, col = int(round(event.ydata)), int(round(event.xdata))
+        self._heat['marker'].set_xy((col - 0.5, row - 0.5))
+        self.canvas_heat.draw_idle()
+        self.show_well_trace(f"{row_label(row)}{col + 1}")
+
+    def show_well_trace(self, well):
+        """Plots one well's kinetic trace next to the heatmap."""
+        self.ax_well.clear()
+        df = self.working_df()
+        cond = next((c['name'] for c in self.conditions if well in c['wells']), "Unassigned")
+        if well not in df.columns:
+            self.ax_well.set_title(f"{well} (No Data)")
+            self.lbl_well_info.setText("")
+        else:
+            self.ax_well.plot(df['Time'], df[well], '-o', markersize=3, color='#2563eb', label="Corrected" if self.bg_mode != 'none' else well)
+            if self.bg_mode != 'none':
+                self.ax_well.plot(self.df['Time'], self.df[well], ':', color='#4b5563', label="Raw")
+                self.ax_well.legend(fontsize=8)
+            self.ax_well.set_title(f"{well} - {cond}")
+            features = self.well_features().loc[well]
+            info = [f"{label}: {features[key]:.4g}" for key, label in FEATURES.items()]
+            metric = self.combo_heat_metric.currentData()
+            if metric not in FEATURES and metric != 'qc':
+                info.append(f"{HEATMAP_METRICS[metric]}: {self._heat['values'].get(well, np.nan):.4f}")
+            if self.qc is not None and well in self.qc.index and self.qc.at[well, 'flagged']:
+                info.append(f"QC: {self.qc.at[well, 'reason']}")
+            self.lbl_well_info.setText("\n".join(info))
+        self.ax_well.set_xlabel("Time (min)")
+        self.ax_well.set_ylabel("RLU")
+        self.ax_well.grid(True, linestyle='--', alpha=0.5)
+        self.fig_well.tight_layout()
+        self.canvas_well.draw_idle()
+
+    def time_course(self, curve):
+        """Concentration of every well at every read (a hibitquant TimeCourse), cached like quant_result.
+
+        The whole plate is inverted once per input state, so scrubbing through the
+        reads never recomputes. Raises ValueError if the selected signal has no
+        value per read.
+        """
+        if self.signal not in TIME_SIGNALS:
+            raise ValueError(f"{FEATURES[self.signal]} has no value per read. Select {FEATURES['peak']} or "
+                             f"{FEATURES['smoothed_peak']} as the signal on the Visualize page.")
+        excluded = self.qc_excluded()
+        normalize = self.check_normalize.isChecked()
+        key = (self.data_version, self.bg_mode, self.signal, self.smoothing, repr(self.conditions),
+               repr(sorted(curve.items(), key=str)), tuple(sorted(excluded)), normalize)
+        if key in self._time_cache:
+            self._time_cache.move_to_end(key)
+        else:
+            df = self.working_df()
+            scale = 1.0
+            if normalize:
+                features = self.well_features() if self.signal != 'peak' else None
+                try:
+                    scale = calibrator_scales([(df, self.conditions, self.qc, excluded, features)], curve,
+                                              self.signal)[0]
+                except ValueError as e:
+                    QMessageBox.warning(self, "Normalization", f"{e}\nResults are not normalized.")
+            self._time_cache[key] = TimeCourseEngine.compute(
+                df, self.conditions, curve, excluded, scale, self.smoothing if self.signal == 'smoothed_peak' else 'none')
+            while len(self._time_cache) > 4:
+                self._time_cache.popitem(last=False)
+        return self._time_cache[key]
+
+    def show_time_course(self):
+        """Plate heatmap of the concentration at every read (scrub or play through the read) and condition traces."""
+        if self.df is None: return
+        try:
+            curve = self.current_curve()
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Input", "Please enter valid numeric values for the curve parameters.")
+            return
+        try:
+            tc = self.time_course(curve)
+        except ValueError as e:
+            QMessageBox.warning(self, "Concentration over Time", str(e))
+            return
+        n_times = len(tc.times)
+        if not n_times: return
+        fmt = max(plate_format(tc.wells), self.plate_widget.format)
+        frames = {} # (stock, log) -> (n_times, rows, cols) plate matrices, built once per view
+        view = {}
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Concentration over Time")
+        dlg.resize(1100, 650)
+        d_layout = QVBoxLayout(dlg)
+        controls = QHBoxLayout()
+        combo_value = QComboBox()
+        combo_value.addItems(["Concentration (µg/mL)", "Stock Concentration (µg/mL)"])
+        controls.addWidget(combo_value)
+        check_log = QCheckBox("Log Scale")
+        controls.addWidget(check_log)
+        controls.addWidget(QLabel("Stable Window (reads):"))
+        spin_window = QSpinBox()
+        spin_window.setRange(2, max(n_times, 2))
+        spin_window.setValue(min(STABLE_READS, max(n_times, 2)))
+        controls.addWidget(spin_window)
+        controls.addStretch()
+        d_layout.addLayout(controls)
+
+        fig = Figure(figsize=(8, 4), dpi=100)
+        canvas = FigureCanvas(fig)
+        d_layout.addWidget(canvas)
+
+        scrub = QHBoxLayout()
+        btn_play = QPushButton("Play")
+        btn_play.setCheckable(True)
+        scrub.addWidget(btn_play)
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(0, n_times - 1)
+        scrub.addWidget(slider)
+        lbl_time = QLabel()
+        scrub.addWidget(lbl_time)
+        d_layout.addLayout(scrub)
+        lbl_status = QLabel()
+        d_layout.addWidget(lbl_status)
+
+        def plate_frames():
+            k = (combo_value.currentIndex() == 1, check_log.isChecked())
+            if k not in frames:
+                f = tc.plate_frames(k[0], fmt)
+                if k[1]:
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        f = np.where(f > 0, np.log10(f), np.nan)
+                frames[k] = f
+            return frames[k]
+
+        def redraw():
+            stock, log = combo_value.currentIndex() == 1, check_log.isChecked()
+            f = plate_frames()
+            fig.clear()
+            ax_heat, ax_trace = fig.subplots(1, 2, gridspec_kw={'width_ratios': [3, 2]})
+            finite = f[np.isfinite(f)]
+            # One color scale for the whole read, so frames are comparable
+            lim = np.percentile(finite, [2, 98]) if finite.size else (0, 1)
+            image = ax_heat.imshow(f[slider.value()], interpolation='nearest', aspect='equal',
+                                   cmap=matplotlib.colormaps['viridis'].with_extremes(bad='#e5e7eb'),
+                                   vmin=lim[0], vmax=lim[1] if lim[1] > lim[0] else lim[0] + 1)
+            n_rows, n_cols = f.shape[1:]
+            step = 1 if n_cols <= 24 else 2
+            ax_heat.set_xticks(np.arange(0, n_cols, step))
+            ax_heat.set_xticklabels([str(c + 1) for c in range(0, n_cols, step)], fontsize=7)
+            ax_heat.set_yticks(np.arange(0, n_rows, step))
+            ax_heat.set_yticklabels([row_label(r) for r in range(0, n_rows, step)], fontsize=7)
+            ax_heat.xaxis.tick_top()
+            fig.colorbar(image, ax=ax_heat).set_label(combo_value.currentText() + (" (log10)" if log else ""))
+
+            dil = tc.dilutions if stock else np.ones(len(tc.names))
+            for i, name in enumerate(tc.names):
+                if not tc.n[:, i].any(): continue
+                mean, sd = tc.mean[:, i] * dil[i], tc.sd[:, i] * dil[i]
+                color = self.conditions[i]['color'] if i < len(self.conditions) else None
+                label = f"{name} ({tc.dilutions[i]:g}x)" if tc.dilutions[i] != 1 else name
+                ax_trace.plot(tc.times, mean, '-', color=color, label=label)
+                ax_trace.fill_between(tc.times, mean - sd, mean + sd, color=color, alpha=0.2, linewidth=0)
+            window = tc.stable_window(spin_window.value())
+            if window:
+                start, end = tc.times[window[0]], tc.times[window[1]]
+                ax_trace.axvspan(start, end, color='#16a34a', alpha=0.12, label="Most stable window")
+                drift = np.nanmean(tc.drift()[window[0]:window[1] + 1])
+                lbl_status.setText(f"Most stable {spin_window.value()} reads: {start:g}-{end:g} min "
+                                   f"(median concentration drift {drift:.2g}%/min).")
+            else:
+                lbl_status.setText("Not enough reads or quantifiable conditions to find a stable window.")
+            if log:
+                ax_trace.set_yscale('log')
+            ax_trace.set_xlabel("Time (min)")
+            ax_trace.set_ylabel(combo_value.currentText())
+            ax_trace.grid(True, linestyle='--', alpha=0.5)
+            if ax_trace.get_legend_handles_labels()[0]:
+                ax_trace.legend(fontsize=7)
+            view.update(image=image, line=ax_trace.axvline(tc.times[slider.value()], color='black', linewidth=1),
+                        ax=ax_heat)
+            fig.tight_layout()
+            show_frame()
+
+        def show_frame():
+            # Scrubbing only swaps the image data and moves the time marker
+            t = slider.value()
+            view['image'].set_data(plate_frames()[t])
+            view['line'].set_xdata([tc.times[t], tc.times[t]])
+            view['ax'].set_title(f"{tc.times[t]:g} min", fontsize=9)
+            lbl_time.setText(f"{tc.times[t]:g} min ({t + 1}/{n_times})")
+            canvas.draw_idle()
+
+        timer = QTimer(dlg)
+        timer.setInterval(150)
+        timer.timeout.connect(lambda: slider.setValue((slider.value() + 1) % n_times))
+
+        def play(on):
+            btn_play.setText("Pause" if on else "Play")
+            if on:
+                timer.start()
+            else:
+                timer.stop()
+
+        def export():
+            path, _ = QFileDialog.getSaveFileName(dlg, "Export Concentration over Time", "time_course.csv", "CSV (*.csv)")
+            if path:
+                tc.well_table(combo_value.currentIndex() == 1).to_csv(path, index=False)
+                tc.trace_table().to_csv(os.path.splitext(path)[0] + "_traces.csv", index=False)
+                QMessageBox.information(dlg, "Export", "Concentration over time exported successfully.")
+
+        slider.valueChanged.connect(show_frame)
+        btn_play.toggled.connect(play)
+        combo_value.currentIndexChanged.connect(redraw)
+        check_log.stateChanged.connect(redraw)
+        spin_window.valueChanged.connect(redraw)
+        redraw()
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.addButton("Export", QDialogButtonBox.ActionRole).clicked.connect(export)
+        buttons.rejected.connect(dlg.reject)
+        d_layout.addWidget(buttons)
+        dlg.exec()
+        timer.stop()
+
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Report worker processes in the frozen executable
+    if len(sys.argv) > 1 and sys.argv[1] in ('query', 'runs', 'serve', 'report', 'watch', 'metrics', 'rank', 'archive', '--db'):
+        sys.exit(run_cli(sys.argv[1:]))
+
     app = QApplication(sys.argv)
     
     app.setStyle("Fusion")
@@ -1405,4 +3065,4 @@ if __name__ == "__main__":
 
     window = HiBitApp()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
@@ -7,7 +7,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('icon.png', '.')],
-    hiddenimports=[],
+    # Reader parsers are imported by name when a file of their format is read (hibitquant.readers.parser)
+    hiddenimports=['hibitquant.readers.kinetic', 'hibitquant.readers.matrix', 'hibitquant.readers.endpoint'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -40,4 +41,28 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
     icon='icon.ico',
-)
\ No newline at end of file
+)
+
+# Same program with a console window, so the command line tools (query, runs, metrics, rank, ...) can print
+exe_cli = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    [],
+    name='HiBitQuantCLI',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon='icon.ico',
+)
@@ -0,0 +1,39 @@
+"""HiBitQuant core: plate parsing, QC, background subtraction and quantification.
+
+Importable without PySide6 or Matplotlib; the HiBitQuant GUI is a client of
+this package.
+
+    >>> import hibitquant as hq
+    >>> lib = hq.CurveLibrary().load()
+    >>> result = hq.quantify_plate("plate.csv", "guide.xlsx", lib["My Curve"])
+    >>> result.conditions[['sample', 'dilution', 'conc', 'stock_conc']]
+"""
+from .resources import resource_path
+from .parser import DataParser
+from .quant import CURVE_MODELS, CURVE_PARAMS, CURVE_EQUATIONS, QuantEngine
+from .qc import QCEngine
+from .background import DEFAULT_BACKGROUND, BackgroundEngine
+from .align import TimeAligner
+from .workspace import PlateWorkspace
+from .library import CurveLibrary
+from .database import ResultsDatabase
+from .features import FEATURES, SIGNAL_FEATURES, SMOOTHING, well_features, smooth, plate_matrix, plate_format, well_positions
+from .wellmask import WellMask
+from .models import Plate, Condition, Layout, Curve, QuantResult
+from .normalize import CalibrationEngine
+from .metrics import AssayMetrics
+from .ranking import HitRanker
+from .timecourse import TimeCourse, TimeCourseEngine
+from .archive import PlateArchive
+from .pipeline import (quantify, quantify_plate, quantify_batch, assay_metrics, rank_plates,
+                       concentration_timecourse)
+
+__all__ = [
+    'resource_path', 'DataParser', 'CURVE_MODELS', 'CURVE_PARAMS', 'CURVE_EQUATIONS', 'QuantEngine',
+    'QCEngine', 'BackgroundEngine', 'DEFAULT_BACKGROUND', 'TimeAligner', 'PlateWorkspace', 'CurveLibrary', 'ResultsDatabase',
+    'FEATURES', 'SIGNAL_FEATURES', 'SMOOTHING', 'well_features', 'smooth', 'plate_matrix', 'plate_format',
+    'well_positions', 'WellMask',
+    'Plate', 'Condition', 'Layout', 'Curve', 'QuantResult', 'CalibrationEngine', 'AssayMetrics', 'HitRanker',
+    'TimeCourse', 'TimeCourseEngine', 'PlateArchive',
+    'quantify', 'quantify_plate', 'quantify_batch', 'assay_metrics', 'rank_plates', 'concentration_timecourse',
+]
@@ -0,0 +1,76 @@
+"""Time-grid alignment of plates read at different intervals."""
+import warnings
+
+import numpy as np
+
+from .features import well_positions
+
+
+class TimeAligner:
+    """Resamples plates with different read intervals/offsets onto one shared time grid."""
+
+    @staticmethod
+    def common_grid(times, step=None, mode='overlap'):
+        """Builds a shared grid. 'overlap' spans the time covered by every plate, 'union' by any plate.
+
+        The step defaults to the median read interval over all plates.
+        """
+        times = [np.asarray(t, dtype=float) for t in times if len(t)]
+        if not times:
+            return np.empty(0)
+        if step is None:
+            diffs = np.concatenate([np.diff(t) for t in times])
+            diffs = diffs[diffs > 0]
+            step = float(np.median(diffs)) if len(diffs) else 1.0
+        starts = np.array([t[0] for t in times])
+        ends = np.array([t[-1] for t in times])
+        start, end = (starts.max(), ends.min()) if mode == 'overlap' else (starts.min(), ends.max())
+        if end < start:
+            raise ValueError("The plates do not share any time range; use mode='union'.")
+        return start + step * np.arange(int(np.floor((end - start) / step + 1e-9)) + 1)
+
+    @staticmethod
+    def interpolate(t, X, grid):
+        """Linear interpolation of every column of X (time x wells) onto grid at once.
+
+        Grid points outside [t[0], t[-1]] are NaN.
+        """
+        t = np.asarray(t, dtype=float)
+        X = np.asarray(X, dtype=float)
+        grid = np.asarray(grid, dtype=float)
+        if len(t) == 1:
+            out = np.repeat(X, len(grid), axis=0)
+            out[grid != t[0]] = np.nan
+            return out
+        idx = np.clip(np.searchsorted(t, grid, side='right') - 1, 0, len(t) - 2)
+        w = ((grid - t[idx]) / (t[idx + 1] - t[idx]))[:, None]
+        out = X[idx] * (1 - w) + X[idx + 1] * w
+        out[(grid < t[0]) | (grid > t[-1])] = np.nan
+        return out
+
+    @staticmethod
+    def align(dfs, grid=None, step=None, mode='overlap'):
+        """Stacks many plates into one dense (n_plates, n_grid, n_wells) array.
+
+        Wells are the union over all plates; wells a plate does not have are NaN.
+        Returns (grid, wells, cube).
+        """
+        times = [df['Time'].to_numpy(dtype=float) for df in dfs]
+        if grid is None:
+            grid = TimeAligner.common_grid(times, step, mode)
+        wells = sorted({c for df in dfs for c in df.columns if c != 'Time'})
+        rows, cols = well_positions(wells)
+        wells = [wells[i] for i in np.lexsort((cols, rows))] # Plate order (A1, A2, ..., AF48); unparseable IDs first
+        cube = np.full((len(dfs), len(grid), len(wells)), np.nan)
+        col = {w: i for i, w in enumerate(wells)}
+        for p, (df, t) in enumerate(zip(dfs, times)):
+            plate_wells = [c for c in df.columns if c != 'Time']
+            cube[p][:, [col[w] for w in plate_wells]] = TimeAligner.interpolate(t, df[plate_wells].to_numpy(dtype=float), grid)
+        return grid, wells, cube
+
+    @staticmethod
+    def plate_stats(cube):
+        """Cross-plate mean, std and number of contributing plates per (time, well)."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanmean(cube, axis=0), np.nanstd(cube, axis=0, ddof=1), np.sum(np.isfinite(cube), axis=0)
@@ -0,0 +1,406 @@
+"""Experiment archive: raw plates, layouts, features and results of many runs in one folder.
+
+    <archive>/index.db        SQLite index: one row per plate (name, source file and hash, reader
+                              format, shape, layout) and one per stored array or table
+    <archive>/chunk_NNNNN.bin append-only data chunks of about CHUNK_BYTES each
+
+Every plate's time vector and float64 signal matrix, its well feature
+table and its quantification tables are appended to the current chunk as
+blocks, and the index records where. Signals are stored well-major (one
+contiguous trace per well) and uncompressed by default, so they are read
+through a memory map: a plate, or one well of it, is sliced out of the
+chunk without reading the rest (with `compress_signals` they are zlib
+compressed instead, which is smaller but decompresses the whole plate on
+access). Tables are always compressed. Archives written before the
+well-major layout keep their (time x well) signals and are still read.
+
+Plates already in the archive (same file hash) are skipped on import, so a
+folder can be imported again as new files arrive. `import_files` parses in
+a process pool and `export_plates` writes plates back out as reader-style
+CSVs with their guide, features and results.
+"""
+import os
+import io
+import json
+import zlib
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .background import DEFAULT_BACKGROUND
+from .database import ResultsDatabase
+from .features import row_label, well_positions, well_features
+from .models import Plate
+from .parser import DataParser
+from .pipeline import quantify_plate
+
+CHUNK_BYTES = 64 * 1024 ** 2
+TABLES = ['features', 'conditions', 'wells'] # Per-plate tables: well features and QuantResult tables
+
+
+class PlateArchive:
+    """Chunked, indexed store of many plates (see module docstring)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS plates (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            source TEXT,
+            file_hash TEXT,
+            reader TEXT,
+            n_times INTEGER,
+            n_wells INTEGER,
+            wells TEXT,
+            layout TEXT,
+            attrs TEXT,
+            curve TEXT,
+            added TEXT
+        );
+        CREATE TABLE IF NOT EXISTS blocks (
+            plate_id INTEGER REFERENCES plates(id) ON DELETE CASCADE,
+            kind TEXT,
+            chunk INTEGER,
+            offset INTEGER,
+            nbytes INTEGER,
+            codec TEXT,
+            dtype TEXT,
+            shape TEXT,
+            PRIMARY KEY (plate_id, kind)
+        );
+        CREATE INDEX IF NOT EXISTS idx_plates_name ON plates(name);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_plates_hash ON plates(file_hash);
+        CREATE INDEX IF NOT EXISTS idx_plates_added ON plates(added);
+    """
+
+    def __init__(self, path, compress_signals=False, chunk_bytes=CHUNK_BYTES):
+        self.path = os.path.abspath(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.chunk_bytes = chunk_bytes
+        self.conn = sqlite3.connect(os.path.join(self.path, 'index.db'))
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(self.SCHEMA)
+        # The codec and signal layout are fixed when the archive is created
+        existing = self.conn.execute("SELECT 1 FROM meta WHERE key = 'signal_codec'").fetchone() is not None
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('signal_codec', ?)", ('zlib' if compress_signals else 'raw',))
+        # Archives from before the layout entry store (time x well) signals
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('signal_layout', ?)", ('time' if existing else 'well',))
+        self.conn.commit()
+        meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        self.signal_codec = meta['signal_codec']
+        self.well_major = meta['signal_layout'] == 'well'
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM plates").fetchone()[0]
+
+    # --- Chunks ---
+    def _chunk_path(self, chunk):
+        return os.path.join(self.path, f"chunk_{chunk:05d}.bin")
+
+    def _append(self, data):
+        """Appends bytes to the current chunk (8-byte aligned); returns (chunk, offset)."""
+        chunk = self.conn.execute("SELECT COALESCE(MAX(chunk), 0) FROM blocks").fetchone()[0]
+        path = self._chunk_path(chunk)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size and size + len(data) > self.chunk_bytes:
+            chunk, size = chunk + 1, 0
+            path = self._chunk_path(chunk)
+        pad = -size % 8
+        with open(path, 'ab') as f:
+            f.write(b'\0' * pad + data)
+        return chunk, size + pad
+
+    def _put(self, plate_id, kind, data, codec, dtype='', shape=()):
+        payload = zlib.compress(data, 6) if codec == 'zlib' else data
+        chunk, offset = self._append(payload)
+        self.conn.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (plate_id, kind, chunk, offset, len(payload), codec, dtype, json.dumps(list(shape))))
+
+    def _block(self, plate_id, kind):
+        row = self.conn.execute("SELECT chunk, offset, nbytes, codec, dtype, shape FROM blocks "
+                                "WHERE plate_id = ? AND kind = ?", (plate_id, kind)).fetchone()
+        if row is None:
+            raise KeyError(f"Plate {plate_id} has no {kind} in the archive.")
+        return row
+
+    def _array(self, plate_id, kind):
+        """A stored array; a read-only memory map for uncompressed blocks."""
+        chunk, offset, nbytes, codec, dtype, shape = self._block(plate_id, kind)
+        shape = tuple(json.loads(shape))
+        if codec == 'raw':
+            if not nbytes:
+                return np.empty(shape, dtype=dtype)
+            return np.memmap(self._chunk_path(chunk), dtype=dtype, mode='r', offset=offset, shape=shape)
+        return np.frombuffer(zlib.decompress(self._read(chunk, offset, nbytes)), dtype=dtype).reshape(shape)
+
+    def _read(self, chunk, offset, nbytes):
+        with open(self._chunk_path(chunk), 'rb') as f:
+            f.seek(offset)
+            return f.read(nbytes)
+
+    # --- Writing ---
+    def add(self, plate, name=None, layout=None, source=None, file_hash=None, features=None, result=None,
+            curve_name=None):
+        """Stores one plate (a Plate or plate frame); returns its id, or the existing id for a known file hash.
+
+        `layout` is a list of condition dicts, `features` a well_features
+        table and `result` a QuantResult of the plate (quantified against
+        `curve_name`).
+        """
+        if file_hash:
+            row = self.conn.execute("SELECT id FROM plates WHERE file_hash = ?", (file_hash,)).fetchone()
+            if row:
+                return row[0]
+        if not isinstance(plate, Plate):
+            plate = Plate.from_dataframe(plate, name or "plate")
+        values = np.ascontiguousarray(plate.values, dtype=np.float64)
+        attrs = {k: v for k, v in plate.attrs.items() if k != 'format'}
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO plates (name, source, file_hash, reader, n_times, n_wells, wells, layout, attrs, curve, "
+                "added) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (name or plate.name, source or plate.path, file_hash, plate.attrs.get('format'), values.shape[0],
+                 values.shape[1], json.dumps(list(plate.wells)), json.dumps(layout or []),
+                 json.dumps(attrs, default=str), curve_name, datetime.now().isoformat(timespec='seconds')))
+            plate_id = cur.lastrowid
+            time = np.ascontiguousarray(plate.time, dtype=np.float64)
+            self._put(plate_id, 'time', time.tobytes(), 'raw', 'float64', time.shape)
+            if self.well_major:
+                values = np.ascontiguousarray(values.T)
+            self._put(plate_id, 'signal', values.tobytes(), self.signal_codec, 'float64', values.shape)
+            self._put_tables(plate_id, features, result)
+        return plate_id
+
+    def add_result(self, plate_id, result, curve_name=None):
+        """Stores (replaces) the quantification tables of an archived plate."""
+        with self.conn:
+            self._put_tables(plate_id, None, result)
+            self.conn.execute("UPDATE plates SET curve = ? WHERE id = ?", (curve_name, plate_id))
+
+    def _put_tables(self, plate_id, features, result):
+        tables = {'features': features.rename_axis('well').reset_index() if features is not None else None}
+        if result is not None:
+            tables.update(conditions=result.conditions, wells=result.wells)
+        for kind, df in tables.items():
+            if df is not None:
+                self._put(plate_id, kind, df.to_csv(index=False).encode('utf-8'), 'zlib')
+
+    def remove(self, plate_id):
+        """Drops a plate from the index (its chunk space is not reclaimed)."""
+        with self.conn:
+            self.conn.execute("DELETE FROM plates WHERE id = ?", (plate_id,))
+
+    # --- Reading ---
+    def plates(self, name=None, since=None):
+        """The plate index; `name` is a LIKE pattern, `since` the first date added (YYYY-MM-DD)."""
+        sql, params = ("SELECT id, name, source, file_hash, reader, n_times, n_wells, curve, added FROM plates "
+                       "WHERE 1 = 1", [])
+        if name:
+            sql += " AND name LIKE ?"
+            params.append(name)
+        if since:
+            sql += " AND added >= ?"
+            params.append(since)
+        return pd.read_sql_query(sql + " ORDER BY id", self.conn, params=params)
+
+    def ids(self, names):
+        """Plate ids by name (the latest plate of each name)."""
+        out = []
+        for name in names:
+            row = self.conn.execute("SELECT MAX(id) FROM plates WHERE name = ?", (name,)).fetchone()
+            if row[0] is None:
+                raise KeyError(f"No plate named {name!r} in the archive.")
+            out.append(row[0])
+        return out
+
+    def _info(self, plate_id):
+        row = self.conn.execute("SELECT name, source, reader, wells, layout, attrs FROM plates WHERE id = ?",
+                                (plate_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No plate {plate_id} in the archive.")
+        return row
+
+    def plate(self, plate_id):
+        """A Plate whose values are a read-only memory map into the archive (uncompressed archives)."""
+        name, source, reader, wells, _, attrs = self._info(plate_id)
+        attrs = dict(json.loads(attrs), **({'format': reader} if reader else {}))
+        signal = self._array(plate_id, 'signal')
+        return Plate(np.array(self._array(plate_id, 'time')), json.loads(wells), signal.T if self.well_major else signal,
+                     name=name, path=source, attrs=attrs)
+
+    def get_df(self, plate_id):
+        return self.plate(plate_id).to_dataframe()
+
+    def well(self, plate_id, well):
+        """(time, values) of one well, read without loading the rest of the plate."""
+        wells = json.loads(self._info(plate_id)[3])
+        if well not in wells:
+            raise KeyError(f"Plate {plate_id} has no well {well}.")
+        signal = self._array(plate_id, 'signal')
+        trace = signal[wells.index(well)] if self.well_major else signal[:, wells.index(well)]
+        return np.array(self._array(plate_id, 'time')), np.array(trace, dtype=float)
+
+    def layout(self, plate_id):
+        return json.loads(self._info(plate_id)[4])
+
+    def table(self, plate_id, kind):
+        """A stored table (one of TABLES) as a DataFrame; features are indexed by well."""
+        if kind not in TABLES:
+            raise ValueError(f"Unknown table: {kind}")
+        chunk, offset, nbytes, _, _, _ = self._block(plate_id, kind)
+        df = pd.read_csv(io.BytesIO(zlib.decompress(self._read(chunk, offset, nbytes))), keep_default_na=False,
+                         na_values=[''])
+        if kind == 'wells':
+            df['qc_flag'] = df['qc_flag'].fillna('')
+        return df.set_index('well') if kind == 'features' else df
+
+    def has_table(self, plate_id, kind):
+        return self.conn.execute("SELECT 1 FROM blocks WHERE plate_id = ? AND kind = ?",
+                                 (plate_id, kind)).fetchone() is not None
+
+    def iter_plates(self, plate_ids=None):
+        """(name, Plate, layout) of every (or the given) plate, one at a time, e.g. for rank_plates."""
+        if plate_ids is None:
+            plate_ids = [r[0] for r in self.conn.execute("SELECT id FROM plates ORDER BY id")]
+        for pid in plate_ids:
+            plate = self.plate(pid)
+            yield plate.name, plate, self.layout(pid)
+
+
+# --- Bulk import / export ---
+def _guide_for(path):
+    """The <name>_guide file next to a data file (the inbox naming convention), if any."""
+    stem = os.path.splitext(path)[0]
+    return next((stem + '_guide' + ext for ext in ('.xlsx', '.xls', '.csv') if os.path.exists(stem + '_guide' + ext)),
+                None)
+
+
+def _prepare(job):
+    """Parse (and optionally quantify) one file for import (runs in a worker)."""
+    try:
+        df = DataParser.parse_file(job['path'])
+        own_guide = _guide_for(job['path'])
+        layout = DataParser.parse_guide_file(own_guide) if own_guide else job['layout'] or []
+        features = well_features(df, job['smoothing'])
+        result = None
+        if job['curve'] is not None and layout:
+            result = quantify_plate(df, layout, job['curve'], background=job['background'], feature=job['feature'],
+                                    smoothing=job['smoothing'])
+        return {'ok': True, 'df': df, 'layout': layout, 'features': features, 'result': result}
+    except Exception as e:
+        return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+
+def import_files(archive, paths, guide=None, curve=None, background=DEFAULT_BACKGROUND, feature='peak',
+                 smoothing='median', workers=None, log=print):
+    """Parses reader exports into `archive` (a PlateArchive or path); returns (added, skipped, failed) counts.
+
+    Each file's layout is its <name>_guide file or `guide`; features are
+    computed with `smoothing`, and with a `curve` (library row, with its
+    'Name') plates with a layout are quantified and their results stored
+    too. Files whose hash is already archived are skipped before parsing;
+    the rest are parsed in a process pool and written in order.
+    """
+    own = not isinstance(archive, PlateArchive)
+    archive = PlateArchive(archive) if own else archive
+    added = skipped = failed = 0
+    try:
+        known = {r[0] for r in archive.conn.execute("SELECT file_hash FROM plates WHERE file_hash IS NOT NULL")}
+        jobs = []
+        for path in paths:
+            file_hash = ResultsDatabase.file_hash(path)
+            if file_hash in known:
+                skipped += 1
+                continue
+            known.add(file_hash)
+            jobs.append({'path': path, 'hash': file_hash})
+        layout = DataParser.parse_guide_file(guide) if guide else None
+        settings = {'layout': layout, 'curve': curve, 'background': background, 'feature': feature,
+                    'smoothing': smoothing}
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            for job, res in zip(jobs, pool.map(_prepare, [dict(settings, path=j['path']) for j in jobs])):
+                name = os.path.basename(job['path'])
+                if not res['ok']:
+                    failed += 1
+                    log(f"FAILED {name}: {res['error']}")
+                    continue
+                archive.add(res['df'], name, res['layout'], source=os.path.abspath(job['path']),
+                            file_hash=job['hash'], features=res['features'], result=res['result'],
+                            curve_name=(curve or {}).get('Name') if res['result'] is not None else None)
+                added += 1
+    finally:
+        if own:
+            archive.close()
+    log(f"Archived {added} plate(s), skipped {skipped} already archived, {failed} failed.")
+    return added, skipped, failed
+
+
+def _number(x):
+    """Shortest text that parses back to the same float (6 significant digits when they suffice)."""
+    x = float(x)
+    return f"{x:g}" if float(f"{x:g}") == x else repr(x)
+
+
+def write_guide(conditions, path):
+    """Writes condition dicts as a guide CSV (Row + column numbers, cells {Name}@{Dilution}~{Conc}).
+
+    Blank and calibrator flags are carried by the condition names only, as
+    when the guide is parsed.
+    """
+    cells = {}
+    for c in conditions:
+        label = c['name'] + (f"@{_number(c.get('dilution', 1.0))}" if c.get('dilution', 1.0) != 1 else "")
+        for i, w in enumerate(c['wells']):
+            cells[w] = label + (f"~{_number(c['conc'])}" if i == 0 and c.get('conc') is not None else "")
+    rows, cols = well_positions(list(cells))
+    ok = rows >= 0
+    grid = np.full((rows.max(initial=0) + 1, cols.max(initial=0) + 1), '', dtype=object)
+    grid[rows[ok], cols[ok]] = np.asarray(list(cells.values()), dtype=object)[ok]
+    df = pd.DataFrame(grid, columns=[str(c + 1) for c in range(grid.shape[1])])
+    df.insert(0, 'Row', [row_label(r) for r in range(grid.shape[0])])
+    df.to_csv(path, index=False)
+    return path
+
+
+def export_plates(archive, out_dir, plate_ids=None):
+    """Writes <name>.csv (Time + wells), <name>_guide.csv and the stored tables (<name>_<table>.csv) per plate.
+
+    Returns the paths written.
+    """
+    own = not isinstance(archive, PlateArchive)
+    archive = PlateArchive(archive) if own else archive
+    os.makedirs(out_dir, exist_ok=True)
+    paths, stems = [], set()
+    try:
+        for pid, name in archive.plates()[['id', 'name']].itertuples(index=False):
+            if plate_ids is not None and pid not in plate_ids:
+                continue
+            stem = os.path.join(out_dir, os.path.splitext(name)[0])
+            if stem in stems:
+                stem += f"_{pid}" # Same name archived twice
+            stems.add(stem)
+            archive.get_df(pid).to_csv(stem + '.csv', index=False)
+            paths.append(stem + '.csv')
+            layout = archive.layout(pid)
+            if layout:
+                paths.append(write_guide(layout, stem + '_guide.csv'))
+            for kind in TABLES:
+                if archive.has_table(pid, kind):
+                    archive.table(pid, kind).to_csv(stem + f"_{kind}.csv", index=kind == 'features')
+                    paths.append(stem + f"_{kind}.csv")
+    finally:
+        if own:
+            archive.close()
+    return paths
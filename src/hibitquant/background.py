@@ -0,0 +1,52 @@
+"""Blank/background subtraction."""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BACKGROUND = 'none' # Default blank subtraction of the GUI, pipeline, CLI and service
+
+
+class BackgroundEngine:
+    """Blank/background subtraction applied to the whole wells x time matrix."""
+
+    MODES = {
+        'none': "None",
+        'timepoint': "Blank Mean per Time Point",
+        'linear': "Fitted Background (Linear Drift)",
+        'constant': "Constant Blank Mean",
+    }
+
+    @staticmethod
+    def background(df, blank_wells, mode='timepoint'):
+        """Background RLU per time point estimated from the blank wells (None if unavailable)."""
+        blank_wells = [w for w in blank_wells if w in df.columns]
+        if mode == 'none' or not blank_wells:
+            return None
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            bg = np.nanmean(df[blank_wells].to_numpy(dtype=float), axis=1)
+        if mode == 'constant':
+            return np.full(len(df), np.nanmean(bg))
+        if mode == 'linear':
+            t = df['Time'].to_numpy(dtype=float)
+            ok = np.isfinite(bg)
+            if ok.sum() < 2:
+                return np.full(len(df), np.nanmean(bg))
+            slope, intercept = np.polyfit(t[ok], bg[ok], 1)
+            return slope * t + intercept
+        # Time points without any blank read are left uncorrected
+        return np.nan_to_num(bg, nan=0.0)
+
+    @staticmethod
+    def correct(df, blank_wells, mode='timepoint'):
+        """Returns a copy of df with the background subtracted from every well in one broadcast."""
+        bg = BackgroundEngine.background(df, blank_wells, mode)
+        if bg is None:
+            return df
+        # Rebuilt as one float block; assigning the well columns into a copy is per column and fragments the frame
+        values = df.to_numpy(dtype=float)
+        values[:, df.columns != 'Time'] -= bg[:, None]
+        out = pd.DataFrame(values, columns=df.columns, index=df.index)
+        out.attrs = dict(df.attrs, background=bg)
+        return out
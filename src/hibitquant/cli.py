@@ -0,0 +1,280 @@
+"""Command line interface (`python -m hibitquant`)."""
+import os
+import argparse
+
+from .database import ResultsDatabase
+from .features import SIGNAL_FEATURES, SMOOTHING
+from .background import DEFAULT_BACKGROUND, BackgroundEngine
+from .library import CurveLibrary
+from .parser import DataParser
+from .quant import CURVE_MODELS
+from .inbox import DATA_EXTENSIONS, GUIDE_SUFFIX, watch
+from .archive import PlateArchive, import_files, export_plates
+from .metrics import METRICS, THRESHOLDS
+from .pipeline import assay_metrics, rank_plates
+from .ranking import RANK_LEVELS, RANK_VALUES
+from .server import serve
+
+
+def run_cli(argv):
+    """Command line access to the results database (`query` / `runs`), the HTTP service (`serve`), batch reports (`report`),
+    inbox processing (`watch`), plate quality metrics (`metrics`), hit ranking (`rank`) and experiment archives
+    (`archive`)."""
+    parser = argparse.ArgumentParser(prog="HiBitQuant", description="Query recorded HiBitQuant results.")
+    parser.add_argument('--db', default=None, help=f"Database path (default: {ResultsDatabase.DEFAULT_PATH})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    q = sub.add_parser('query', help="Per-condition (or per-well) results")
+    q.add_argument('--sample', help="Sample name, %% and _ act as wildcards")
+    q.add_argument('--curve', help="Standard curve name")
+    q.add_argument('--plate', help="Plate id")
+    q.add_argument('--since', help="First run date (YYYY-MM-DD)")
+    q.add_argument('--until', help="Last run date (YYYY-MM-DD)")
+    q.add_argument('--wells', action='store_true', help="Return per-well results")
+    q.add_argument('--limit', type=int, default=None)
+    q.add_argument('--csv', help="Write results to this CSV file instead of printing")
+
+    r = sub.add_parser('runs', help="List recorded runs")
+    r.add_argument('--limit', type=int, default=50)
+
+    s = sub.add_parser('serve', help="Run the local HTTP quantification service")
+    s.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: localhost only)")
+    s.add_argument('--port', type=int, default=8765)
+    s.add_argument('--workers', type=int, default=4, help="Requests processed concurrently")
+    s.add_argument('--queue', type=int, default=32, help="Requests waiting for a worker before 503 is returned")
+    s.add_argument('--cache', type=int, default=64, help="Parsed plates kept in memory")
+    s.add_argument('--library', default=None, help="Standard curve library CSV")
+    s.add_argument('--quiet', action='store_true', help="Do not log requests")
+
+    g = sub.add_parser('report', help="Render figures for many plates (needs Matplotlib)")
+    g.add_argument('plates', nargs='+', help="Reader export files")
+    g.add_argument('--guide', required=True, help="Layout guide file applied to every plate")
+    g.add_argument('--curve', help="Standard curve name for the concentration figure")
+    g.add_argument('--library', default=None, help="Standard curve library CSV")
+    g.add_argument('--out', required=True, help="PDF file, or output folder for png/svg")
+    g.add_argument('--format', choices=['pdf', 'png', 'svg'], default='pdf')
+    g.add_argument('--figures', default='kinetic,dose,quant', help="Comma separated subset of kinetic,dose,quant")
+    g.add_argument('--background', choices=list(BackgroundEngine.MODES), default=DEFAULT_BACKGROUND)
+    g.add_argument('--fit-model', choices=CURVE_MODELS, default='Linear')
+    g.add_argument('--stock', action='store_true', help="Plot stock (dilution corrected) concentrations")
+    g.add_argument('--signal', choices=SIGNAL_FEATURES, default='peak', help="Per-well signal of the dose and concentration figures")
+    g.add_argument('--smoothing', choices=list(SMOOTHING), default='median')
+    g.add_argument('--dpi', type=int, default=300)
+    g.add_argument('--workers', type=int, default=None)
+
+    w = sub.add_parser('watch', help="Quantify reader exports dropped into an inbox folder")
+    w.add_argument('inbox', help="Folder to watch")
+    w.add_argument('--curve', required=True, help="Standard curve name")
+    w.add_argument('--library', default=None, help="Standard curve library CSV")
+    w.add_argument('--guide', default=None, help="Guide file for data files without their own <name>_guide file")
+    w.add_argument('--out', default=None, help="Results folder (default: <inbox>/results)")
+    w.add_argument('--background', choices=list(BackgroundEngine.MODES), default=DEFAULT_BACKGROUND)
+    w.add_argument('--signal', choices=SIGNAL_FEATURES, default='peak')
+    w.add_argument('--smoothing', choices=list(SMOOTHING), default='median')
+    w.add_argument('--normalize', action='store_true',
+                   help="Scale each plate to its reference calibrator conditions before quantifying")
+    w.add_argument('--workers', type=int, default=None, help="Worker processes (default: number of CPUs)")
+    w.add_argument('--interval', type=float, default=2.0, help="Seconds between folder scans")
+    w.add_argument('--settle', type=float, default=2.0, help="Minimum file age in seconds before it is read")
+    w.add_argument('--pair-timeout', type=float, default=600.0, help="Seconds to wait for a guide file before failing")
+    w.add_argument('--once', action='store_true', help="Process the files present now and exit")
+
+    m = sub.add_parser('metrics', help="Z'-factor, S/B, CVs and replicate agreement of many plates")
+    m.add_argument('plates', nargs='+', help="Reader export files")
+    m.add_argument('--guide', required=True, help="Layout guide file applied to every plate")
+    m.add_argument('--signal', choices=SIGNAL_FEATURES, default='peak')
+    m.add_argument('--smoothing', choices=list(SMOOTHING), default='median')
+    for metric, (limit, higher) in THRESHOLDS.items():
+        m.add_argument(f"--{metric.replace('_', '-')}", type=float, default=limit,
+                       help=f"{'Minimum' if higher else 'Maximum'} {METRICS[metric].replace('%', '%%')} (default {limit:g})")
+    m.add_argument('--csv', help="Write the per-plate summary to this CSV file (per-condition CVs next to it)")
+
+    k = sub.add_parser('rank', help="Top concentrations across many plates")
+    k.add_argument('plates', nargs='+', help="Reader export files")
+    k.add_argument('--guide', required=True, help="Layout guide file applied to every plate")
+    k.add_argument('--curve', required=True, help="Standard curve name")
+    k.add_argument('--library', default=None, help="Standard curve library CSV")
+    k.add_argument('--top', type=int, default=100, help="Number of hits to keep")
+    k.add_argument('--level', choices=list(RANK_LEVELS), default='condition')
+    k.add_argument('--by', choices=list(RANK_VALUES), default='stock_conc')
+    k.add_argument('--in-range', action='store_true', help="Only values inside the curve's range")
+    k.add_argument('--qc-pass', action='store_true', help="Only wells (conditions) without QC flags")
+    k.add_argument('--min-replicates', type=int, default=1)
+    k.add_argument('--background', choices=list(BackgroundEngine.MODES), default=DEFAULT_BACKGROUND)
+    k.add_argument('--signal', choices=SIGNAL_FEATURES, default='peak')
+    k.add_argument('--smoothing', choices=list(SMOOTHING), default='median')
+    k.add_argument('--normalize', action='store_true', help="Scale each plate to its reference calibrators")
+    k.add_argument('--csv', help="Write the ranked hits to this CSV file instead of printing")
+
+    a = sub.add_parser('archive', help="Store plates in, list or export them from an experiment archive")
+    a_sub = a.add_subparsers(dest='action', required=True)
+    ai = a_sub.add_parser('import', help="Parse reader exports (files or folders) into the archive")
+    ai.add_argument('archive', help="Archive folder (created if missing)")
+    ai.add_argument('plates', nargs='+', help="Reader export files, or folders of them")
+    ai.add_argument('--guide', default=None, help="Guide file for data files without their own <name>_guide file")
+    ai.add_argument('--curve', default=None, help="Also quantify every plate with a layout against this curve")
+    ai.add_argument('--library', default=None, help="Standard curve library CSV")
+    ai.add_argument('--background', choices=list(BackgroundEngine.MODES), default=DEFAULT_BACKGROUND)
+    ai.add_argument('--signal', choices=SIGNAL_FEATURES, default='peak')
+    ai.add_argument('--smoothing', choices=list(SMOOTHING), default='median')
+    ai.add_argument('--compress-signals', action='store_true',
+                    help="Compress the raw signals of a new archive (smaller, but plates are not memory mapped)")
+    ai.add_argument('--workers', type=int, default=None, help="Worker processes (default: number of CPUs)")
+    ae = a_sub.add_parser('export', help="Write plates back out as CSVs with their guide, features and results")
+    ae.add_argument('archive', help="Archive folder")
+    ae.add_argument('out', help="Output folder")
+    ae.add_argument('--name', default=None, help="Plate name, %% and _ act as wildcards")
+    ae.add_argument('--since', default=None, help="First date added (YYYY-MM-DD)")
+    al = a_sub.add_parser('list', help="List the archived plates")
+    al.add_argument('archive', help="Archive folder")
+    al.add_argument('--name', default=None, help="Plate name, %% and _ act as wildcards")
+    al.add_argument('--since', default=None, help="First date added (YYYY-MM-DD)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'archive':
+        return run_archive(args)
+    if args.command == 'watch':
+        return run_watch(args)
+    if args.command == 'report':
+        return run_report(args)
+    if args.command == 'metrics':
+        return run_metrics(args)
+    if args.command == 'rank':
+        return run_rank(args)
+    if args.command == 'serve':
+        serve(args.host, args.port, args.workers, args.queue, args.library, args.cache, args.quiet)
+        return 0
+
+    db = ResultsDatabase(args.db)
+    try:
+        if args.command == 'query':
+            df = db.query(sample=args.sample, curve=args.curve, plate=args.plate, since=args.since,
+                          until=args.until, wells=args.wells, limit=args.limit)
+            if args.csv:
+                df.to_csv(args.csv, index=False)
+                print(f"Wrote {len(df)} rows to {args.csv}")
+            else:
+                print(df.to_string(index=False) if len(df) else "No results.")
+        else:
+            df = db.runs(limit=args.limit)
+            print(df.to_string(index=False) if len(df) else "No runs recorded.")
+    finally:
+        db.close()
+    return 0
+
+
+def run_watch(args):
+    curves = CurveLibrary(args.library).load()
+    if args.curve not in curves:
+        print(f"Unknown curve: {args.curve}")
+        return 1
+    if not os.path.isdir(args.inbox):
+        print(f"Not a folder: {args.inbox}")
+        return 1
+    watcher = watch(args.inbox, dict(curves[args.curve], Name=args.curve), once=args.once, out=args.out,
+                    default_guide=args.guide, background=args.background, feature=args.signal,
+                    smoothing=args.smoothing, normalize=args.normalize, workers=args.workers, interval=args.interval, settle=args.settle,
+                    pair_timeout=args.pair_timeout)
+    return 1 if args.once and watcher.failed else 0
+
+
+def run_metrics(args):
+    summary, conditions = assay_metrics(args.plates, args.guide, feature=args.signal, smoothing=args.smoothing,
+                                        thresholds={k: getattr(args, k) for k in THRESHOLDS})
+    if args.csv:
+        summary.to_csv(args.csv, index=False)
+        conditions.to_csv(os.path.splitext(args.csv)[0] + "_conditions.csv", index=False)
+        print(f"Wrote {len(summary)} plates to {args.csv}")
+    else:
+        print(summary.drop(columns=['pos_sd', 'neg_sd']).to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+    n_fail = int((~summary['pass']).sum())
+    print(f"{n_fail} of {len(summary)} plate(s) fail the thresholds.")
+    return 1 if n_fail else 0
+
+
+def run_rank(args):
+    curves = CurveLibrary(args.library).load()
+    if args.curve not in curves:
+        print(f"Unknown curve: {args.curve}")
+        return 1
+    ranker = rank_plates(args.plates, args.guide, dict(curves[args.curve], Name=args.curve), k=args.top,
+                         level=args.level, value=args.by, in_range_only=args.in_range, qc_pass_only=args.qc_pass,
+                         min_replicates=args.min_replicates, background=args.background, feature=args.signal,
+                         smoothing=args.smoothing, normalize=args.normalize)
+    if args.csv:
+        ranker.to_csv(args.csv)
+        print(f"Wrote {min(ranker.k, ranker.n_candidates)} hits to {args.csv}")
+    else:
+        print(ranker.ranked().to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+    print(f"{ranker.n_candidates} {args.level}s passed the filters across {ranker.n_plates} plate(s).")
+    return 0
+
+
+def data_files(paths):
+    """Files, with folders expanded to the reader exports in them (guide files left out)."""
+    out = []
+    for path in paths:
+        if not os.path.isdir(path):
+            out.append(path)
+            continue
+        for name in sorted(os.listdir(path)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() in DATA_EXTENSIONS and not stem.endswith(GUIDE_SUFFIX) and not name.startswith(('.', '~$')):
+                out.append(os.path.join(path, name))
+    return out
+
+
+def run_archive(args):
+    if args.action == 'import':
+        curve = None
+        if args.curve:
+            curves = CurveLibrary(args.library).load()
+            if args.curve not in curves:
+                print(f"Unknown curve: {args.curve}")
+                return 1
+            curve = dict(curves[args.curve], Name=args.curve)
+        with PlateArchive(args.archive, compress_signals=args.compress_signals) as archive:
+            _, _, failed = import_files(archive, data_files(args.plates), guide=args.guide, curve=curve,
+                                        background=args.background, feature=args.signal, smoothing=args.smoothing,
+                                        workers=args.workers)
+        return 1 if failed else 0
+
+    if not os.path.isdir(args.archive):
+        print(f"Not an archive: {args.archive}")
+        return 1
+    with PlateArchive(args.archive) as archive:
+        plates = archive.plates(name=args.name, since=args.since)
+        if args.action == 'list':
+            print(plates.drop(columns=['file_hash']).to_string(index=False) if len(plates) else "No plates archived.")
+            return 0
+        paths = export_plates(archive, args.out, set(plates['id']))
+    print(f"Exported {len(plates)} plate(s) ({len(paths)} files) to {args.out}")
+    return 0
+
+
+def run_report(args):
+    # Imported here so the other commands work without Matplotlib
+    from .report import FIGURES, plate_job, generate_report
+
+    figures = [f.strip() for f in args.figures.split(',') if f.strip()]
+    unknown = [f for f in figures if f not in FIGURES]
+    if unknown:
+        print(f"Unknown figure(s): {', '.join(unknown)} (choose from {', '.join(FIGURES)})")
+        return 1
+    conditions = DataParser.parse_guide_file(args.guide)
+    curve = None
+    if args.curve:
+        curves = CurveLibrary(args.library).load()
+        if args.curve not in curves:
+            print(f"Unknown curve: {args.curve}")
+            return 1
+        curve = curves[args.curve]
+    jobs = [plate_job(os.path.basename(p), path=p, conditions=conditions, curve=curve, background=args.background,
+                      fit_model=args.fit_model, stock=args.stock, feature=args.signal, smoothing=args.smoothing)
+            for p in args.plates]
+    result = generate_report(jobs, args.out, fmt=args.format, figures=figures, dpi=args.dpi,
+                             workers=args.workers, progress=lambda done, total: print(f"{done}/{total}", end='\r'))
+    print(f"Wrote {len(result['files'])} file(s).")
+    for name, error in result['errors'].items():
+        print(f"Failed: {name}: {error}")
+    return 1 if result['errors'] else 0
@@ -0,0 +1,154 @@
+"""Local SQLite store of quantification runs."""
+import os
+import json
+import sqlite3
+import hashlib
+from datetime import datetime
+
+import pandas as pd
+
+
+class ResultsDatabase:
+    """Local SQLite store of every quantification run for cross-experiment queries."""
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".hibitquant", "results.db")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            run_key TEXT UNIQUE,
+            plate_id TEXT,
+            file_name TEXT,
+            file_hash TEXT,
+            curve TEXT,
+            model TEXT,
+            params TEXT,
+            run_date TEXT,
+            created TEXT
+        );
+        CREATE TABLE IF NOT EXISTS condition_results (
+            run_id INTEGER REFERENCES runs(id) ON DELETE CASCADE,
+            sample TEXT,
+            dilution REAL,
+            n_wells INTEGER,
+            mean_rlu REAL,
+            conc REAL,
+            std REAL,
+            ci_low REAL,
+            ci_high REAL,
+            stock_conc REAL,
+            in_range INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS well_results (
+            run_id INTEGER REFERENCES runs(id) ON DELETE CASCADE,
+            well TEXT,
+            sample TEXT,
+            peak_rlu REAL,
+            conc REAL,
+            stock_conc REAL,
+            qc_flag TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_cond_sample ON condition_results(sample);
+        CREATE INDEX IF NOT EXISTS idx_cond_run ON condition_results(run_id);
+        CREATE INDEX IF NOT EXISTS idx_well_run ON well_results(run_id);
+        CREATE INDEX IF NOT EXISTS idx_well_sample ON well_results(sample);
+        CREATE INDEX IF NOT EXISTS idx_runs_date ON runs(run_date);
+        CREATE INDEX IF NOT EXISTS idx_runs_curve ON runs(curve);
+        CREATE INDEX IF NOT EXISTS idx_runs_hash ON runs(file_hash);
+    """
+
+    CONDITION_COLUMNS = ['sample', 'dilution', 'n_wells', 'mean_rlu', 'conc', 'std',
+                         'ci_low', 'ci_high', 'stock_conc', 'in_range']
+    WELL_COLUMNS = ['well', 'sample', 'peak_rlu', 'conc', 'stock_conc', 'qc_flag']
+
+    def __init__(self, path=None):
+        self.path = path or ResultsDatabase.DEFAULT_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(ResultsDatabase.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def file_hash(path):
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    def record_run(self, run, conditions, wells):
+        """Stores one run with its per-condition and per-well results in one transaction.
+
+        `run` holds plate_id, file_name, file_hash, curve, model, params (dict)
+        and run_date; `conditions`/`wells` are DataFrames with
+        CONDITION_COLUMNS/WELL_COLUMNS. A run with identical inputs replaces the
+        earlier copy instead of duplicating it. Returns the run id.
+        """
+        params = json.dumps(run.get('params', {}), sort_keys=True, default=float)
+        key_src = json.dumps([run.get('file_hash'), run.get('plate_id'), run.get('curve'), params,
+                              conditions[ResultsDatabase.CONDITION_COLUMNS].astype(str).values.tolist()])
+        run_key = hashlib.sha256(key_src.encode()).hexdigest()
+
+        def rows(df, columns):
+            out = df[columns].astype(object)
+            return out.where(pd.notna(out), None).values.tolist()
+
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE run_key = ?", (run_key,))
+            cur = self.conn.execute(
+                "INSERT INTO runs (run_key, plate_id, file_name, file_hash, curve, model, params, run_date, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_key, run.get('plate_id'), run.get('file_name'), run.get('file_hash'), run.get('curve'),
+                 run.get('model'), params, run.get('run_date'), datetime.now().isoformat(timespec='seconds')))
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                f"INSERT INTO condition_results (run_id, {', '.join(ResultsDatabase.CONDITION_COLUMNS)}) "
+                f"VALUES (?{', ?' * len(ResultsDatabase.CONDITION_COLUMNS)})",
+                [[run_id] + r for r in rows(conditions, ResultsDatabase.CONDITION_COLUMNS)])
+            self.conn.executemany(
+                f"INSERT INTO well_results (run_id, {', '.join(ResultsDatabase.WELL_COLUMNS)}) "
+                f"VALUES (?{', ?' * len(ResultsDatabase.WELL_COLUMNS)})",
+                [[run_id] + r for r in rows(wells, ResultsDatabase.WELL_COLUMNS)])
+        return run_id
+
+    def query(self, sample=None, curve=None, since=None, until=None, plate=None, wells=False, limit=None):
+        """Results joined with their run metadata, newest first.
+
+        `sample` and `plate` match exactly unless they contain % or _ wildcards;
+        `since`/`until` are ISO dates compared against the run date.
+        """
+        table = 'well_results' if wells else 'condition_results'
+        clauses, args = [], []
+        for column, value in [('r.sample', sample), ('runs.plate_id', plate)]:
+            if value:
+                clauses.append(f"{column} {'LIKE' if ('%' in value or '_' in value) else '='} ?")
+                args.append(value)
+        if curve:
+            clauses.append("runs.curve = ?")
+            args.append(curve)
+        if since:
+            clauses.append("runs.run_date >= ?")
+            args.append(since)
+        if until:
+            clauses.append("runs.run_date <= ?")
+            args.append(until + "T23:59:59" if len(until) == 10 else until)
+        sql = (f"SELECT runs.id AS run_id, runs.run_date, runs.plate_id, runs.file_name, runs.curve, r.* "
+               f"FROM {table} r JOIN runs ON runs.id = r.run_id")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY runs.run_date DESC, runs.id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        df = pd.read_sql_query(sql, self.conn, params=args)
+        return df.loc[:, ~df.columns.duplicated()]
+
+    def runs(self, limit=None):
+        sql = "SELECT id, run_date, plate_id, file_name, file_hash, curve, model, created FROM runs ORDER BY run_date DESC, id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(sql, self.conn)
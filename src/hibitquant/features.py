@@ -0,0 +1,150 @@
+"""Per-well kinetic features and plate-shaped (row x column) views of them."""
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import savgol_filter
+
+WELL_PATTERN = re.compile(r'^([A-Z]{1,2})([0-9]{1,2})$')
+PLATE_SHAPES = {96: (8, 12), 384: (16, 24), 1536: (32, 48)}
+
+FEATURES = {
+    'peak': "Peak RLU",
+    'smoothed_peak': "Smoothed Peak RLU",
+    'plateau': "Plateau Mean RLU",
+    'auc': "AUC (RLU·min)",
+    'time_to_peak': "Time to Peak (min)",
+    'decay_rate': "Decay Rate (1/min)",
+}
+SIGNAL_FEATURES = ['peak', 'smoothed_peak', 'plateau', 'auc'] # Scale with the amount of HiBit; can drive quantification
+SMOOTHING = {'median': "Rolling Median", 'savgol': "Savitzky-Golay", 'none': "None"}
+SMOOTH_WINDOW = 5
+PLATEAU_FRACTION = 0.9
+
+
+def row_index(letters):
+    """A..Z -> 0..25, AA..AF -> 26..31 (1536-well rows)."""
+    if len(letters) == 1:
+        return ord(letters) - 65
+    return 26 * (ord(letters[0]) - 64) + ord(letters[1]) - 65
+
+
+def row_label(index):
+    return chr(65 + index) if index < 26 else chr(64 + index // 26) + chr(65 + index % 26)
+
+
+def well_positions(wells):
+    """(rows, cols) zero-based index arrays of well IDs; unparseable IDs get -1."""
+    rows = np.full(len(wells), -1)
+    cols = np.full(len(wells), -1)
+    for i, well in enumerate(wells):
+        m = WELL_PATTERN.match(well)
+        if m:
+            rows[i] = row_index(m.group(1))
+            cols[i] = int(m.group(2)) - 1
+    return rows, cols
+
+
+def plate_format(wells):
+    """Smallest standard plate format (96/384/1536) that contains every well."""
+    rows, cols = well_positions(list(wells))
+    for fmt, (n_rows, n_cols) in PLATE_SHAPES.items():
+        if rows.max(initial=0) < n_rows and cols.max(initial=0) < n_cols:
+            return fmt
+    return 1536
+
+
+def plate_matrix(wells, values, fmt=None):
+    """Scatters per-well values into a NaN-filled (rows, cols) plate matrix in one assignment."""
+    wells = list(wells)
+    n_rows, n_cols = PLATE_SHAPES[fmt or plate_format(wells)]
+    rows, cols = well_positions(wells)
+    values = np.asarray(values, dtype=float)
+    ok = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+    mat = np.full((n_rows, n_cols), np.nan)
+    mat[rows[ok], cols[ok]] = values[ok]
+    return mat
+
+
+def smooth(X, method='median', window=SMOOTH_WINDOW):
+    """Smooths every column of a (time x wells) matrix along time.
+
+    'median' is a centred rolling median (NaN-aware, edges padded with the
+    first/last read), 'savgol' a quadratic Savitzky-Golay filter of the same
+    window (missing reads are filled with the rolling median first). The
+    window shrinks to the number of reads; below 3 reads nothing is smoothed.
+    """
+    X = np.asarray(X, dtype=float)
+    if method not in SMOOTHING:
+        raise ValueError(f"Unknown smoothing method: {method}")
+    n = len(X)
+    window = min(window, n if n % 2 else n - 1)
+    if method == 'none' or window < 3:
+        return X.copy()
+    half = window // 2
+    windows = sliding_window_view(np.pad(X, ((half, half), (0, 0)), mode='edge'), window, axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning) # all-NaN windows
+        med = np.nanmedian(windows, axis=-1)
+    if method == 'median':
+        return med
+    filled = np.where(np.isfinite(X), X, med)
+    return savgol_filter(filled, window, 2, axis=0, mode='interp')
+
+
+def well_features(df, smoothing='median', window=SMOOTH_WINDOW):
+    """Kinetic feature table of every well of a plate, indexed by well (columns: FEATURES).
+
+    peak: maximum raw RLU. smoothed_peak / time_to_peak: maximum of the
+    smoothed trace (see `smooth`) and its time. plateau: mean of the
+    smoothed trace where it is within PLATEAU_FRACTION of its peak. auc:
+    trapezoidal area under the raw trace (intervals next to a missing read
+    are skipped). decay_rate: k of a log-linear fit y ~ exp(-k t) to the
+    positive smoothed reads after the peak (needs 3 reads).
+
+    Every feature is computed for all wells at once on the (time x wells)
+    matrix; there is no per-well Python loop.
+    """
+    wells = [c for c in df.columns if c != 'Time']
+    X = df[wells].to_numpy(dtype=float)
+    t = df['Time'].to_numpy(dtype=float)
+    if not len(X):
+        return pd.DataFrame(np.nan, index=wells, columns=list(FEATURES))
+    cols = np.arange(len(wells))
+    finite = np.isfinite(X)
+    peak = np.where(finite.any(axis=0), np.where(finite, X, -np.inf).max(axis=0), np.nan)
+
+    S = smooth(X, smoothing, window)
+    s_finite = np.isfinite(S)
+    s_has = s_finite.any(axis=0)
+    idx = np.where(s_finite, S, -np.inf).argmax(axis=0)
+    s_peak = np.where(s_has, S[idx, cols], np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        near = s_finite & (S >= PLATEAU_FRACTION * s_peak)
+        plateau = np.where(near, S, 0.0).sum(axis=0) / near.sum(axis=0)
+
+        pair = finite[1:] & finite[:-1]
+        area = np.where(pair, np.diff(t)[:, None] * (X[1:] + X[:-1]) / 2, 0.0).sum(axis=0)
+        auc = np.where(pair.any(axis=0), area, np.nan)
+
+        # Weighted least squares of log(S) on t over the reads after the peak, for all wells at once
+        after = (np.arange(len(t))[:, None] > idx) & s_finite & (S > 0)
+        w = after.astype(float)
+        y = np.log(np.where(after, S, 1.0))
+        T = t[:, None]
+        n, st, sy = w.sum(axis=0), (w * T).sum(axis=0), (w * y).sum(axis=0)
+        stt, sty = (w * T * T).sum(axis=0), (w * T * y).sum(axis=0)
+        slope = (n * sty - st * sy) / (n * stt - st ** 2)
+    decay = np.where(n >= 3, -slope, np.nan)
+
+    return pd.DataFrame({
+        'peak': peak,
+        'smoothed_peak': s_peak,
+        'plateau': plateau,
+        'auc': auc,
+        'time_to_peak': np.where(s_has, t[idx], np.nan),
+        'decay_rate': decay,
+    }, index=wells)
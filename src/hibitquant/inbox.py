@@ -0,0 +1,236 @@
+"""Inbox folder processing (`python -m hibitquant watch <inbox>`).
+
+Reader exports dropped into the inbox are paired with their guide file by
+name: `plate7.csv` is processed with `plate7_guide.xlsx` (or .csv), or with
+the default guide when it has none. Each pair is parsed, QC'd, blank
+corrected, quantified and exported as CSVs in a process pool; at most a few
+pairs per worker are in flight so a burst of files does not pile up in
+memory. Processed files are moved to done/ or failed/ (with a .error.txt
+note), and every file's queue wait and stage timings are printed and
+appended to processing_log.csv in the output folder.
+
+The watcher polls the folder from an asyncio loop. A file is picked up once
+its size and modification time are unchanged between two scans and it is
+at least `settle` seconds old, so exports still being written are skipped.
+"""
+import os
+import csv
+import time
+import shutil
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from .background import DEFAULT_BACKGROUND
+from .parser import DataParser
+from .pipeline import quantify_plate
+
+DATA_EXTENSIONS = ('.csv', '.xlsx', '.xls', '.txt')
+GUIDE_SUFFIX = '_guide'
+GUIDE_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+LOG_COLUMNS = ['finished', 'file', 'guide', 'status', 'queue_ms', 'parse_ms', 'layout_ms', 'quantify_ms',
+               'export_ms', 'total_ms', 'error']
+
+
+def _ignored(name):
+    """Hidden, temporary and Office lock files."""
+    return name.startswith(('.', '~$')) or name.endswith(('.tmp', '.part', '.crdownload'))
+
+
+def export_result(result, out_dir, stem):
+    """Writes <stem>_conditions.csv, <stem>_wells.csv and <stem>_samples.csv; returns their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for part, df in [('conditions', result.conditions), ('wells', result.wells), ('samples', result.samples)]:
+        path = os.path.join(out_dir, f"{stem}_{part}.csv")
+        df.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def process_pair(job):
+    """Parse -> layout -> QC/quantify -> export for one data file (runs in a worker)."""
+    started = time.time()
+    timings = {'queue': started - job['queued']}
+    t0 = time.perf_counter()
+
+    def lap(stage):
+        nonlocal t0
+        now = time.perf_counter()
+        timings[stage] = now - t0
+        t0 = now
+
+    try:
+        df = DataParser.parse_file(job['path'])
+        lap('parse')
+        conditions = job['conditions'] or DataParser.parse_guide_file(job['guide'])
+        if not conditions:
+            raise ValueError("The guide file defines no conditions.")
+        lap('layout')
+        result = quantify_plate(df, conditions, job['curve'], background=job['background'],
+                                qc_settings=job['qc_settings'], feature=job['feature'], smoothing=job['smoothing'],
+                                normalize=job['normalize'])
+        if not result.valid:
+            raise ValueError("The standard curve is flat (m = 0).")
+        lap('quantify')
+        files = export_result(result, job['out'], job['stem'])
+        lap('export')
+        return {'ok': True, 'timings': timings, 'files': files, 'total': time.time() - started}
+    except Exception as e:
+        return {'ok': False, 'timings': timings, 'error': f"{type(e).__name__}: {e}", 'total': time.time() - started}
+
+
+class InboxWatcher:
+    """Watches `inbox` and processes every data file that has a guide.
+
+    `curve` is a curve library row used for all plates. Results go to `out`
+    (default <inbox>/results); data files without a guide fail after
+    `pair_timeout` seconds. The default guide is read once, at start. With
+    `normalize`, plates without a usable calibrator condition fail.
+    """
+
+    def __init__(self, inbox, curve, out=None, default_guide=None, background=DEFAULT_BACKGROUND, qc_settings=None,
+                 feature='peak', smoothing='median', normalize=False, workers=None, interval=2.0, settle=2.0, pair_timeout=600.0,
+                 log=print):
+        self.inbox = os.path.abspath(inbox)
+        self.out = os.path.abspath(out or os.path.join(self.inbox, 'results'))
+        self.done_dir = os.path.join(self.inbox, 'done')
+        self.failed_dir = os.path.join(self.inbox, 'failed')
+        self.curve = dict(curve)
+        self.default_guide = default_guide
+        self.default_conditions = DataParser.parse_guide_file(default_guide) if default_guide else None
+        self.settings = {'background': background, 'qc_settings': qc_settings, 'feature': feature,
+                         'smoothing': smoothing, 'normalize': normalize}
+        self.workers = workers or os.cpu_count() or 1
+        self.interval = interval
+        self.settle = settle
+        self.pair_timeout = pair_timeout
+        self.log = log
+        self._seen = {} # file name -> (size, mtime) at the last scan
+        self._busy = set() # file names of pairs being processed
+        self.processed = 0
+        self.failed = 0
+
+    # --- Scanning and pairing ---
+    def scan(self, once=False):
+        """Jobs for the data files that are complete and paired; fails files whose guide never arrived."""
+        now = time.time()
+        files = {}
+        with os.scandir(self.inbox) as it:
+            for entry in it:
+                if entry.is_file() and not _ignored(entry.name):
+                    st = entry.stat()
+                    files[entry.name] = (st.st_size, st.st_mtime)
+        ready = {name for name, sig in files.items()
+                 if (once or self._seen.get(name) == sig) and now - sig[1] >= self.settle}
+        self._seen = files
+
+        jobs = []
+        for name in sorted(ready - self._busy):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in DATA_EXTENSIONS or stem.endswith(GUIDE_SUFFIX):
+                continue
+            guides = [stem + GUIDE_SUFFIX + g for g in GUIDE_EXTENSIONS if stem + GUIDE_SUFFIX + g in files]
+            if guides:
+                if guides[0] not in ready or guides[0] in self._busy:
+                    continue # Still being written
+                guide, own_guide, conditions = os.path.join(self.inbox, guides[0]), guides[0], None
+            elif self.default_guide:
+                guide, own_guide, conditions = self.default_guide, None, self.default_conditions
+            else:
+                if now - files[name][1] >= self.pair_timeout:
+                    self.finish(name, None, {'ok': False, 'timings': {}, 'total': 0.0,
+                                             'error': f"No guide file ({stem}{GUIDE_SUFFIX}.xlsx/.csv) arrived."})
+                continue
+            self._busy.update(n for n in (name, own_guide) if n)
+            jobs.append(dict(self.settings, name=name, own_guide=own_guide, path=os.path.join(self.inbox, name),
+                             guide=guide, conditions=conditions, stem=stem, curve=self.curve, out=self.out,
+                             queued=time.time()))
+        return jobs
+
+    # --- Bookkeeping ---
+    def _move(self, name, folder):
+        os.makedirs(folder, exist_ok=True)
+        dest = os.path.join(folder, name)
+        if os.path.exists(dest):
+            stem, ext = os.path.splitext(name)
+            dest = os.path.join(folder, f"{stem}_{datetime.now():%Y%m%d-%H%M%S-%f}{ext}")
+        shutil.move(os.path.join(self.inbox, name), dest)
+        return dest
+
+    def finish(self, name, own_guide, res):
+        """Moves a processed pair to done/ or failed/ and logs its timings."""
+        folder = self.done_dir if res['ok'] else self.failed_dir
+        data_dest = os.path.join(folder, name)
+        for n in (name, own_guide):
+            if n:
+                try:
+                    dest = self._move(n, folder)
+                    if n == name:
+                        data_dest = dest
+                except OSError as e:
+                    self.log(f"Could not move {n}: {e}")
+                self._busy.discard(n)
+        if res['ok']:
+            self.processed += 1
+        else:
+            self.failed += 1
+            # Named after the moved data file, which gets a timestamp if the name was taken
+            with open(os.path.splitext(data_dest)[0] + '.error.txt', 'w', encoding='utf-8') as f:
+                f.write(res['error'] + '\n')
+
+        ms = {k: round(v * 1000, 1) for k, v in res['timings'].items()}
+        stages = "".join(f"{k} {v:g} ms, " for k, v in ms.items())
+        status = "done" if res['ok'] else "FAILED"
+        self.log(f"[{datetime.now():%H:%M:%S}] {status} {name} ({stages}total {res['total'] * 1000:.0f} ms)"
+                 + ("" if res['ok'] else f": {res['error']}"))
+        os.makedirs(self.out, exist_ok=True)
+        log_path = os.path.join(self.out, 'processing_log.csv')
+        new = not os.path.exists(log_path)
+        with open(log_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new:
+                writer.writerow(LOG_COLUMNS)
+            writer.writerow([datetime.now().isoformat(timespec='seconds'), name, own_guide or self.default_guide or '',
+                             status, ms.get('queue', ''), ms.get('parse', ''), ms.get('layout', ''),
+                             ms.get('quantify', ''), ms.get('export', ''), round(res['total'] * 1000, 1),
+                             res.get('error', '')])
+
+    # --- Loop ---
+    async def _run_job(self, pool, slots, job):
+        try:
+            res = await asyncio.get_running_loop().run_in_executor(pool, process_pair, job)
+        except Exception as e: # e.g. a worker process died
+            res = {'ok': False, 'timings': {}, 'total': 0.0, 'error': f"{type(e).__name__}: {e}"}
+        finally:
+            slots.release()
+        self.finish(job['name'], job['own_guide'], res)
+
+    async def run(self, once=False):
+        """Processes the inbox until cancelled; with `once`, stops when the files present now are done."""
+        slots = asyncio.Semaphore(2 * self.workers) # Pairs submitted but not finished
+        tasks = set()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                for job in self.scan(once):
+                    await slots.acquire()
+                    task = asyncio.create_task(self._run_job(pool, slots, job))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if once:
+                    if tasks:
+                        await asyncio.gather(*tasks)
+                    return
+                await asyncio.sleep(self.interval)
+
+
+def watch(inbox, curve, once=False, **kwargs):
+    """Runs an InboxWatcher until interrupted (or once over the current files)."""
+    watcher = InboxWatcher(inbox, curve, **kwargs)
+    watcher.log(f"Watching {watcher.inbox} ({watcher.workers} workers); results in {watcher.out}")
+    try:
+        asyncio.run(watcher.run(once))
+    except KeyboardInterrupt:
+        pass
+    watcher.log(f"Processed {watcher.processed} file(s), {watcher.failed} failed.")
+    return watcher
@@ -0,0 +1,105 @@
+"""Standard curve library and its version history."""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .quant import CURVE_MODELS, CURVE_PARAMS, QuantEngine
+from .resources import resource_path
+
+
+class CurveLibrary:
+    """The standard curve library (HiBit_quant_standard_curve.csv) plus its version history.
+
+    Loaded curves are cached per file and only re-read when the file changes
+    on disk. Every save appends a row to the history file so that slope and
+    intercept drift can be tracked across calibrations.
+    """
+
+    FILE_NAME = "HiBit_quant_standard_curve.csv"
+    HISTORY_NAME = "HiBit_quant_standard_curve_history.csv"
+    COLUMNS = ['Name', 'm', 'b', 'r^2', 'Low', 'High', 'Notes', 'Model'] + CURVE_PARAMS
+    _cache = {} # path -> (mtime, curves)
+
+    def __init__(self, path=None):
+        self.path = path or resource_path(CurveLibrary.FILE_NAME)
+        self.history_path = os.path.join(os.path.dirname(self.path), CurveLibrary.HISTORY_NAME)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Curves as {name: row dict}, newest (last in file) first. Raises OSError/ValueError on bad files."""
+        mtime = os.path.getmtime(self.path)
+        cached = CurveLibrary._cache.get(self.path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        df = pd.read_csv(self.path, encoding='utf-8-sig')
+        if 'Name' not in df.columns:
+            raise ValueError(f"{self.path} has no 'Name' column.")
+        df['Name'] = df['Name'].astype(str)
+        records = df.iloc[::-1].to_dict('records')
+        curves = {rec['Name']: rec for rec in records}
+        CurveLibrary._cache[self.path] = (mtime, curves)
+        return curves
+
+    def history(self, name=None):
+        """All saved versions, oldest first. Curves that predate the history appear as version 1."""
+        if os.path.exists(self.history_path):
+            hist = pd.read_csv(self.history_path, encoding='utf-8-sig')
+        else:
+            hist = pd.DataFrame(columns=['Version', 'Saved'] + CurveLibrary.COLUMNS)
+        hist['Name'] = hist['Name'].astype(str)
+        if self.exists():
+            tracked = set(hist['Name'])
+            missing = [c for n, c in self.load().items() if n not in tracked]
+            if missing:
+                seed = pd.DataFrame(missing)
+                seed['Version'] = 1
+                seed['Saved'] = datetime.fromtimestamp(os.path.getmtime(self.path)).isoformat(timespec='seconds')
+                hist = pd.concat([seed, hist], ignore_index=True) if len(hist) else seed
+        if name is not None:
+            hist = hist[hist['Name'] == name]
+        return hist.sort_values(['Name', 'Version'], kind='stable').reset_index(drop=True)
+
+    def save_curve(self, curve):
+        """Adds or replaces a curve in the library and appends it to the history. Returns its version."""
+        curve = {k: v for k, v in curve.items() if k in CurveLibrary.COLUMNS or k.endswith('_SE')}
+        name = str(curve['Name'])
+        history = self.history()
+        prior = history[history['Name'] == name]
+        version = int(prior['Version'].max()) + 1 if len(prior) else 1
+        saved = datetime.now().isoformat(timespec='seconds')
+
+        row = pd.DataFrame([curve])
+        hist_row = row.assign(Version=version, Saved=saved)
+        hist = pd.concat([history, hist_row], ignore_index=True) if len(history) else hist_row
+        lead = ['Version', 'Saved'] + CurveLibrary.COLUMNS
+        hist = hist[lead + [c for c in hist.columns if c not in lead]]
+        hist.to_csv(self.history_path, index=False, encoding='utf-8-sig')
+
+        if self.exists():
+            lib = pd.read_csv(self.path, encoding='utf-8-sig')
+            lib = lib[lib['Name'].astype(str) != name]
+            lib = pd.concat([lib, row], ignore_index=True)
+        else:
+            lib = row
+        lib = lib[[c for c in CurveLibrary.COLUMNS if c in lib.columns] + [c for c in lib.columns if c not in CurveLibrary.COLUMNS]]
+        lib.to_csv(self.path, index=False, encoding='utf-8-sig')
+        CurveLibrary._cache.pop(self.path, None)
+        return version
+
+    def drift(self, name):
+        """Parameter values of every version of a curve and their % change from version 1."""
+        hist = self.history(name)
+        model = CURVE_MODELS[QuantEngine.model_code(hist['Model'].iloc[-1] if len(hist) and 'Model' in hist else 'Linear')]
+        params = ['m', 'b'] if model in ('Linear', 'Log-Log') else CURVE_PARAMS[:4 if model == '4PL' else 5]
+        out = hist[['Version', 'Saved']].copy()
+        for p in params:
+            vals = pd.to_numeric(hist[p], errors='coerce') if p in hist else pd.Series(np.nan, index=hist.index)
+            out[p] = vals
+            base = vals.iloc[0] if len(vals) else np.nan
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out[f"{p} Change (%)"] = 100 * (vals - base) / abs(base) if base else np.nan
+        return out, params
@@ -0,0 +1,133 @@
+"""Plate-level assay quality metrics for screening batches.
+
+Controls come from the layout: negative controls are blank conditions (or
+names starting with 'neg'), positive controls are reference calibrators (or
+names starting with 'pos'); every other condition is a sample.
+
+    z_prime             1 - 3 (sd_pos + sd_neg) / |mean_pos - mean_neg|, pooled over the control wells
+    signal_background   mean_pos / mean_neg
+    median_cv, max_cv   replicate CV (%) of the sample conditions with 2+ wells
+    icc                 one-way intraclass correlation of the sample replicates (replicate agreement:
+                        the share of the signal variance that lies between conditions, not within them)
+
+Metrics are computed on the raw (not blank-subtracted) well signal so S/B
+keeps its meaning. All plates of a batch are reduced together from flat
+per-well arrays with bincount, so the cost grows linearly with the number
+of wells and there is no loop over plates or conditions.
+"""
+import numpy as np
+import pandas as pd
+
+POSITIVE_PREFIXES = ('pos',)
+NEGATIVE_PREFIXES = ('neg',)
+ROLES = ['sample', 'positive', 'negative']
+
+METRICS = {
+    'z_prime': "Z'-factor",
+    'signal_background': "S/B",
+    'median_cv': "Median CV (%)",
+    'max_cv': "Max CV (%)",
+    'icc': "Replicate ICC",
+}
+# Metric -> (pass threshold, True if higher is better)
+THRESHOLDS = {'z_prime': (0.5, True), 'signal_background': (3.0, True), 'median_cv': (20.0, False), 'icc': (0.8, True)}
+
+
+class AssayMetrics:
+    """Z'-factor, S/B, replicate CVs and replicate agreement of many plates at once."""
+
+    @staticmethod
+    def control_roles(conditions):
+        """Role index (see ROLES) of every condition."""
+        roles = np.zeros(len(conditions), dtype=int)
+        for i, c in enumerate(conditions):
+            name = str(c['name']).strip().lower()
+            if c.get('blank') or name.startswith(NEGATIVE_PREFIXES):
+                roles[i] = 2
+            elif c.get('calibrator') or name.startswith(POSITIVE_PREFIXES):
+                roles[i] = 1
+        return roles
+
+    @staticmethod
+    def _moments(values, idx, n):
+        """NaN-aware (count, mean, sample sd) of `values` per group `idx` (0..n-1)."""
+        ok = np.isfinite(values)
+        count = np.bincount(idx, weights=ok, minlength=n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(idx, weights=np.where(ok, values, 0.0), minlength=n) / count
+            dev2 = np.where(ok, (values - mean[idx]) ** 2, 0.0)
+            ss = np.bincount(idx, weights=dev2, minlength=n)
+            sd = np.sqrt(ss / (count - 1))
+        return count, mean, np.where(count >= 2, sd, np.nan), ss
+
+    @staticmethod
+    def compute(peaks, group, group_plate, group_role, names):
+        """Summary (one row per plate) and condition (one row per condition) tables.
+
+        `peaks` are well signals and `group` their condition, numbered
+        across the whole batch; `group_plate` and `group_role` give each
+        condition's plate position and role, `names` the plate names.
+        Metrics that cannot be computed (e.g. no controls) are NaN.
+        """
+        peaks = np.asarray(peaks, dtype=float)
+        group = np.asarray(group, dtype=int)
+        group_plate = np.asarray(group_plate, dtype=int)
+        group_role = np.asarray(group_role, dtype=int)
+        n_plates, n_groups = len(names), len(group_plate)
+        well_plate = group_plate[group]
+
+        n, mean, sd, ss = AssayMetrics._moments(peaks, group, n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cv = 100 * sd / np.abs(mean)
+
+        summary = {'plate': list(names),
+                   'n_wells': np.bincount(well_plate, weights=np.isfinite(peaks), minlength=n_plates).astype(int)}
+        ctrl = {}
+        for role in (1, 2):
+            # Control wells are pooled per plate: one mean/sd over all positive (negative) wells
+            in_role = group_role[group] == role
+            _, ctrl[role], ctrl_sd, _ = AssayMetrics._moments(np.where(in_role, peaks, np.nan), well_plate, n_plates)
+            summary[f"{ROLES[role][:3]}_mean"] = ctrl[role]
+            summary[f"{ROLES[role][:3]}_sd"] = ctrl_sd
+        with np.errstate(invalid='ignore', divide='ignore'):
+            summary['z_prime'] = 1 - 3 * (summary['pos_sd'] + summary['neg_sd']) / np.abs(ctrl[1] - ctrl[2])
+            summary['signal_background'] = ctrl[1] / ctrl[2]
+
+        # Replicate statistics over the sample conditions with 2+ wells
+        rep = (group_role == 0) & (n >= 2)
+        cvs = pd.Series(cv[rep]).groupby(group_plate[rep]).agg(['median', 'max']).reindex(range(n_plates))
+        summary['median_cv'] = cvs['median'].to_numpy()
+        summary['max_cv'] = cvs['max'].to_numpy()
+
+        a = np.bincount(group_plate, weights=rep, minlength=n_plates)
+        total = np.bincount(group_plate, weights=np.where(rep, n, 0.0), minlength=n_plates)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            grand = np.bincount(group_plate, weights=np.where(rep, n * mean, 0.0), minlength=n_plates) / total
+            ssb = np.bincount(group_plate, weights=np.where(rep, n * (mean - grand[group_plate]) ** 2, 0.0),
+                              minlength=n_plates)
+            ssw = np.bincount(group_plate, weights=np.where(rep, ss, 0.0), minlength=n_plates)
+            n0 = (total - np.bincount(group_plate, weights=np.where(rep, n ** 2, 0.0), minlength=n_plates) / total) / (a - 1)
+            msb, msw = ssb / (a - 1), ssw / (total - a)
+            icc = (msb - msw) / (msb + (n0 - 1) * msw)
+        summary['icc'] = np.where(a >= 2, icc, np.nan)
+
+        conditions = pd.DataFrame({'plate': np.asarray(names, dtype=object)[group_plate],
+                                   'role': np.asarray(ROLES, dtype=object)[group_role],
+                                   'n_wells': n.astype(int), 'mean': mean, 'sd': sd, 'cv': cv})
+        return pd.DataFrame(summary), conditions
+
+    @staticmethod
+    def flag(summary, thresholds=None):
+        """Adds 'pass' and 'flags' (failed checks) to a summary table; NaN metrics are not checked.
+
+        `thresholds` overrides THRESHOLDS values: {metric: value}.
+        """
+        limits = {k: (thresholds or {}).get(k, v[0]) for k, v in THRESHOLDS.items()}
+        flags = np.array([''] * len(summary), dtype=object)
+        for metric, limit in limits.items():
+            val = summary[metric].to_numpy(dtype=float)
+            higher = THRESHOLDS[metric][1]
+            failed = np.isfinite(val) & ((val < limit) if higher else (val > limit))
+            label = f"{METRICS[metric]} {'<' if higher else '>'} {limit:g}"
+            flags[failed] = [f"{f}, {label}" if f else label for f in flags[failed]]
+        return summary.assign(**{'pass': flags == '', 'flags': flags})
@@ -0,0 +1,193 @@
+"""Plain data classes for plates, layouts, curves and results.
+
+The engines work on DataFrames, condition dicts and curve library rows; these
+classes are thin typed wrappers that convert to and from those forms.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .features import well_features
+from .parser import DataParser
+from .quant import CURVE_PARAMS, CURVE_MODELS, QuantEngine
+
+
+@dataclass
+class Plate:
+    """One plate read: `values` is (n_times, n_wells) with columns in `wells`.
+
+    Endpoint reads have a single time point; attrs['format'] names the reader format.
+    """
+    time: np.ndarray
+    wells: list
+    values: np.ndarray
+    name: str = "plate"
+    path: Optional[str] = None
+    attrs: dict = field(default_factory=dict)
+    _features: dict = field(default_factory=dict, init=False, repr=False, compare=False) # smoothing -> table
+
+    @classmethod
+    def from_file(cls, path, fmt=None):
+        return cls.from_dataframe(DataParser.parse_file(path, fmt), name=os.path.basename(path), path=path)
+
+    @classmethod
+    def from_dataframe(cls, df, name="plate", path=None):
+        wells = [c for c in df.columns if c != 'Time']
+        return cls(df['Time'].to_numpy(dtype=float), wells, df[wells].to_numpy(dtype=float),
+                   name=name, path=path, attrs=dict(df.attrs))
+
+    def to_dataframe(self):
+        df = pd.DataFrame(np.asarray(self.values, dtype=float), columns=list(self.wells))
+        df.insert(0, 'Time', np.asarray(self.time, dtype=float))
+        df.attrs = dict(self.attrs)
+        return df
+
+    def peaks(self):
+        """Peak RLU per well (NaN for wells without reads)."""
+        X = np.asarray(self.values, dtype=float)
+        out = np.full(X.shape[1], np.nan)
+        has = np.isfinite(X).any(axis=0)
+        out[has] = np.nanmax(X[:, has], axis=0)
+        return out
+
+    def features(self, smoothing='median'):
+        """Kinetic feature table (see well_features), computed once per smoothing method."""
+        if smoothing not in self._features:
+            self._features[smoothing] = well_features(self.to_dataframe(), smoothing)
+        return self._features[smoothing]
+
+
+@dataclass
+class Condition:
+    name: str
+    wells: list
+    dilution: float = 1.0
+    conc: Optional[float] = None
+    blank: bool = False
+    calibrator: bool = False
+    color: Optional[str] = None
+    id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(name=d['name'], wells=list(d['wells']), dilution=d.get('dilution', 1.0), conc=d.get('conc'),
+                   blank=bool(d.get('blank', False)), calibrator=bool(d.get('calibrator', False)),
+                   color=d.get('color'), id=d.get('id'))
+
+    def to_dict(self):
+        return {'id': self.id or self.name, 'name': self.name, 'conc': self.conc, 'dilution': self.dilution,
+                'color': self.color, 'wells': list(self.wells), 'blank': self.blank, 'calibrator': self.calibrator}
+
+
+@dataclass
+class Layout:
+    """The conditions assigned to a plate."""
+    conditions: list = field(default_factory=list)
+
+    @classmethod
+    def from_guide(cls, path):
+        return cls([Condition.from_dict(d) for d in DataParser.parse_guide_file(path)])
+
+    @classmethod
+    def from_dicts(cls, conditions):
+        return cls([Condition.from_dict(d) for d in conditions])
+
+    def to_dicts(self):
+        return [c.to_dict() for c in self.conditions]
+
+    def blank_wells(self):
+        return [w for c in self.conditions if c.blank for w in c.wells]
+
+    def calibrators(self):
+        return [c for c in self.conditions if c.calibrator]
+
+
+@dataclass
+class Curve:
+    """A standard curve. Unused parameters stay NaN; `se` holds the fit standard errors."""
+    name: str = "Custom"
+    model: str = 'Linear'
+    m: float = np.nan
+    b: float = np.nan
+    bottom: float = np.nan
+    top: float = np.nan
+    ec50: float = np.nan
+    hill: float = np.nan
+    asym: float = 1.0
+    low: float = np.nan
+    high: float = np.nan
+    r2: float = np.nan
+    notes: str = ""
+    se: dict = field(default_factory=dict)
+
+    _KEYS = [('m', 'm'), ('b', 'b'), ('bottom', 'Bottom'), ('top', 'Top'), ('ec50', 'EC50'),
+             ('hill', 'Hill'), ('asym', 'Asym'), ('low', 'Low'), ('high', 'High'), ('r2', 'r^2')]
+
+    @classmethod
+    def from_dict(cls, d, name=None):
+        """From a curve library row (the CurveLibrary / QuantEngine.fit_curve format)."""
+        kwargs = {}
+        for attr, key in cls._KEYS:
+            try:
+                kwargs[attr] = float(d[key])
+            except (KeyError, TypeError, ValueError):
+                pass
+        notes = d.get('Notes', "")
+        return cls(name=str(name or d.get('Name', "Custom")),
+                   model=CURVE_MODELS[QuantEngine.model_code(d.get('Model', 'Linear'))],
+                   notes="" if pd.isna(notes) else str(notes),
+                   se={k[:-3]: float(v) for k, v in d.items() if str(k).endswith('_SE')},
+                   **kwargs)
+
+    def to_dict(self):
+        d = {'Name': self.name, 'Model': self.model, 'Notes': self.notes}
+        d.update({key: getattr(self, attr) for attr, key in self._KEYS})
+        d.update({f"{k}_SE": v for k, v in self.se.items()})
+        return d
+
+    def arrays(self):
+        return QuantEngine.curve_arrays({self.name: self.to_dict()})
+
+    def predict(self, conc):
+        return QuantEngine.predict(np.asarray(conc, dtype=float), self.arrays())
+
+    def invert(self, rlu):
+        return QuantEngine.invert(np.asarray(rlu, dtype=float), self.arrays())
+
+    def params(self):
+        """The fitted parameters this model uses."""
+        if self.model in ('Linear', 'Log-Log'):
+            return {'m': self.m, 'b': self.b}
+        d = self.to_dict()
+        return {p: d[p] for p in CURVE_PARAMS[:4 if self.model == '4PL' else 5]}
+
+
+@dataclass
+class QuantResult:
+    """Output of `hibitquant.quantify`.
+
+    `conditions` has one row per condition with wells (column 'condition' is
+    its index in the layout), `wells` one row per quantified well and
+    `samples` one stock concentration per sample/dilution series. `feature`
+    is the well signal the RLU columns hold (see SIGNAL_FEATURES) and
+    `scale` the calibrator normalization factor they were multiplied by.
+    """
+    curve: dict
+    conditions: pd.DataFrame
+    wells: pd.DataFrame
+    samples: pd.DataFrame
+    qc: Optional[pd.DataFrame] = None
+    feature: str = 'peak'
+    scale: float = 1.0
+
+    CONDITION_COLUMNS = ['condition', 'sample', 'dilution', 'n_wells', 'mean_rlu', 'std_rlu', 'conc', 'std',
+                         'ci_low', 'ci_high', 'stock_conc', 'in_range']
+    WELL_COLUMNS = ['well', 'condition', 'sample', 'peak_rlu', 'conc', 'stock_conc', 'qc_flag']
+
+    @property
+    def valid(self):
+        """False when the curve cannot be inverted (a flat linear curve)."""
+        return not (self.curve.get('Model', 'Linear') == 'Linear' and self.curve.get('m') == 0)
@@ -0,0 +1,71 @@
+"""Inter-plate normalization to reference calibrator wells.
+
+Conditions flagged `calibrator` hold a reference material of known in-well
+concentration (`conc`) that is run on every plate. A plate's scale factor is
+the geometric mean, over its calibrators, of the signal the standard curve
+predicts for the reference concentration divided by the mean signal
+measured; every well signal of the plate is multiplied by it before
+inversion, so one stored curve stays valid across runs whose reader gain or
+reagent activity drifts.
+"""
+import numpy as np
+
+from .quant import QuantEngine
+
+CALIBRATOR_PREFIXES = ('calibrator', 'ref') # Guide names that mark a calibrator condition
+
+
+class CalibrationEngine:
+    """Per-plate scale factors from reference calibrator conditions."""
+
+    @staticmethod
+    def is_calibrator_name(name):
+        return str(name).strip().lower().startswith(CALIBRATOR_PREFIXES)
+
+    @staticmethod
+    def calibrators(conditions):
+        """Indices of the calibrator conditions that have a reference concentration."""
+        return [i for i, c in enumerate(conditions) if c.get('calibrator') and c.get('conc') is not None]
+
+    @staticmethod
+    def observed(peaks, cond_idx, conditions):
+        """(reference concentrations, mean well signal) of a plate's calibrator conditions.
+
+        `peaks`/`cond_idx` are QuantEngine.condition_peaks output for the
+        plate; calibrators without valid wells get a NaN signal.
+        """
+        idx = CalibrationEngine.calibrators(conditions)
+        mean, _, _ = QuantEngine.group_stats(peaks, cond_idx, len(conditions))
+        return np.array([conditions[i]['conc'] for i in idx], dtype=float), mean[idx]
+
+    @staticmethod
+    def pad(rows):
+        """Stacks ragged per-plate arrays into one NaN-padded (n_plates, n_max) array."""
+        out = np.full((len(rows), max((len(r) for r in rows), default=0)), np.nan)
+        for p, r in enumerate(rows):
+            out[p, :len(r)] = r
+        return out
+
+    @staticmethod
+    def scale_factors(conc, signal, curve):
+        """Scale factor per plate (NaN where a plate has no usable calibrator).
+
+        `conc` and `signal` are (n_plates, n_calibrators) arrays, NaN padded
+        (see `pad`); all plates are computed in one array operation. Ratios
+        of expected to observed signal that are not finite and positive
+        (e.g. a calibrator whose wells were all excluded) are skipped.
+        """
+        conc = np.atleast_2d(np.asarray(conc, dtype=float))
+        signal = np.atleast_2d(np.asarray(signal, dtype=float))
+        expected = QuantEngine.predict(conc, QuantEngine.curve_arrays({'current': curve}))
+        with np.errstate(all='ignore'):
+            ratio = expected / signal
+            ok = np.isfinite(ratio) & (ratio > 0)
+            n = ok.sum(axis=1)
+            log_mean = np.where(ok, np.log(np.where(ok, ratio, 1.0)), 0.0).sum(axis=1) / n
+        return np.where(n > 0, np.exp(log_mean), np.nan)
+
+    @staticmethod
+    def apply(peaks, plate_idx, factors):
+        """Scales the well signals of several plates at once; plate_idx[i] is the plate of well i."""
+        return np.asarray(peaks, dtype=float) * np.asarray(factors, dtype=float)[plate_idx]
@@ -0,0 +1,89 @@
+"""Plate reader export and guide file parsing."""
+import re
+
+import pandas as pd
+
+from . import readers
+from .normalize import CalibrationEngine
+
+
+class DataParser:
+    @staticmethod
+    def parse_file(filepath, fmt=None):
+        """Parses a plate reader export into a plate frame ('Time' in minutes + one column per well).
+
+        The format is detected from the start of the file unless `fmt` names
+        one of `readers.FORMATS`; see `hibitquant.readers`.
+        """
+        return readers.read(filepath, fmt)
+
+    @staticmethod
+    def sniff_format(filepath):
+        """Name of the reader format detected for a file."""
+        return readers.sniff(filepath)
+
+    @staticmethod
+    def parse_time(time_str):
+        s = str(time_str).strip()
+        if ':' in s:
+            parts = list(map(float, s.split(':')))
+            if len(parts) == 3: 
+                return parts[0]*60 + parts[1] + parts[2]/60
+            elif len(parts) == 2:
+                return parts[0]*60 + parts[1]
+        return float(s)
+
+    @staticmethod
+    def parse_guide_file(filepath):
+        """Reads a plate layout guide (CSV/Excel) into condition dicts.
+
+        Row letters are in the 'Row' column (or the first column) and plate
+        column numbers in the header. Cells hold {Name}@{Dilution}~{Conc},
+        where dilution and concentration are optional. The same sample at
+        different dilutions is a dilution series, so conditions are keyed by
+        (name, dilution). Returns dicts with name, conc, dilution, wells,
+        blank (names starting with 'blank') and calibrator (names starting
+        with 'calibrator' or 'ref'), in order of first appearance.
+        """
+        if filepath.endswith('.csv'):
+            df_guide = pd.read_csv(filepath)
+        else:
+            df_guide = pd.read_excel(filepath)
+
+        df_guide.columns = [str(c).strip() for c in df_guide.columns]
+        row_col_idx = df_guide.columns.get_loc('Row') if 'Row' in df_guide.columns else 0
+        cell_pat = re.compile(r'^(?P<name>[^@~]+)(?:@(?P<dilution>[^~]+))?(?:~(?P<conc>.+))?$')
+
+        conditions = {} # (name, dilution) -> condition
+        for c in df_guide.columns:
+            if not c.isdigit(): continue
+            col_num = int(c)
+            for r in range(len(df_guide)):
+                row_letter = str(df_guide.iloc[r, row_col_idx]).strip().upper()
+                if not re.match(r'^(?:[A-Z]|A[A-F])$', row_letter): continue
+
+                cell_val = str(df_guide.iloc[r][c]).strip()
+                if not cell_val or cell_val.lower() == 'nan': continue
+                match = cell_pat.match(cell_val)
+                if not match: continue
+
+                name = match.group('name').strip()
+                dilution, conc = 1.0, None
+                try: dilution = float(match.group('dilution'))
+                except (TypeError, ValueError): pass
+                try: conc = float(match.group('conc'))
+                except (TypeError, ValueError): pass
+
+                cond = conditions.setdefault((name, dilution), {
+                    'name': name,
+                    'conc': conc,
+                    'dilution': dilution,
+                    'wells': [],
+                    'blank': name.lower().startswith('blank'),
+                    'calibrator': CalibrationEngine.is_calibrator_name(name),
+                })
+                if conc is not None and cond['conc'] is None:
+                    cond['conc'] = conc
+                cond['wells'].append(f"{row_letter}{col_num}")
+
+        return [cond for cond in conditions.values() if cond['wells']]
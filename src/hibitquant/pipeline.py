@@ -0,0 +1,291 @@
+"""End-to-end quantification: plate + layout + curve -> QuantResult."""
+import os
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .background import DEFAULT_BACKGROUND, BackgroundEngine
+from .features import well_features
+from .models import Plate, Condition, Layout, Curve, QuantResult
+from .metrics import AssayMetrics
+from .normalize import CalibrationEngine
+from .ranking import HitRanker
+from .timecourse import TIME_SIGNALS, TimeCourseEngine
+from .qc import QCEngine
+from .quant import QuantEngine
+
+
+def as_dataframe(plate):
+    """Accepts a Plate or a parsed plate DataFrame."""
+    return plate.to_dataframe() if isinstance(plate, Plate) else plate
+
+
+def as_conditions(layout):
+    """Accepts a Layout, a list of Conditions or a list of condition dicts."""
+    if isinstance(layout, Layout):
+        return layout.to_dicts()
+    return [c.to_dict() if hasattr(c, 'to_dict') else c for c in layout]
+
+
+def as_curve(curve):
+    """Accepts a Curve or a curve library row."""
+    return curve.to_dict() if isinstance(curve, Curve) else dict(curve)
+
+
+def is_single_layout(layouts):
+    """True for one layout (a guide path, Layout or list of conditions) rather than one per plate."""
+    return isinstance(layouts, (str, Layout)) or (
+        isinstance(layouts, list) and len(layouts) > 0 and isinstance(layouts[0], (dict, Condition)))
+
+
+def per_plate_layouts(plates, layouts):
+    """One layout per plate; a single layout (or guide path) is shared by all plates."""
+    layouts = [layouts] * len(plates) if is_single_layout(layouts) else list(layouts)
+    if len(layouts) != len(plates):
+        raise ValueError(f"{len(plates)} plates but {len(layouts)} layouts.")
+    return layouts
+
+
+def quantify(plate, layout, curve, exclude=(), qc=None, bootstrap=None, series_mode='best', feature='peak',
+             features=None, scale=1.0):
+    """Quantifies every condition of a (background corrected) plate against one curve.
+
+    Every well's signal is inverted through the curve in one array operation;
+    condition concentrations are the mean and std (ddof=1) of their wells'
+    concentrations (wells without an inverse, e.g. above a logistic curve's
+    top, are left out), so per-well and per-condition results always agree.
+    `exclude` lists wells to leave out (e.g. QC
+    flagged ones); `qc` is an optional QCEngine.run table whose reasons are
+    attached to the wells. `bootstrap` is None or a dict of
+    QuantEngine.bootstrap keyword arguments (n_iter, seed, level).
+    `feature` is the well signal used as the "peak" (one of SIGNAL_FEATURES;
+    the curve must have been built from the same signal), read from the
+    `features` table when one is given. Well signals are multiplied by
+    `scale` (a calibrator normalization factor) before inversion.
+    """
+    df = as_dataframe(plate)
+    conditions = as_conditions(layout)
+    curve = as_curve(curve)
+    curves = QuantEngine.curve_arrays({'current': curve})
+    n_cond = len(conditions)
+
+    wells, peaks, cond_idx = QuantEngine.condition_peaks(df, conditions, exclude, feature, features)
+    peaks = peaks * scale
+    mean_max, std_max, counts = QuantEngine.group_stats(peaks, cond_idx, n_cond)
+    well_conc = QuantEngine.invert(peaks, curves)
+    calc_conc, std_conc, _ = QuantEngine.group_stats(well_conc, cond_idx, n_cond)
+
+    result = QuantResult(curve, None, None, None, qc, feature, float(scale))
+    ci_low = ci_high = np.full(n_cond, np.nan)
+    if bootstrap is not None and result.valid and len(peaks):
+        ci_low, ci_high, _ = QuantEngine.bootstrap(peaks, cond_idx, n_cond, curve, **bootstrap)
+
+    dil = np.array([c.get('dilution', 1.0) for c in conditions], dtype=float)
+    flagged = set(qc.index[qc['flagged']]) if qc is not None else set()
+    has = counts > 0
+    result.conditions = pd.DataFrame({
+        'condition': np.arange(n_cond),
+        'sample': [c['name'] for c in conditions],
+        'dilution': dil,
+        'n_wells': counts.astype(int),
+        'n_flagged': [len(flagged.intersection(c['wells'])) for c in conditions],
+        'mean_rlu': mean_max,
+        'std_rlu': std_max,
+        'conc': calc_conc,
+        'std': std_conc,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'stock_conc': calc_conc * dil,
+        'stock_std': std_conc * dil,
+        'in_range': QuantEngine.in_range(calc_conc, curves['low'][0], curves['high'][0]),
+    })[has].reset_index(drop=True)
+
+    flags = qc['reason'] if qc is not None else pd.Series(dtype=object)
+    result.wells = pd.DataFrame({
+        'well': wells,
+        'condition': cond_idx,
+        'sample': [conditions[i]['name'] for i in cond_idx],
+        'dilution': dil[cond_idx],
+        'peak_rlu': peaks,
+        'conc': well_conc,
+        'stock_conc': well_conc * dil[cond_idx],
+        'in_range': QuantEngine.in_range(well_conc, curves['low'][0], curves['high'][0]),
+        'qc_flag': [flags.get(w, '') for w in wells],
+    })
+
+    cond = result.conditions
+    result.samples = QuantEngine.dilution_series(
+        cond['sample'], cond['dilution'], cond['conc'], cond['std'],
+        curves['low'][0], curves['high'][0], mode=series_mode) if len(cond) else pd.DataFrame()
+    return result
+
+
+def prepare_plate(plate, layout, background=DEFAULT_BACKGROUND, qc_settings=None, exclude_flagged=True,
+                  feature='peak', smoothing='median'):
+    """QC and blank subtraction of a raw plate: (working df, conditions, qc table, excluded wells, features).
+
+    `plate` may also be a file path and `layout` a guide file path. Blank
+    wells are the wells of conditions marked blank that pass QC. Features
+    other than the raw peak are computed on the blank-subtracted data with
+    `smoothing` (otherwise features is None).
+    """
+    if isinstance(plate, str):
+        plate = Plate.from_file(plate)
+    if isinstance(layout, str):
+        layout = Layout.from_guide(layout)
+    df = as_dataframe(plate)
+    conditions = as_conditions(layout)
+
+    qc = QCEngine.run(df, conditions, **(qc_settings or {}))
+    excluded = set(qc.index[qc['flagged']]) if exclude_flagged else set()
+    blank_wells = [w for c in conditions if c.get('blank') for w in c['wells']
+                   if w in df.columns and w not in excluded]
+    work = BackgroundEngine.correct(df, blank_wells, background)
+    features = well_features(work, smoothing) if feature != 'peak' else None
+    return work, conditions, qc, excluded, features
+
+
+def calibrator_scales(prepared, curve, feature='peak', names=None):
+    """Calibrator scale factor of every prepared plate (see `prepare_plate`), vectorized across plates.
+
+    Raises ValueError naming the plates (`names`, default their positions)
+    without a usable calibrator: a condition flagged calibrator, with a
+    reference concentration and at least one valid well.
+    """
+    conc, signal = [], []
+    for work, conditions, _, excluded, features in prepared:
+        _, peaks, cond_idx = QuantEngine.condition_peaks(work, conditions, excluded, feature, features)
+        c, s = CalibrationEngine.observed(peaks, cond_idx, conditions)
+        conc.append(c)
+        signal.append(s)
+    factors = CalibrationEngine.scale_factors(CalibrationEngine.pad(conc), CalibrationEngine.pad(signal),
+                                              as_curve(curve))
+    missing = [str(names[p] if names is not None else p + 1) for p in np.flatnonzero(~np.isfinite(factors))]
+    if missing:
+        raise ValueError(f"No usable calibrator (a calibrator condition with a concentration and valid wells) "
+                         f"on plate(s): {', '.join(missing)}")
+    return factors
+
+
+def quantify_plate(plate, layout, curve, background=DEFAULT_BACKGROUND, qc_settings=None, exclude_flagged=True,
+                   bootstrap=None, series_mode='best', feature='peak', smoothing='median', normalize=False):
+    """Runs QC, blank subtraction and quantification on a raw plate.
+
+    The same steps as the GUI, with the same defaults (no blank subtraction
+    unless `background` is given); see `prepare_plate` for the accepted
+    inputs. With `normalize`, the well signals are scaled to the
+    plate's calibrator conditions first (see `hibitquant.normalize`).
+    """
+    work, conditions, qc, excluded, features = prepare_plate(plate, layout, background, qc_settings, exclude_flagged,
+                                                             feature, smoothing)
+    scale = 1.0
+    if normalize:
+        scale = calibrator_scales([(work, conditions, qc, excluded, features)], curve, feature)[0]
+    return quantify(work, conditions, curve, exclude=excluded, qc=qc, bootstrap=bootstrap, series_mode=series_mode,
+                    feature=feature, features=features, scale=scale)
+
+
+def quantify_batch(plates, layouts, curve, normalize=True, names=None, background=DEFAULT_BACKGROUND, qc_settings=None,
+                   exclude_flagged=True, bootstrap=None, series_mode='best', feature='peak', smoothing='median'):
+    """quantify_plate for many plates against one curve, normalized to their calibrators.
+
+    `layouts` is one layout per plate, or a single layout (or guide path)
+    shared by all. Every plate is prepared first, then the calibrator scale
+    factors of the whole batch are computed at once and applied before
+    inversion; a plate without a usable calibrator raises ValueError. Each
+    result's `scale` holds its factor.
+    """
+    plates = list(plates)
+    layouts = per_plate_layouts(plates, layouts)
+    prepared = [prepare_plate(p, l, background, qc_settings, exclude_flagged, feature, smoothing)
+                for p, l in zip(plates, layouts)]
+    scales = calibrator_scales(prepared, curve, feature, names) if normalize else np.ones(len(prepared))
+    return [quantify(work, conditions, curve, exclude=excluded, qc=qc, bootstrap=bootstrap, series_mode=series_mode,
+                     feature=feature, features=features, scale=scale)
+            for (work, conditions, qc, excluded, features), scale in zip(prepared, scales)]
+
+
+def assay_metrics(plates, layouts, names=None, feature='peak', smoothing='median', qc_settings=None,
+                  exclude_flagged=True, thresholds=None):
+    """Z'-factor, S/B, replicate CVs and agreement of a batch of plates (see `hibitquant.metrics`).
+
+    `plates` are Plates, plate frames or file paths and `layouts` one layout
+    per plate or a single shared one. Metrics use the raw signal of the
+    wells that pass QC; Plate objects reuse their cached feature tables.
+    Returns (summary, conditions): one row per plate with 'pass'/'flags'
+    against `thresholds`, and one row per condition of every plate.
+    """
+    plates = list(plates)
+    if not plates:
+        raise ValueError("No plates to evaluate.")
+    layouts = per_plate_layouts(plates, layouts)
+    names = list(names) if names is not None else [
+        os.path.basename(p) if isinstance(p, str) else f"Plate {i + 1}" for i, p in enumerate(plates)]
+    peaks, group, group_plate, group_role, cond_rows = [], [], [], [], []
+    offset = 0
+    for p, (plate, layout) in enumerate(zip(plates, layouts)):
+        if isinstance(plate, str):
+            plate = Plate.from_file(plate)
+        if isinstance(layout, str):
+            layout = Layout.from_guide(layout)
+        df = as_dataframe(plate)
+        conditions = as_conditions(layout)
+        qc = QCEngine.run(df, conditions, **(qc_settings or {}))
+        excluded = set(qc.index[qc['flagged']]) if exclude_flagged else set()
+        features = None
+        if feature != 'peak':
+            features = plate.features(smoothing) if isinstance(plate, Plate) else well_features(df, smoothing)
+        _, plate_peaks, cond_idx = QuantEngine.condition_peaks(df, conditions, excluded, feature, features)
+        peaks.append(plate_peaks)
+        group.append(cond_idx + offset)
+        group_plate.append(np.full(len(conditions), p))
+        group_role.append(AssayMetrics.control_roles(conditions))
+        cond_rows.extend((i, c['name'], c.get('dilution', 1.0)) for i, c in enumerate(conditions))
+        offset += len(conditions)
+
+    summary, conditions = AssayMetrics.compute(np.concatenate(peaks), np.concatenate(group),
+                                               np.concatenate(group_plate), np.concatenate(group_role), names)
+    info = pd.DataFrame(cond_rows, columns=['condition', 'sample', 'dilution'])
+    conditions = pd.concat([conditions[['plate']], info, conditions.drop(columns='plate')], axis=1)
+    return AssayMetrics.flag(summary, thresholds), conditions
+
+
+def rank_plates(plates, layouts, curve, k=100, level='condition', value='stock_conc', in_range_only=False,
+                qc_pass_only=False, min_replicates=1, names=None, **kwargs):
+    """Top-k hits (see `hibitquant.ranking`) over plates quantified one at a time.
+
+    `plates` may be any iterable (e.g. a generator of file paths); each plate
+    is run through quantify_plate with `kwargs` and dropped before the next,
+    so memory does not grow with the screen. Returns the HitRanker.
+    """
+    ranker = HitRanker(k, level, value, in_range_only, qc_pass_only, min_replicates)
+    if is_single_layout(layouts):
+        layouts = itertools.repeat(Layout.from_guide(layouts) if isinstance(layouts, str) else layouts)
+    names = iter(names) if names is not None else None
+    for i, (plate, layout) in enumerate(zip(plates, layouts)):
+        name = next(names) if names is not None else (
+            os.path.basename(plate) if isinstance(plate, str) else f"Plate {i + 1}")
+        ranker.add(name, quantify_plate(plate, layout, curve, **kwargs))
+    return ranker
+
+
+def concentration_timecourse(plate, layout, curve, background=DEFAULT_BACKGROUND, qc_settings=None, exclude_flagged=True,
+                             feature='peak', smoothing='median', normalize=False):
+    """Concentration of every well at every read of a raw plate (a `hibitquant.timecourse.TimeCourse`).
+
+    Prepared like quantify_plate. `feature` is the signal the curve was built
+    from: the raw peak inverts the raw reads, the smoothed peak the traces
+    smoothed with `smoothing`; other signals have no per-read value and raise
+    ValueError. With `normalize` every read is scaled by the plate's
+    calibrator factor (computed from `feature`).
+    """
+    if feature not in TIME_SIGNALS:
+        raise ValueError(f"{feature!r} has no value per read; use one of {', '.join(TIME_SIGNALS)}.")
+    work, conditions, qc, excluded, features = prepare_plate(plate, layout, background, qc_settings, exclude_flagged,
+                                                             feature, smoothing)
+    scale = 1.0
+    if normalize:
+        scale = calibrator_scales([(work, conditions, qc, excluded, features)], curve, feature)[0]
+    return TimeCourseEngine.compute(work, conditions, as_curve(curve), excluded, scale,
+                                    smoothing if feature == 'smoothed_peak' else 'none')
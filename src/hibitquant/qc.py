@@ -0,0 +1,91 @@
+"""Well quality control."""
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t as t_dist
+
+from .quant import QuantEngine
+
+
+class QCEngine:
+    """Plate-wide well quality control. Every check is a vectorized mask over all wells."""
+
+    @staticmethod
+    def run(df, conditions, saturation=None, max_nan_frac=0.2, method='robust-z', threshold=3.5, alpha=0.05):
+        """Flags saturated/overflow wells, NaN-heavy traces and replicate outliers.
+
+        Saturation uses the overflow markers recorded by DataParser plus an
+        optional RLU ceiling. Outliers are tested on peak RLU within each
+        condition (3+ usable replicates) with either a robust z-score
+        (median/MAD) or a two-sided Grubbs test. Returns a DataFrame indexed
+        by well with one boolean column per check, 'flagged' and 'reason'.
+        """
+        wells = [c for c in df.columns if c != 'Time']
+        X = df[wells].to_numpy(dtype=float)
+        overflow = df.attrs.get('overflow', {})
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            peaks = np.nanmax(X, axis=0) if len(X) else np.full(len(wells), np.nan)
+        n_overflow = np.array([overflow.get(w, 0) for w in wells])
+        saturated = n_overflow > 0
+        if saturation is not None:
+            saturated |= np.nan_to_num(peaks, nan=-np.inf) >= saturation
+        nan_frac = np.isnan(X).mean(axis=0) if len(X) else np.ones(len(wells))
+        # Overflow reads are NaN too; they are reported as saturation, not missing data
+        nan_heavy = (np.isnan(X).sum(axis=0) - n_overflow) / max(len(X), 1) > max_nan_frac
+
+        qc = pd.DataFrame({'saturated': saturated, 'nan_heavy': nan_heavy,
+                           'nan_frac': nan_frac, 'peak': peaks}, index=wells)
+        qc['outlier'] = False
+
+        col = {w: i for i, w in enumerate(wells)}
+        usable = ~(saturated | nan_heavy)
+        member, cond_idx = [], []
+        for i, cond in enumerate(conditions):
+            for w in cond['wells']:
+                if w in col and usable[col[w]]:
+                    member.append(col[w])
+                    cond_idx.append(i)
+        if member:
+            member = np.array(member)
+            cond_idx = np.array(cond_idx)
+            outlier = QCEngine.replicate_outliers(peaks[member], cond_idx, len(conditions), method, threshold, alpha)
+            qc.iloc[member[outlier], qc.columns.get_loc('outlier')] = True
+
+        qc['flagged'] = qc['saturated'] | qc['nan_heavy'] | qc['outlier']
+        reasons = np.array([''] * len(wells), dtype=object)
+        for name, label in [('saturated', 'Saturated/overflow'), ('nan_heavy', 'Missing reads'), ('outlier', 'Replicate outlier')]:
+            mask = qc[name].to_numpy()
+            reasons[mask] = [f"{r}, {label}" if r else label for r in reasons[mask]]
+        qc['reason'] = reasons
+        return qc
+
+    @staticmethod
+    def replicate_outliers(values, cond_idx, n_groups, method='robust-z', threshold=3.5, alpha=0.05):
+        """Boolean outlier mask for `values` grouped by `cond_idx`."""
+        padded, counts, rank = QuantEngine.pad_groups(values, cond_idx, n_groups)
+        n = np.sum(np.isfinite(padded), axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if method == 'grubbs':
+                mean = np.nanmean(padded, axis=1, keepdims=True)
+                sd = np.nanstd(padded, axis=1, ddof=1, keepdims=True)
+                dev = np.abs(padded - mean)
+                g = np.nanmax(dev, axis=1) / sd[:, 0]
+                t = t_dist.ppf(1 - alpha / (2 * n), np.maximum(n - 2, 1))
+                g_crit = (n - 1) / np.sqrt(n) * np.sqrt(t ** 2 / (n - 2 + t ** 2))
+                # Only the most extreme replicate of a group is tested
+                is_max = dev == np.nanmax(dev, axis=1, keepdims=True)
+                flags = is_max & ((g > g_crit) & (n >= 3))[:, None]
+            else:
+                med = np.nanmedian(padded, axis=1, keepdims=True)
+                dev = np.abs(padded - med)
+                mad = np.nanmedian(dev, axis=1, keepdims=True)
+                # MAD is 0 when most replicates agree exactly; fall back to the mean absolute deviation
+                mean_ad = np.nanmean(dev, axis=1, keepdims=True)
+                z = np.where(mad > 0, 0.6745 * dev / mad, dev / (1.253314 * mean_ad))
+                flags = (z > threshold) & (n >= 3)[:, None]
+        flags &= np.isfinite(padded)
+        return flags[cond_idx, rank]
@@ -0,0 +1,378 @@
+"""Standard curve models and array-based quantification."""
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.stats import linregress
+from scipy.optimize import curve_fit, OptimizeWarning
+
+from .features import SIGNAL_FEATURES, well_features
+
+# Standard curve models. Linear and Log-Log use the m/b columns of the curve
+# library, the logistic models use the parameter columns below.
+CURVE_MODELS = ['Linear', 'Log-Log', '4PL', '5PL']
+CURVE_PARAMS = ['Bottom', 'Top', 'EC50', 'Hill', 'Asym']
+CURVE_EQUATIONS = {
+    'Linear': "y = mx + b",
+    'Log-Log': "log y = m·log x + b",
+    '4PL': "y = Top + (Bottom - Top) / (1 + (x/EC50)^Hill)",
+    '5PL': "y = Top + (Bottom - Top) / (1 + (x/EC50)^Hill)^Asym",
+}
+
+class QuantEngine:
+    """Array-based quantification helpers. All methods work on whole plates at once."""
+
+    @staticmethod
+    def condition_peaks(df, conditions, exclude=(), feature='peak', features=None):
+        """Collects the signal of every valid well of every condition.
+
+        The signal is the raw peak RLU or another of SIGNAL_FEATURES, taken
+        from `features` (a well_features table, e.g. a cached one) or computed
+        for the wells needed. Wells in `exclude` (e.g. QC flagged wells) are
+        left out. Returns (wells, peaks, cond_idx) where cond_idx[i] is the
+        index into `conditions` that wells[i] belongs to.
+        """
+        if feature not in SIGNAL_FEATURES:
+            raise ValueError(f"{feature!r} cannot drive quantification; use one of {', '.join(SIGNAL_FEATURES)}.")
+        wells, cond_idx = [], []
+        for i, cond in enumerate(conditions):
+            valid_wells = [w for w in cond['wells'] if w in df.columns and w not in exclude]
+            wells.extend(valid_wells)
+            cond_idx.extend([i] * len(valid_wells))
+        if not wells:
+            peaks = np.empty(0)
+        elif feature == 'peak' and features is None:
+            peaks = df[wells].max(axis=0).to_numpy(dtype=float)
+        else:
+            if features is None:
+                features = well_features(df[['Time'] + list(dict.fromkeys(wells))])
+            peaks = features[feature].reindex(wells).to_numpy(dtype=float)
+        return wells, peaks, np.asarray(cond_idx, dtype=int)
+
+    @staticmethod
+    def group_stats(values, cond_idx, n_groups):
+        """NaN-aware mean, std (ddof=1) and count per group along axis 0.
+
+        `values` is (n_wells,) or (n_wells, k); the membership matrix turns the
+        grouping into two matrix products instead of a loop over conditions.
+        """
+        values = np.asarray(values, dtype=float)
+        member = np.zeros((n_groups, len(cond_idx)))
+        member[cond_idx, np.arange(len(cond_idx))] = 1.0
+        finite = np.isfinite(values)
+        x = np.where(finite, values, 0.0)
+        counts = member @ finite.astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (member @ x) / counts
+            dev = np.where(finite, values - mean[cond_idx], 0.0)
+            var = (member @ dev ** 2) / (counts - 1)
+        std = np.sqrt(var)
+        return mean, std, counts
+
+    @staticmethod
+    def model_code(model):
+        """Maps a library 'Model' value to its index in CURVE_MODELS (blank means Linear)."""
+        key = str(model).strip().lower().replace('-', '').replace(' ', '')
+        lookup = {name.lower().replace('-', ''): i for i, name in enumerate(CURVE_MODELS)}
+        return lookup.get(key, 0)
+
+    @staticmethod
+    def pad_groups(values, cond_idx, n_groups):
+        """Scatters a ragged per-well array into a NaN padded (n_groups, max_reps) matrix.
+
+        Returns (padded, counts, rank) where rank[i] is the column of well i.
+        """
+        values = np.asarray(values, dtype=float)
+        cond_idx = np.asarray(cond_idx, dtype=int)
+        counts = np.bincount(cond_idx, minlength=n_groups)
+        max_reps = max(int(counts.max()) if n_groups else 0, 1)
+        order = np.argsort(cond_idx, kind='stable')
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        rank = np.empty(len(cond_idx), dtype=int)
+        rank[order] = np.arange(len(order)) - starts[cond_idx[order]]
+        padded = np.full((n_groups, max_reps), np.nan)
+        padded[cond_idx, rank] = values
+        return padded, counts, rank
+
+    @staticmethod
+    def curve_arrays(standard_curves):
+        """Stacks the curve library into parallel arrays (one entry per curve)."""
+        names = list(standard_curves.keys())
+
+        def col(key, default):
+            out = []
+            for name in names:
+                try:
+                    val = float(standard_curves[name].get(key, default))
+                except (TypeError, ValueError):
+                    val = default
+                out.append(default if np.isnan(val) else val)
+            return np.array(out, dtype=float)
+
+        model = np.array([QuantEngine.model_code(standard_curves[n].get('Model', 'Linear')) for n in names], dtype=int)
+        asym = col('Asym', 1.0)
+        return {
+            'names': names,
+            'model': model,
+            'm': col('m', np.nan),
+            'b': col('b', np.nan),
+            'bottom': col('Bottom', np.nan),
+            'top': col('Top', np.nan),
+            'ec50': col('EC50', np.nan),
+            'hill': col('Hill', np.nan),
+            'asym': np.where(model == CURVE_MODELS.index('4PL'), 1.0, asym),
+            'r2': col('r^2', np.nan),
+            'low': col('Low', -np.inf),
+            'high': col('High', np.inf),
+        }
+
+    @staticmethod
+    def predict(x, curves):
+        """Evaluates the curves at concentration x. Broadcasts like `invert`."""
+        c = curves
+        x = np.asarray(x, dtype=float)
+        with np.errstate(all='ignore'):
+            linear = c['m'] * x + c['b']
+            loglog = 10 ** (c['m'] * np.log10(x) + c['b'])
+            logistic = c['top'] + (c['bottom'] - c['top']) / (1 + (x / c['ec50']) ** c['hill']) ** c['asym']
+        return np.select([c['model'] == 0, c['model'] == 1], [linear, loglog], logistic)
+
+    @staticmethod
+    def invert(rlu, curves):
+        """Converts RLU to concentration for any mix of curve models.
+
+        Every model is evaluated on the whole array and the right one is picked
+        per curve, so rlu (..., 1) against curve arrays (n_curves,) inverts a
+        whole plate against a whole library at once. RLUs outside a logistic
+        curve's asymptotes have no inverse and come back as NaN.
+        """
+        c = curves
+        y = np.asarray(rlu, dtype=float)
+        with np.errstate(all='ignore'):
+            linear = np.where(c['m'] != 0, (y - c['b']) / c['m'], np.nan)
+            loglog = 10 ** ((np.log10(y) - c['b']) / c['m'])
+            ratio = (c['bottom'] - c['top']) / (y - c['top'])
+            logistic = c['ec50'] * (ratio ** (1 / c['asym']) - 1) ** (1 / c['hill'])
+        return np.select([c['model'] == 0, c['model'] == 1], [linear, loglog], logistic)
+
+    @staticmethod
+    def slope_at(x, curves):
+        """dRLU/dConc at x by central difference, used to propagate RLU error to concentration."""
+        x = np.asarray(x, dtype=float)
+        h = 1e-4 * np.maximum(np.abs(x), 1e-6)
+        with np.errstate(all='ignore'):
+            return (QuantEngine.predict(x + h, curves) - QuantEngine.predict(x - h, curves)) / (2 * h)
+
+    @staticmethod
+    def fit_curve(conc, rlu, model='Linear'):
+        """Fits one of CURVE_MODELS to dose data and returns a curve library entry."""
+        x = np.asarray(conc, dtype=float)
+        y = np.asarray(rlu, dtype=float)
+        keep = np.isfinite(x) & np.isfinite(y)
+        x, y = x[keep], y[keep]
+        curve = {'Model': model}
+
+        if model == 'Linear':
+            res = linregress(x, y)
+            curve.update({'m': res.slope, 'b': res.intercept,
+                          'm_SE': res.stderr, 'b_SE': res.intercept_stderr})
+        elif model == 'Log-Log':
+            pos = (x > 0) & (y > 0)
+            if pos.sum() < 2:
+                raise ValueError("Log-Log fit needs at least 2 points with positive concentration and RLU.")
+            res = linregress(np.log10(x[pos]), np.log10(y[pos]))
+            curve.update({'m': res.slope, 'b': res.intercept,
+                          'm_SE': res.stderr, 'b_SE': res.intercept_stderr})
+        elif model in ('4PL', '5PL'):
+            n_params = 4 if model == '4PL' else 5
+            if len(x) < n_params:
+                raise ValueError(f"{model} fit needs at least {n_params} concentrations.")
+            pos_x = x[x > 0]
+            p0 = [y.min(), y.max(), np.median(pos_x) if len(pos_x) else 1.0, 1.0, 1.0][:n_params]
+            lower = [-np.inf, -np.inf, 1e-12, 1e-3, 1e-3][:n_params]
+            upper = [np.inf, np.inf, np.inf, 20.0, 20.0][:n_params]
+
+            def f(xx, *p):
+                params = dict(zip(['bottom', 'top', 'ec50', 'hill', 'asym'], p))
+                params.setdefault('asym', 1.0)
+                return QuantEngine.predict(xx, dict(params, model=np.array(2), m=0.0, b=0.0))
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', OptimizeWarning)
+                popt, pcov = curve_fit(f, x, y, p0=p0, bounds=(lower, upper), maxfev=20000)
+            curve.update(dict(zip(CURVE_PARAMS, popt)))
+            curve.update({f"{p}_SE": se for p, se in zip(CURVE_PARAMS, np.sqrt(np.abs(np.diag(pcov))))})
+            if model == '4PL':
+                curve['Asym'] = 1.0
+        else:
+            raise ValueError(f"Unknown curve model: {model}")
+
+        pred = QuantEngine.predict(x, QuantEngine.curve_arrays({'fit': curve}))
+        ss_res = np.nansum((y - pred) ** 2)
+        ss_tot = np.sum((y - y.mean()) ** 2)
+        curve['r^2'] = 1 - ss_res / ss_tot if ss_tot > 0 else np.nan
+        return curve
+
+    @staticmethod
+    def in_range(conc, low, high):
+        low = np.where(np.isnan(low), -np.inf, low)
+        high = np.where(np.isnan(high), np.inf, high)
+        return (conc >= low) & (conc <= high)
+
+    @staticmethod
+    def bootstrap(peaks, cond_idx, n_groups, curve, n_iter=1000, seed=0, level=95.0):
+        """Bootstrap confidence intervals of the condition concentrations.
+
+        Each iteration resamples every condition's replicate peaks with
+        replacement and draws the curve parameters from N(value, <param>_SE)
+        (parameters without an SE stay fixed), then inverts the resampled
+        peaks and averages them per condition, like `quantify`. Replicates
+        are padded into a (conditions x replicates) matrix so every condition
+        is resampled in the same array operation; iterations are processed
+        in chunks to bound memory.
+
+        Returns (ci_low, ci_high, se), each of shape (n_groups,).
+        """
+        rng = np.random.default_rng(seed)
+        peaks = np.asarray(peaks, dtype=float)
+        cond_idx = np.asarray(cond_idx, dtype=int)
+        keep = np.isfinite(peaks)
+        peaks, cond_idx = peaks[keep], cond_idx[keep]
+
+        padded, counts, _ = QuantEngine.pad_groups(peaks, cond_idx, n_groups)
+        max_reps = padded.shape[1]
+
+        # Curve parameter draws, shaped (n_iter, 1) to broadcast over conditions
+        curves = QuantEngine.curve_arrays({'current': curve})
+        sim_curves = dict(curves)
+        for key, col in [('m', 'm'), ('b', 'b'), ('bottom', 'Bottom'), ('top', 'Top'),
+                         ('ec50', 'EC50'), ('hill', 'Hill'), ('asym', 'Asym')]:
+            try:
+                se = float(curve.get(f"{col}_SE", 0.0))
+            except (TypeError, ValueError):
+                se = 0.0
+            se = se if np.isfinite(se) else 0.0
+            sim_curves[key] = curves[key][0] + se * rng.standard_normal((n_iter, 1))
+
+        conc = np.empty((n_iter, n_groups))
+        rows = np.arange(n_groups)[None, :, None]
+        n = np.maximum(counts, 1)[None, :, None]
+        valid = np.arange(max_reps)[None, None, :] < counts[None, :, None]
+        chunk = max(1, int(2_000_000 // (n_groups * max_reps or 1)))
+        for start in range(0, n_iter, chunk):
+            k = min(chunk, n_iter - start)
+            idx = (rng.random((k, n_groups, max_reps)) * n).astype(int)
+            draws = {key: val[start:start + k, :, None] if np.ndim(val) == 2 else val for key, val in sim_curves.items()}
+            well_conc = QuantEngine.invert(padded[rows, idx], draws)
+            ok = valid & np.isfinite(well_conc)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                conc[start:start + k] = np.where(ok, well_conc, 0.0).sum(axis=-1) / ok.sum(axis=-1)
+        conc[:, counts == 0] = np.nan
+
+        alpha = (100.0 - level) / 2
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            ci_low, ci_high = np.nanpercentile(conc, [alpha, 100.0 - alpha], axis=0)
+            se = np.nanstd(conc, axis=0, ddof=1)
+        return ci_low, ci_high, se
+
+    @staticmethod
+    def range_score(conc, low, high):
+        """Distance from the centre of the dynamic range in units of range width.
+
+        Values <= 0.5 are inside the range; NaN concentrations or missing limits score inf.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pos = (conc - low) / (high - low)
+        score = np.abs(pos - 0.5)
+        return np.where(np.isfinite(score), score, np.inf)
+
+    @staticmethod
+    def dilution_series(names, dilutions, raw_conc, raw_std, low=-np.inf, high=np.inf, mode='best'):
+        """Collapses conditions sharing a sample name into one stock concentration per sample.
+
+        mode='best' keeps the in-range dilution closest to the centre of the
+        curve range (least diluted on ties); mode='average' averages the stock
+        concentration of every in-range dilution. Samples with no in-range
+        dilution fall back to the 'best' pick and are flagged.
+        """
+        codes, samples = pd.factorize(pd.Series(names, dtype=object))
+        n = len(samples)
+        dil = np.asarray(dilutions, dtype=float)
+        raw = np.asarray(raw_conc, dtype=float)
+        stock = raw * dil
+        stock_std = np.asarray(raw_std, dtype=float) * dil
+        ok = QuantEngine.in_range(raw, low, high) & np.isfinite(stock)
+
+        # Best pick: sort by (sample, score, dilution) and take the first row of each sample
+        score = QuantEngine.range_score(raw, low, high)
+        order = np.lexsort((dil, score, codes))
+        first = np.r_[True, codes[order][1:] != codes[order][:-1]]
+        chosen = np.empty(n, dtype=int)
+        chosen[codes[order][first]] = order[first]
+
+        n_in, _, n_total = QuantEngine.group_stats(ok, codes, n)
+        n_in = np.rint(np.nan_to_num(n_in) * n_total).astype(int)
+        avg, avg_std, _ = QuantEngine.group_stats(np.where(ok, stock, np.nan), codes, n)
+
+        use_avg = (mode == 'average') & (n_in > 0)
+        result_stock = np.where(use_avg, avg, stock[chosen])
+        # A single in-range dilution has no spread across dilutions; keep its replicate std
+        result_std = np.where(use_avg & (n_in > 1), avg_std, stock_std[chosen])
+
+        dil_lists = pd.Series(dil).groupby(codes).agg(lambda d: ", ".join(f"{v:g}" for v in d)).to_numpy()
+        selected = np.where(use_avg, "Average", pd.Series(dil[chosen]).map(lambda v: f"{v:g}").to_numpy())
+        status = np.where(n_in > 0, "OK", "No dilution in range")
+
+        return pd.DataFrame({
+            'Sample': np.asarray(samples, dtype=object),
+            'Dilutions': dil_lists,
+            'In Range': [f"{a}/{b}" for a, b in zip(n_in, n_total.astype(int))],
+            'Selected Dilution': selected,
+            'Stock Conc (µg/mL)': result_stock,
+            'Stock Std Dev': result_std,
+            'Status': status,
+        })
+
+    @staticmethod
+    def compare_curves(df, conditions, standard_curves, exclude=(), feature='peak', features=None):
+        """Evaluates every well and condition against every library curve in one pass.
+
+        The recommended curve for a condition is the one that places its mean
+        concentration closest to the centre of the curve's dynamic range; any
+        in-range curve therefore beats every out-of-range curve. Curves without
+        finite limits fall back to the best r². `feature`/`features` select the
+        well signal as in condition_peaks.
+        """
+        curves = QuantEngine.curve_arrays(standard_curves)
+        wells, peaks, cond_idx = QuantEngine.condition_peaks(df, conditions, exclude, feature, features)
+        n_cond = len(conditions)
+
+        # (n_wells, n_curves) and (n_cond, n_curves)
+        well_conc = QuantEngine.invert(peaks[:, None], curves)
+        well_in = QuantEngine.in_range(well_conc, curves['low'], curves['high'])
+        mean_conc, std_conc, _ = QuantEngine.group_stats(well_conc, cond_idx, n_cond)
+        frac_in, _, n_wells = QuantEngine.group_stats(well_in, cond_idx, n_cond)
+        cond_in = QuantEngine.in_range(mean_conc, curves['low'], curves['high'])
+
+        score = QuantEngine.range_score(mean_conc, curves['low'], curves['high'])
+        # Ties (including curves without limits) are broken by the higher r²
+        r2 = np.broadcast_to(-np.nan_to_num(curves['r2'], nan=-np.inf), score.shape)
+        if len(curves['names']):
+            best = np.lexsort((r2, score), axis=-1)[:, 0]
+        else:
+            best = np.full(n_cond, -1)
+
+        return {
+            'curves': curves,
+            'wells': wells,
+            'cond_idx': cond_idx,
+            'well_conc': well_conc,
+            'well_in_range': well_in,
+            'mean_conc': mean_conc,
+            'std_conc': std_conc,
+            'in_range': cond_in,
+            'wells_in_range': np.rint(np.nan_to_num(frac_in) * n_wells).astype(int),
+            'n_wells': n_wells.astype(int),
+            'best': best,
+        }
@@ -0,0 +1,109 @@
+"""Top-k hit ranking across many plates.
+
+A HitRanker keeps the k highest concentrations seen so far in a min-heap,
+so plates can be fed to it one at a time (e.g. straight from a folder of
+reader exports) and memory stays bounded by k, not by the size of the
+screen. Each plate is filtered and pre-selected to its own top k in one
+array operation before anything touches the heap.
+
+Every hit keeps its plate name, condition index, sample and well(s), so a
+ranked list can be traced back to the source plate and wells.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+
+RANK_LEVELS = {'condition': "Conditions", 'well': "Wells"}
+RANK_VALUES = {'stock_conc': "Stock Conc (µg/mL)", 'conc': "Concentration (µg/mL)"}
+RANK_COLUMNS = {
+    'condition': ['rank', 'plate', 'condition', 'sample', 'dilution', 'wells', 'n_wells', 'n_flagged', 'mean_rlu',
+                  'conc', 'std', 'stock_conc', 'in_range'],
+    'well': ['rank', 'plate', 'well', 'condition', 'sample', 'dilution', 'n_wells', 'peak_rlu', 'conc', 'stock_conc',
+             'in_range', 'qc_flag'],
+}
+
+
+class HitRanker:
+    """Streaming top-k of per-condition or per-well concentrations.
+
+    Filters: `in_range_only` keeps values inside the curve's Low/High range,
+    `qc_pass_only` keeps wells without a QC flag (conditions none of whose
+    wells were flagged) and `min_replicates` is the minimum number of
+    quantified wells of the condition.
+    """
+
+    def __init__(self, k=100, level='condition', value='stock_conc', in_range_only=False, qc_pass_only=False,
+                 min_replicates=1):
+        if level not in RANK_LEVELS:
+            raise ValueError(f"Unknown ranking level: {level}")
+        if value not in RANK_VALUES:
+            raise ValueError(f"Unknown ranking value: {value}")
+        if k < 1:
+            raise ValueError("k must be at least 1.")
+        self.k = int(k)
+        self.level = level
+        self.value = value
+        self.in_range_only = in_range_only
+        self.qc_pass_only = qc_pass_only
+        self.min_replicates = min_replicates
+        self._heap = [] # (value, -arrival, record); the weakest hit is on top, ties keep the earlier hit
+        self._count = 0
+        self.n_plates = 0
+        self.n_candidates = 0
+
+    def candidates(self, result):
+        """The rows of one QuantResult that pass the filters."""
+        cond = result.conditions
+        if self.level == 'condition':
+            rows = cond if 'n_flagged' in cond else cond.assign(n_flagged=0)
+            keep = rows['n_flagged'].to_numpy() == 0 if self.qc_pass_only else np.ones(len(rows), dtype=bool)
+        else:
+            n_wells = cond.set_index('condition')['n_wells']
+            rows = result.wells.assign(n_wells=result.wells['condition'].map(n_wells).fillna(0).astype(int))
+            keep = rows['qc_flag'].to_numpy() == '' if self.qc_pass_only else np.ones(len(rows), dtype=bool)
+        keep &= rows['n_wells'].to_numpy() >= self.min_replicates
+        keep &= np.isfinite(rows[self.value].to_numpy(dtype=float))
+        if self.in_range_only:
+            keep &= rows['in_range'].to_numpy(dtype=bool)
+        return rows[keep]
+
+    def add(self, plate, result):
+        """Offers one plate's QuantResult to the ranking; returns the number of rows that passed the filters."""
+        self.n_plates += 1
+        if not result.valid or not len(result.conditions):
+            return 0
+        rows = self.candidates(result)
+        n = len(rows)
+        self.n_candidates += n
+        values = rows[self.value].to_numpy(dtype=float)
+        if len(values) > self.k:
+            # Only this plate's own top k can enter the heap
+            top = np.argpartition(values, -self.k)[-self.k:]
+            rows, values = rows.iloc[top], values[top]
+        floor = self._heap[0][0] if len(self._heap) == self.k else -np.inf
+        sel = values > floor
+        rows = rows[sel]
+        if self.level == 'condition':
+            # Joined only for the few rows that can enter the heap
+            well_ids, well_cond = result.wells['well'].to_numpy(), result.wells['condition'].to_numpy()
+            rows = rows.assign(wells=[', '.join(well_ids[well_cond == c]) for c in rows['condition']])
+        for value, rec in zip(values[sel], rows.to_dict('records')):
+            item = (float(value), -self._count, dict(rec, plate=plate))
+            self._count += 1
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item > self._heap[0]:
+                heapq.heapreplace(self._heap, item)
+        return n
+
+    def ranked(self):
+        """The hits so far, best first, with a 1-based 'rank' column."""
+        records = [rec for _, _, rec in sorted(self._heap, reverse=True)]
+        df = pd.DataFrame(records, columns=[c for c in RANK_COLUMNS[self.level] if c != 'rank'])
+        df.insert(0, 'rank', np.arange(1, len(df) + 1))
+        return df
+
+    def to_csv(self, path):
+        self.ranked().to_csv(path, index=False)
+        return path
@@ -0,0 +1,188 @@
+"""Plate reader export formats.
+
+`read(path)` looks at the first few KB of a file to detect its format and
+only then imports that format's parser. Every parser returns the same plate
+frame: a 'Time' column (minutes) plus one float column per well, with
+attrs['overflow'] (well -> number of non-numeric reads) and attrs['format'].
+
+    gen5_text   Gen5 kinetic table exported as tab-delimited text
+    kinetic     Synergy/Gen5 kinetic table: a 'Time' header followed by well IDs (CSV, Excel)
+    matrix      plate-by-plate blocks (row letters x column numbers), one block per read
+    endpoint    a single read as a 'Well' column plus a value column
+
+Formats are sniffed in registration order; `register` adds new ones.
+"""
+import csv
+import re
+import importlib
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+SNIFF_BYTES = 8192
+SNIFF_ROWS = 64
+WELL_PATTERN = re.compile(r'^(?:[A-Z]|A[A-F])[0-9]{1,2}$') # Rows A..AF cover 96- to 1536-well plates
+ROW_PATTERN = re.compile(r'^(?:[A-Z]|A[A-F])$')
+WELL_HEADERS = {'well', 'wells', 'well id', 'well position'}
+EXCEL_MAGIC = (b'PK\x03\x04', b'\xd0\xcf\x11\xe0') # xlsx (zip), xls (OLE)
+
+
+@dataclass
+class Head:
+    """The first rows of a file as stripped strings, and how to read the rest."""
+    rows: list
+    delimiter: str = ','
+    excel: bool = False
+
+
+@dataclass
+class ReaderFormat:
+    name: str
+    module: str # parser module; relative names resolve inside this package
+    sniff: Callable
+    description: str = ""
+
+
+FORMATS = {} # name -> ReaderFormat, in sniffing order
+_parsers = {}
+
+
+def register(name, module, sniff, description="", first=False):
+    """Adds a format. `module` must define parse(rows) -> plate frame; `sniff(head)` -> bool."""
+    fmt = ReaderFormat(name, module, sniff, description)
+    FORMATS.pop(name, None)
+    if first:
+        items = list(FORMATS.items())
+        FORMATS.clear()
+        FORMATS[name] = fmt
+        FORMATS.update(items)
+    else:
+        FORMATS[name] = fmt
+    _parsers.pop(name, None)
+
+
+def parser(name):
+    """The parse function of a format, importing its module on first use."""
+    if name not in _parsers:
+        if name not in FORMATS:
+            raise ValueError(f"Unknown reader format: {name}")
+        _parsers[name] = importlib.import_module(FORMATS[name].module, __name__).parse
+    return _parsers[name]
+
+
+def _cells(row):
+    return [str(x).strip() for x in row]
+
+
+def read_head(path, n_bytes=SNIFF_BYTES):
+    """Reads only the start of a file: SNIFF_BYTES of text, or SNIFF_ROWS rows of a workbook."""
+    with open(path, 'rb') as f:
+        raw = f.read(n_bytes)
+    if raw.startswith(EXCEL_MAGIC):
+        rows = pd.read_excel(path, header=None, nrows=SNIFF_ROWS).fillna('').values.tolist()
+        return Head([_cells(r) for r in rows], excel=True)
+    lines = raw.decode('utf-8-sig', errors='replace').splitlines()
+    if len(raw) == n_bytes and len(lines) > 1:
+        lines = lines[:-1] # cut mid-line
+    delimiter = '\t' if sum(l.count('\t') for l in lines) > sum(l.count(',') for l in lines) else ','
+    return Head([_cells(r) for r in csv.reader(lines, delimiter=delimiter)], delimiter)
+
+
+def read_rows(path, head):
+    """All rows of the file, read the way the head was."""
+    if head.excel:
+        return pd.read_excel(path, header=None).fillna('').values.tolist()
+    with open(path, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+        return list(csv.reader(f, delimiter=head.delimiter))
+
+
+def sniff(path, head=None):
+    """Name of the first registered format that recognizes the file."""
+    head = head or read_head(path)
+    for name, fmt in FORMATS.items():
+        if fmt.sniff(head):
+            return name
+    raise ValueError("Unrecognized plate reader export. Expected a kinetic table ('Time' followed by well IDs), "
+                     "a plate matrix (row letters x column numbers) or a 'Well' column with one read per well.")
+
+
+def read(path, fmt=None):
+    """Parses a reader export into a plate frame; `fmt` skips sniffing."""
+    head = read_head(path)
+    fmt = fmt or sniff(path, head)
+    df = parser(fmt)(read_rows(path, head))
+    df.attrs['format'] = fmt
+    return df
+
+
+# --- Sniffers (cheap; they only see the head) ---
+def time_column(row):
+    """Index of a 'Time' header cell that is followed by well IDs, else None."""
+    for j, cell in enumerate(row):
+        if 'time' in cell.lower() and any(WELL_PATTERN.match(c) for c in row[j + 1:]):
+            return j
+    return None
+
+
+def _int(cell):
+    try:
+        x = float(cell)
+    except ValueError:
+        return None
+    return int(x) if x.is_integer() else None
+
+
+def matrix_columns(row):
+    """(index of column '1', number of consecutive column numbers) of a plate matrix header, else None.
+
+    Needs a cell left of column 1 for the row letters and at least a 96-well plate's 12 columns.
+    """
+    for j in range(1, len(row)):
+        if _int(row[j]) != 1:
+            continue
+        n = 1
+        while j + n < len(row) and _int(row[j + n]) == n + 1:
+            n += 1
+        if n >= 12:
+            return j, n
+    return None
+
+
+def is_kinetic(head):
+    return any(time_column(row) is not None for row in head.rows)
+
+
+def is_gen5_text(head):
+    return not head.excel and head.delimiter == '\t' and is_kinetic(head)
+
+
+def is_matrix(head):
+    rows = head.rows
+    for i, row in enumerate(rows[:-1]):
+        cols = matrix_columns(row)
+        if cols and ROW_PATTERN.match(rows[i + 1][cols[0] - 1] if len(rows[i + 1]) >= cols[0] else ''):
+            return True
+    return False
+
+
+def well_column(row):
+    for j, cell in enumerate(row):
+        if cell.lower() in WELL_HEADERS:
+            return j
+    return None
+
+
+def is_endpoint(head):
+    rows = head.rows
+    for i, row in enumerate(rows[:-1]):
+        j = well_column(row)
+        if j is not None and j < len(rows[i + 1]) and WELL_PATTERN.match(rows[i + 1][j]):
+            return True
+    return False
+
+
+register('gen5_text', '.kinetic', is_gen5_text, "Gen5 kinetic table, tab-delimited text")
+register('kinetic', '.kinetic', is_kinetic, "Synergy/Gen5 kinetic table (CSV or Excel)")
+register('matrix', '.matrix', is_matrix, "Plate-by-plate matrix blocks, one per read")
+register('endpoint', '.endpoint', is_endpoint, "Single read, one row per well")
@@ -0,0 +1,59 @@
+"""Endpoint exports: a 'Well' column and one value per well, read once.
+
+The value column is the first column after 'Well' whose entries are mostly
+numeric (so text columns such as sample names are skipped). The read is
+returned as a one-row plate frame at Time 0.
+"""
+import numpy as np
+import pandas as pd
+
+from . import WELL_PATTERN, well_column
+
+
+def _numeric(cell):
+    try:
+        float(cell)
+        return True
+    except ValueError:
+        return False
+
+
+def parse(rows):
+    rows = [[str(x).strip() for x in r] for r in rows]
+    for i, row in enumerate(rows):
+        w_col = well_column(row)
+        if w_col is None:
+            continue
+        data = []
+        for data_row in rows[i + 1:]:
+            if len(data_row) <= w_col or not WELL_PATTERN.match(data_row[w_col]):
+                break
+            data.append(data_row)
+        if not data:
+            continue
+
+        width = max(len(r) for r in data)
+        candidates = [j for j in range(width) if j != w_col]
+        candidates.sort(key=lambda j: j < w_col) # columns right of 'Well' first
+        for v_col in candidates:
+            cells = [r[v_col] if v_col < len(r) else '' for r in data]
+            if sum(map(_numeric, cells)) * 2 >= len(cells):
+                break
+        else:
+            continue
+
+        values, overflow = {}, {}
+        for r, val in zip(data, cells):
+            well = r[w_col]
+            try:
+                values[well] = float(val)
+            except ValueError:
+                values[well] = np.nan
+                if val and val.lower() != 'nan':
+                    overflow[well] = overflow.get(well, 0) + 1
+        df = pd.DataFrame([values])
+        df.insert(0, 'Time', 0.0)
+        df.attrs['overflow'] = overflow
+        return df
+
+    raise ValueError("No endpoint table found. Expected a 'Well' column header followed by well IDs and values.")
@@ -0,0 +1,58 @@
+"""Kinetic tables (Synergy CSV/Excel, Gen5 text): a 'Time' header cell followed by well IDs."""
+import numpy as np
+import pandas as pd
+
+from ..parser import DataParser
+from . import WELL_PATTERN, time_column
+
+
+def parse(rows):
+    all_data = []
+    overflow = {} # Well -> number of non-numeric reads (e.g. OVRFLW)
+
+    i = 0
+    while i < len(rows):
+        row = [str(x).strip() for x in rows[i]]
+        t_col = time_column(row)
+        if t_col is None:
+            i += 1
+            continue
+
+        header = row
+        block_data = []
+        i += 1
+        while i < len(rows):
+            data_row = rows[i]
+            if not data_row or len(data_row) <= t_col or not str(data_row[t_col]).strip():
+                break
+
+            try:
+                data_row = [str(x).strip() for x in data_row]
+                time_val = DataParser.parse_time(data_row[t_col])
+
+                row_dict = {'Time': time_val}
+                for idx, val in enumerate(data_row):
+                    if idx < len(header):
+                        well = header[idx]
+                        if well and WELL_PATTERN.match(well):
+                            try:
+                                row_dict[well] = float(val)
+                            except ValueError:
+                                row_dict[well] = np.nan
+                                if val and val.lower() != 'nan':
+                                    overflow[well] = overflow.get(well, 0) + 1
+                block_data.append(row_dict)
+                i += 1
+            except ValueError:
+                break
+
+        all_data.extend(block_data)
+
+    if not all_data:
+        raise ValueError("No valid data blocks found. Ensure the file contains a 'Time' column header followed by Well IDs.")
+
+    df = pd.DataFrame(all_data)
+    df = df.groupby('Time').first().reset_index()
+    df = df.sort_values('Time')
+    df.attrs['overflow'] = overflow
+    return df
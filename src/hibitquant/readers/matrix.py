@@ -0,0 +1,80 @@
+"""Plate-by-plate matrix exports: a header of column numbers, then one row per plate row letter.
+
+Each block is one read. A time stamp (h:mm:ss or m:ss) in the header row or
+in the two rows above a block is used as its read time; if any block has
+none, reads are numbered 0, 1, 2, ... instead. Blocks without a single
+numeric value (e.g. Gen5 layout blocks) are skipped.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from ..parser import DataParser
+from . import ROW_PATTERN, matrix_columns
+
+TIME_PATTERN = re.compile(r'\b(\d{1,3}:\d{2}(?::\d{2})?)\b')
+
+
+def block_time(rows, i, start):
+    """Time stamp labelling the block whose header is rows[i], else None."""
+    cells = [str(x) for x in rows[i][:start]]
+    for r in rows[max(0, i - 2):i]:
+        cells.extend(str(x) for x in r)
+    for cell in reversed(cells):
+        m = TIME_PATTERN.search(cell)
+        if m:
+            return DataParser.parse_time(m.group(1))
+    return None
+
+
+def parse(rows):
+    reads = [] # (time or None, {well: value})
+    overflow = {}
+
+    i = 0
+    while i < len(rows):
+        row = [str(x).strip() for x in rows[i]]
+        cols = matrix_columns(row)
+        if cols is None:
+            i += 1
+            continue
+
+        start, n = cols
+        time_val = block_time(rows, i, start)
+        values, block_overflow = {}, {}
+        i += 1
+        while i < len(rows):
+            data_row = [str(x).strip() for x in rows[i]]
+            letter = data_row[start - 1] if len(data_row) >= start else ''
+            if not ROW_PATTERN.match(letter):
+                break
+            for k in range(n):
+                well = f"{letter}{k + 1}"
+                val = data_row[start + k] if start + k < len(data_row) else ''
+                try:
+                    values[well] = float(val)
+                except ValueError:
+                    values[well] = np.nan
+                    if val and val.lower() != 'nan':
+                        block_overflow[well] = block_overflow.get(well, 0) + 1
+            i += 1
+
+        if np.isfinite(list(values.values())).any():
+            reads.append((time_val, values))
+            for well, count in block_overflow.items():
+                overflow[well] = overflow.get(well, 0) + count
+
+    if not reads:
+        raise ValueError("No numeric plate matrix blocks found. Expected a header of column numbers (1, 2, ...) "
+                         "followed by rows labelled A, B, ...")
+
+    times = [t for t, _ in reads]
+    if any(t is None for t in times):
+        times = list(range(len(reads)))
+    df = pd.DataFrame([values for _, values in reads])
+    df.insert(0, 'Time', np.asarray(times, dtype=float))
+    df = df.groupby('Time').first().reset_index()
+    df = df.sort_values('Time')
+    df.attrs['overflow'] = overflow
+    return df
@@ -0,0 +1,248 @@
+"""Batch figure and PDF report generation (requires Matplotlib).
+
+Plates are processed in a process pool. Each worker parses/QCs/quantifies
+one plate and reduces it to the few arrays the figures need; PNG/SVG files
+are rendered and written by the workers themselves with the Agg canvas,
+while PDF pages are drawn in the calling process and streamed into one
+PdfPages file as results arrive. At most a few plates are in flight at any
+time, so memory does not grow with the batch size.
+
+Not imported by `hibitquant` itself, so the core stays Matplotlib-free.
+"""
+import os
+import re
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+
+from .background import DEFAULT_BACKGROUND, BackgroundEngine
+from .features import FEATURES, well_features
+from .parser import DataParser
+from .pipeline import quantify
+from .qc import QCEngine
+from .quant import CURVE_PARAMS, QuantEngine
+
+FIGURES = ['kinetic', 'dose', 'quant']
+FORMATS = ['pdf', 'png', 'svg']
+
+
+def plate_job(name, df=None, path=None, conditions=(), curve=None, background=DEFAULT_BACKGROUND, qc_settings=None,
+              exclude_flagged=True, fit_model='Linear', stock=False, feature='peak', smoothing='median'):
+    """One plate of a report. Give either a parsed `df` or the `path` of the reader export.
+
+    `feature` is the well signal (see SIGNAL_FEATURES) of the dose and concentration figures.
+    """
+    return {'name': name, 'df': df, 'path': path, 'conditions': list(conditions), 'curve': curve,
+            'background': background, 'qc_settings': qc_settings, 'exclude_flagged': exclude_flagged,
+            'fit_model': fit_model, 'stock': stock, 'feature': feature, 'smoothing': smoothing}
+
+
+def plate_data(job):
+    """Reduces one plate to the arrays plotted in its figures (runs in a worker)."""
+    try:
+        df = job['df'] if job['df'] is not None else DataParser.parse_file(job['path'])
+        conditions = [dict(c, color=c.get('color') or f"C{i % 10}") for i, c in enumerate(job['conditions'])]
+
+        qc = QCEngine.run(df, conditions, **(job['qc_settings'] or {}))
+        excluded = set(qc.index[qc['flagged']]) if job['exclude_flagged'] else set()
+        valid = [[w for w in c['wells'] if w in df.columns and w not in excluded] for c in conditions]
+        blank_wells = [w for c, wells in zip(conditions, valid) if c.get('blank') for w in wells]
+        df = BackgroundEngine.correct(df, blank_wells, job['background'])
+
+        out = {'name': job['name'], 'kinetic': [], 'dose': None, 'quant': None, 'feature': job['feature']}
+        features = well_features(df, job['smoothing'])
+        time = df['Time'].to_numpy(dtype=float)
+        points = []
+        for cond, wells in zip(conditions, valid):
+            if not wells: continue
+            X = df[wells].to_numpy(dtype=float)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                out['kinetic'].append((cond['name'], cond['color'], time, np.nanmean(X, axis=1), np.nanstd(X, axis=1, ddof=1)))
+            peaks = features[job['feature']].reindex(wells).to_numpy(dtype=float)
+            if cond.get('conc') is not None:
+                points.append((cond['conc'], np.nanmean(peaks), np.std(peaks, ddof=1) if len(peaks) > 1 else np.nan,
+                               cond['name'], cond['color']))
+
+        if len(points) >= 2:
+            dose = pd.DataFrame(points, columns=['conc', 'mean', 'std', 'name', 'color']).sort_values('conc')
+            try:
+                fit, error = QuantEngine.fit_curve(dose['conc'], dose['mean'], job['fit_model']), None
+            except (ValueError, RuntimeError) as e:
+                fit, error = None, str(e)
+            out['dose'] = {'points': dose, 'fit': fit, 'error': error, 'model': job['fit_model']}
+
+        if job['curve'] is not None:
+            result = quantify(df, conditions, job['curve'], exclude=excluded, feature=job['feature'], features=features)
+            if result.valid and len(result.conditions):
+                cond = result.conditions
+                out['quant'] = {
+                    'names': [f"{conditions[i]['name']} @{conditions[i].get('dilution', 1.0):g}" for i in cond['condition']],
+                    'colors': [conditions[i]['color'] for i in cond['condition']],
+                    'means': (cond['stock_conc'] if job['stock'] else cond['conc']).to_numpy(),
+                    'stds': (cond['stock_std'] if job['stock'] else cond['std']).to_numpy(),
+                    'out_of_range': ~cond['in_range'].to_numpy(dtype=bool),
+                    'stock': job['stock'],
+                }
+        return out
+    except Exception as e:
+        return {'name': job['name'], 'error': f"{type(e).__name__}: {e}"}
+
+
+def draw_kinetic(fig, data):
+    ax = fig.add_subplot(111)
+    for label, color, time, mean, std in data['kinetic']:
+        ax.errorbar(time, mean, yerr=std, label=label, color=color, fmt='-o', capsize=3, markersize=4, alpha=0.8)
+    ax.set_title(f"Kinetic Trace - {data['name']}")
+    ax.set_xlabel("Time (min)")
+    ax.set_ylabel("RLU")
+    if data['kinetic']:
+        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0., fontsize=8)
+    ax.grid(True, which='both', linestyle='--', alpha=0.5)
+
+
+def draw_dose(fig, data):
+    ax = fig.add_subplot(111)
+    dose = data['dose']
+    ax.set_title(f"Standard Curve - {data['name']}")
+    if dose is None:
+        ax.text(0.5, 0.5, "Fewer than 2 conditions with a concentration.", ha='center', va='center', transform=ax.transAxes)
+        return
+    pts = dose['points']
+    ax.errorbar(pts['conc'], pts['mean'], yerr=pts['std'], fmt='none', capsize=5, ecolor='black', zorder=1)
+    for _, row in pts.iterrows():
+        ax.scatter(row['conc'], row['mean'], color=row['color'], s=60, label=row['name'], zorder=2)
+    fit, model = dose['fit'], dose['model']
+    if fit is None:
+        text = f"{model} fit failed:\n{dose['error']}"
+    else:
+        x = pts['conc'][pts['conc'] > 0] if model != 'Linear' else pts['conc']
+        x_range = np.linspace(x.min(), pts['conc'].max(), 100)
+        ax.plot(x_range, QuantEngine.predict(x_range, QuantEngine.curve_arrays({'fit': fit})), 'k--', alpha=0.7, zorder=1)
+        if model == 'Linear':
+            text = f"y = {fit['m']:.2f}x + {fit['b']:.2f}"
+        elif model == 'Log-Log':
+            text = f"log y = {fit['m']:.3f}·log x + {fit['b']:.3f}"
+        else:
+            text = "\n".join(f"{p} = {fit[p]:.4g}" for p in CURVE_PARAMS[:4 if model == '4PL' else 5])
+        text += f"\nR² = {fit['r^2']:.4f}"
+    ax.text(0.05, 0.95, text, transform=ax.transAxes, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+    ax.set_xlabel("Concentration (µg/mL)")
+    ax.set_ylabel(FEATURES[data['feature']])
+    ax.grid(True, which='both', linestyle='--', alpha=0.5)
+
+
+def draw_quant(fig, data):
+    ax = fig.add_subplot(111)
+    q = data['quant']
+    if q is None:
+        ax.set_title(f"Concentrations - {data['name']}")
+        ax.text(0.5, 0.5, "No standard curve or no quantifiable wells.", ha='center', va='center', transform=ax.transAxes)
+        return
+    x_pos = np.arange(len(q['names']))
+    ax.bar(x_pos, q['means'], yerr=q['stds'], align='center', alpha=0.7, ecolor='black', capsize=10, color=q['colors'])
+    top = np.nan_to_num(q['means']) + np.nan_to_num(q['stds'])
+    offset = 0.05 * (np.nanmax(q['means']) if np.isfinite(q['means']).any() else 1)
+    for i, val in enumerate(q['means']):
+        ax.text(x_pos[i], top[i] + offset * 0.2, f"{val:.2f}", ha='center', va='bottom', fontsize=9)
+        if q['out_of_range'][i]:
+            ax.text(x_pos[i], top[i] + offset, "!", ha='center', va='bottom', color='red', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Stock Concentration (µg/mL)' if q['stock'] else 'Concentration (µg/mL)')
+    ax.set_title(f"{'Stock' if q['stock'] else 'Calculated'} Concentrations - {data['name']}")
+    ax.set_xticks(x_pos)
+    ax.set_xticklabels(q['names'], rotation=45, ha='right')
+    ax.yaxis.grid(True)
+
+
+DRAW = {'kinetic': draw_kinetic, 'dose': draw_dose, 'quant': draw_quant}
+
+
+def figure(data, kind):
+    """A standalone Agg figure (no pyplot state, safe in any process)."""
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    DRAW[kind](fig, data)
+    fig.tight_layout()
+    return fig
+
+
+def _file_stem(name):
+    return re.sub(r'[^\w.-]+', '_', os.path.splitext(name)[0]).strip('_') or 'plate'
+
+
+def render_files(job, out_dir, figures=FIGURES, fmt='png', dpi=300):
+    """Computes and writes one plate's figures as <plate>_<figure>.<fmt> (runs in a worker)."""
+    data = plate_data(job)
+    if 'error' in data:
+        return data
+    paths = []
+    for kind in figures:
+        path = os.path.join(out_dir, f"{_file_stem(data['name'])}_{kind}.{fmt}")
+        figure(data, kind).savefig(path, dpi=dpi, bbox_inches='tight')
+        paths.append(path)
+    return {'name': data['name'], 'files': paths}
+
+
+def _bounded_map(pool, fn, jobs, window):
+    """Like pool.map, but keeps at most `window` jobs submitted ahead of the consumer."""
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def generate_report(jobs, out, fmt='pdf', figures=FIGURES, dpi=300, workers=None, progress=None, stop=None):
+    """Renders `figures` for every plate job.
+
+    fmt='pdf' writes one multi-page PDF to `out` (one page per plate and
+    figure); 'png'/'svg' write individual files into the directory `out`.
+    `progress(done, total)` is called after each plate; once `stop()` returns
+    True the remaining plates are skipped (a PDF is closed with the pages
+    written so far). Returns {'files': [...], 'errors': {plate name: message}}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    unknown = [kind for kind in figures if kind not in FIGURES]
+    if unknown:
+        raise ValueError(f"Unknown report figure(s): {', '.join(unknown)} (choose from {', '.join(FIGURES)})")
+    jobs = list(jobs)
+    workers = workers or min(len(jobs), os.cpu_count() or 1) or 1
+    files, errors = [], {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if fmt == 'pdf':
+            with PdfPages(out) as pdf:
+                for i, data in enumerate(_bounded_map(pool, plate_data, jobs, 2 * workers)):
+                    if 'error' in data:
+                        errors[data['name']] = data['error']
+                    else:
+                        for kind in figures:
+                            pdf.savefig(figure(data, kind))
+                    if progress: progress(i + 1, len(jobs))
+                    if stop and stop():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        break
+            files.append(out)
+        else:
+            os.makedirs(out, exist_ok=True)
+            fn = partial(render_files, out_dir=out, figures=figures, fmt=fmt, dpi=dpi)
+            for i, res in enumerate(_bounded_map(pool, fn, jobs, 2 * workers)):
+                if 'error' in res:
+                    errors[res['name']] = res['error']
+                else:
+                    files.extend(res['files'])
+                if progress: progress(i + 1, len(jobs))
+                if stop and stop():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+    return {'files': files, 'errors': errors}
@@ -0,0 +1,26 @@
+"""Locating bundled resource files."""
+import os
+import sys
+
+
+def resource_path(*parts):
+    """Absolute path of a file in the `resources` directory.
+
+    Looks next to a frozen executable (and in its bundle), next to the
+    package, in `src/` and in the checkout root (the source layout) and
+    finally in the working directory. Returns the first existing candidate,
+    or the first one whose directory exists if none exists yet.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    src = os.path.dirname(here)
+    roots = []
+    if getattr(sys, 'frozen', False):
+        roots.append(os.path.dirname(sys.executable))
+        roots.append(getattr(sys, '_MEIPASS', ''))
+    roots += [here, src, os.path.dirname(src), os.getcwd()]
+    candidates = [os.path.join(root, 'resources', *parts) for root in roots if root]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    existing_dirs = [c for c in candidates if os.path.isdir(os.path.dirname(c))]
+    return existing_dirs[0] if existing_dirs else candidates[0]
@@ -0,0 +1,411 @@
+"""Local HTTP quantification service (`python -m hibitquant serve`).
+
+Endpoints (JSON responses):
+
+    GET  /health                     queue (running and waiting requests) and cache status
+    GET  /curves                     names of the curves in the library
+    POST /parse?name=plate.csv       raw reader export in the body -> plate_id (SHA-256 of the file)
+    POST /layout?plate_id=...        {"conditions": [...]} or a guide file (?name=guide.xlsx) in the body
+    POST /quantify                   {"plate_id": ..., "curve": name or curve dict, "feature": "peak", ...} -> results
+
+Requests are handled by a bounded worker pool; when every worker is busy
+and the queue is full, new connections get 503 immediately. Parsed plates
+are cached by file hash, so re-posting the same file does not parse it again.
+"""
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from .background import DEFAULT_BACKGROUND, BackgroundEngine
+from .features import SMOOTHING
+from .library import CurveLibrary
+from .models import Condition
+from .normalize import CalibrationEngine
+from .parser import DataParser
+from .pipeline import quantify_plate
+from .quant import CURVE_MODELS, CURVE_PARAMS
+
+
+MODEL_PARAMS = dict(zip(CURVE_MODELS, [['m', 'b'], ['m', 'b'], CURVE_PARAMS[:4], CURVE_PARAMS])) # Parameters each model needs
+MODEL_NAMES = {m.lower().replace('-', ''): m for m in CURVE_MODELS}
+BOOTSTRAP_ARGS = {'n_iter': int, 'seed': int, 'level': float} # QuantEngine.bootstrap keyword arguments
+QC_ARGS = {'saturation': float, 'max_nan_frac': float, 'method': str, 'threshold': float, 'alpha': float} # QCEngine.run
+QC_METHODS = ['robust-z', 'grubbs']
+SERIES_MODES = ['best', 'average']
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _records(df):
+    """DataFrame -> list of dicts with NaN as null."""
+    return json.loads(df.to_json(orient='records')) if df is not None and len(df) else []
+
+
+class QuantService:
+    """The request handlers, independent of the HTTP transport.
+
+    Holds an LRU cache of parsed plates keyed by file hash together with the
+    layout applied to each plate.
+    """
+
+    def __init__(self, library_path=None, cache_size=64):
+        self.library = CurveLibrary(library_path)
+        self.cache_size = cache_size
+        self.plates = OrderedDict() # file hash -> {'name', 'df', 'conditions'}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.queue_status = None # Set by QuantServer: () -> {'running': n, 'waiting': n}
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/curves'): self.curves,
+            ('POST', '/parse'): self.parse,
+            ('POST', '/layout'): self.layout,
+            ('POST', '/quantify'): self.quantify,
+        }
+
+    # --- Plate cache ---
+    def _get(self, plate_id):
+        with self.lock:
+            if plate_id not in self.plates:
+                raise ServiceError(404, f"Unknown plate_id {plate_id!r}; POST the file to /parse first.")
+            self.plates.move_to_end(plate_id)
+            return self.plates[plate_id]
+
+    def _put(self, plate_id, rec):
+        with self.lock:
+            self.plates[plate_id] = rec
+            self.plates.move_to_end(plate_id)
+            while len(self.plates) > self.cache_size:
+                self.plates.popitem(last=False)
+
+    @staticmethod
+    def _parse_upload(body, name, parse):
+        """Runs a path-based parser on an uploaded file body."""
+        if not body:
+            raise ServiceError(400, "Empty request body.")
+        suffix = os.path.splitext(name)[1] or '.csv'
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix='hibitquant_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            return parse(path)
+        except ValueError as e:
+            raise ServiceError(400, str(e))
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def _json(body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError as e:
+            raise ServiceError(400, f"Invalid JSON: {e}")
+        if not isinstance(payload, dict):
+            raise ServiceError(400, "Expected a JSON object.")
+        return payload
+
+    # --- Endpoints ---
+    def health(self, body, query, headers):
+        with self.lock:
+            status = {'status': 'ok', 'cached_plates': len(self.plates), 'cache_hits': self.hits,
+                      'cache_misses': self.misses}
+        if self.queue_status is not None:
+            status.update(self.queue_status())
+        return status
+
+    def curves(self, body, query, headers):
+        if not self.library.exists():
+            return {'curves': []}
+        return {'curves': [{'name': name, 'model': rec.get('Model', 'Linear')} for name, rec in self.library.load().items()]}
+
+    def parse(self, body, query, headers):
+        name = query.get('name') or headers.get('X-Filename') or 'plate.csv'
+        plate_id = hashlib.sha256(body).hexdigest()
+        with self.lock:
+            rec = self.plates.get(plate_id)
+            if rec is not None:
+                self.plates.move_to_end(plate_id)
+                self.hits += 1
+            else:
+                self.misses += 1
+        cached = rec is not None
+        if not cached:
+            rec = {'name': name, 'df': self._parse_upload(body, name, DataParser.parse_file), 'conditions': None}
+            self._put(plate_id, rec)
+        df = rec['df']
+        wells = [c for c in df.columns if c != 'Time']
+        return {'plate_id': plate_id, 'name': rec['name'], 'cached': cached, 'wells': wells,
+                'n_times': len(df), 'time_range': [float(df['Time'].min()), float(df['Time'].max())],
+                'overflow': df.attrs.get('overflow', {})}
+
+    def layout(self, body, query, headers):
+        content_type = headers.get('Content-Type', '')
+        if 'json' in content_type or not query.get('name'):
+            payload = self._json(body)
+            plate_id = query.get('plate_id') or payload.get('plate_id')
+            conditions = payload.get('conditions')
+            if not isinstance(conditions, list):
+                raise ServiceError(400, "Expected a 'conditions' list.")
+        else:
+            plate_id = query.get('plate_id')
+            conditions = self._parse_upload(body, query['name'], DataParser.parse_guide_file)
+        rec = self._get(plate_id)
+        conditions = self._conditions(conditions)
+        rec['conditions'] = conditions
+        present = set(rec['df'].columns)
+        return {'plate_id': plate_id, 'conditions': conditions,
+                'missing_wells': sorted({w for c in conditions for w in c['wells'] if w not in present})}
+
+    def quantify(self, body, query, headers):
+        payload = self._json(body)
+        rec = self._get(payload.get('plate_id'))
+        if 'conditions' in payload:
+            if not isinstance(payload['conditions'], list):
+                raise ServiceError(400, "Expected a 'conditions' list.")
+            conditions = self._conditions(payload['conditions'])
+        else:
+            conditions = rec['conditions']
+        if not conditions:
+            raise ServiceError(400, "No layout; POST /layout or pass 'conditions'.")
+        curve = self._curve(payload.get('curve'))
+        bootstrap = self._bootstrap(payload.get('bootstrap'))
+        background = payload.get('background', DEFAULT_BACKGROUND)
+        if background not in BackgroundEngine.MODES:
+            raise ServiceError(400, f"Unknown background mode {background!r}.")
+        smoothing = payload.get('smoothing', 'median')
+        if smoothing not in SMOOTHING:
+            raise ServiceError(400, f"Unknown smoothing {smoothing!r}.")
+        series_mode = payload.get('series_mode', 'best')
+        if series_mode not in SERIES_MODES:
+            raise ServiceError(400, f"Unknown series_mode {series_mode!r} (expected one of {', '.join(SERIES_MODES)}).")
+        qc_settings = self._qc(payload.get('qc'))
+        try:
+            result = quantify_plate(rec['df'], conditions, curve, background=background,
+                                    qc_settings=qc_settings, exclude_flagged=payload.get('exclude_flagged', True),
+                                    bootstrap=bootstrap, series_mode=series_mode,
+                                    feature=payload.get('feature', 'peak'), smoothing=smoothing,
+                                    normalize=bool(payload.get('normalize', False)))
+        except (TypeError, ValueError) as e:
+            raise ServiceError(400, str(e))
+        flagged = result.qc[result.qc['flagged']]['reason'].to_dict()
+        return {'plate_id': payload['plate_id'], 'curve': curve.get('Name', 'Custom'), 'feature': result.feature,
+                'scale': result.scale, 'valid': result.valid,
+                'conditions': _records(result.conditions), 'wells': _records(result.wells),
+                'samples': _records(result.samples), 'qc_flagged': flagged}
+
+    # --- Validation ---
+    @staticmethod
+    def _conditions(conditions):
+        out = []
+        for i, c in enumerate(conditions):
+            if not isinstance(c, dict) or 'name' not in c or not isinstance(c.get('wells'), list):
+                raise ServiceError(400, f"Condition {i} needs a 'name' and a 'wells' list.")
+            c = dict(c)
+            c.setdefault('blank', str(c['name']).lower().startswith('blank'))
+            c.setdefault('calibrator', CalibrationEngine.is_calibrator_name(c['name']))
+            try:
+                c['dilution'] = float(c.get('dilution') or 1.0)
+            except (TypeError, ValueError):
+                raise ServiceError(400, f"Condition {i} has a non-numeric dilution.")
+            out.append(Condition.from_dict(c).to_dict())
+        return out
+
+    def _curve(self, curve):
+        if isinstance(curve, str):
+            try:
+                curves = self.library.load()
+            except (OSError, ValueError) as e:
+                raise ServiceError(500, f"Could not load curve library: {e}")
+            if curve not in curves:
+                raise ServiceError(404, f"Unknown curve {curve!r}.")
+            curve = dict(curves[curve], Name=curve)
+        elif not isinstance(curve, dict):
+            raise ServiceError(400, "Expected 'curve' to be a library curve name or a curve object.")
+        raw = curve.get('Model')
+        if raw is None or (isinstance(raw, float) and np.isnan(raw)) or not str(raw).strip():
+            model = 'Linear' # Blank, as in the library
+        else:
+            model = MODEL_NAMES.get(str(raw).strip().lower().replace('-', '').replace(' ', ''))
+            if model is None:
+                raise ServiceError(400, f"Unknown curve model {raw!r} (expected one of {', '.join(CURVE_MODELS)}).")
+        missing = []
+        for p in MODEL_PARAMS[model]:
+            try:
+                if not np.isfinite(float(curve.get(p))):
+                    missing.append(p)
+            except (TypeError, ValueError):
+                missing.append(p)
+        if missing:
+            raise ServiceError(400, f"{model} curve needs numeric {', '.join(missing)}.")
+        return curve
+
+    @staticmethod
+    def _options(options, name, types, nullable=()):
+        """Checks an options object against {key: type}; returns a copy with the values converted."""
+        if not isinstance(options, dict):
+            raise ServiceError(400, f"Expected '{name}' to be an object with {', '.join(types)}.")
+        unknown = set(options) - set(types)
+        if unknown:
+            raise ServiceError(400, f"Unknown {name} option(s): {', '.join(sorted(unknown))}.")
+        out = {}
+        for key, value in options.items():
+            if value is None and key in nullable:
+                out[key] = None
+            elif types[key] is str:
+                if not isinstance(value, str):
+                    raise ServiceError(400, f"The {name} option {key!r} must be text.")
+                out[key] = value
+            else:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ServiceError(400, f"The {name} option {key!r} must be a number.")
+                out[key] = types[key](value)
+        return out
+
+    @staticmethod
+    def _bootstrap(bootstrap):
+        if bootstrap is None:
+            return None
+        out = QuantService._options(bootstrap, 'bootstrap', BOOTSTRAP_ARGS)
+        if out.get('n_iter', 1) < 1 or not 0 < out.get('level', 95.0) < 100:
+            raise ServiceError(400, "Bootstrap needs n_iter >= 1 and 0 < level < 100.")
+        return out
+
+    @staticmethod
+    def _qc(qc):
+        if qc is None:
+            return None
+        out = QuantService._options(qc, 'qc', QC_ARGS, nullable=('saturation',)) # None: no RLU ceiling
+        if out.get('method', QC_METHODS[0]) not in QC_METHODS:
+            raise ServiceError(400, f"Unknown qc method {out['method']!r} (expected one of {', '.join(QC_METHODS)}).")
+        return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "HiBitQuant"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        service = self.server.service
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > self.server.max_body:
+                raise ServiceError(413, f"Request body exceeds {self.server.max_body} bytes.")
+            body = self.rfile.read(length) if length else b''
+            handler = service.routes.get((method, url.path.rstrip('/') or '/'))
+            if handler is None:
+                raise ServiceError(404, f"No endpoint {method} {url.path}")
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            status, payload = 200, handler(body, query, self.headers)
+        except ServiceError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        self._send(status, payload)
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class QuantServer(HTTPServer):
+    """HTTP server whose connections are handled by a bounded thread pool.
+
+    At most `workers` requests run at once and up to `queue_size` more wait
+    for a free worker; beyond that connections are answered with 503.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, workers=4, queue_size=32, service=None,
+                 max_body=256 * 1024 ** 2, quiet=False):
+        super().__init__((host, port), _Handler)
+        self.service = service or QuantService()
+        self.max_body = max_body
+        self.quiet = quiet
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hibitquant')
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.counts = {'running': 0, 'waiting': 0}
+        self.counts_lock = threading.Lock()
+        self.service.queue_status = self.queue_status
+
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            self._reject(request)
+            return
+        self._count('waiting', 1)
+        self.pool.submit(self._work, request, client_address)
+
+    def _count(self, key, delta):
+        with self.counts_lock:
+            self.counts[key] += delta
+
+    def queue_status(self):
+        """Requests being handled and waiting for a worker (the /health request itself is running)."""
+        with self.counts_lock:
+            return dict(self.counts)
+
+    def _work(self, request, client_address):
+        self._count('waiting', -1)
+        self._count('running', 1)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._count('running', -1)
+            self.slots.release()
+
+    def _reject(self, request):
+        data = json.dumps({'error': "Server busy, retry later."}).encode()
+        try:
+            request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Type: application/json\r\n"
+                            b"Retry-After: 1\r\nConnection: close\r\n"
+                            + f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def serve(host='127.0.0.1', port=8765, workers=4, queue_size=32, library_path=None, cache_size=64, quiet=False):
+    """Runs the service until interrupted."""
+    server = QuantServer(host, port, workers, queue_size, QuantService(library_path, cache_size), quiet=quiet)
+    print(f"HiBitQuant service on http://{host}:{server.server_port} ({workers} workers, queue {queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,150 @@
+"""Apparent concentration over the course of a kinetic read.
+
+Quantification normally inverts one signal per well (its peak). Here the
+standard curve is applied to the whole (time x wells) signal matrix in one
+broadcast inversion, giving the concentration each well would have been
+assigned had the plate been read at that time point. Condition traces (mean,
+sd and number of wells over time) are reduced from the matrix with the same
+membership-matrix products as the condition statistics, and `stable_window`
+finds the run of reads over which the condition concentrations change
+least, i.e. the read window to use.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .features import PLATE_SHAPES, plate_format, smooth, well_positions
+from .quant import QuantEngine
+
+TIME_SIGNALS = ['peak', 'smoothed_peak'] # Signals read off a single point of the trace, so every read has one
+STABLE_READS = 5
+
+
+@dataclass
+class TimeCourse:
+    """Concentration of every well at every read (see `TimeCourseEngine.compute`).
+
+    `conc` is (n_times, n_wells) over `times` and `wells`; `dilution` is
+    each well's condition dilution (NaN for unassigned wells). The condition
+    traces `mean`, `sd` and `n` are (n_times, n_conditions) over the
+    condition `names`/`dilutions`; `blank` marks blank conditions.
+    """
+    times: np.ndarray
+    wells: list
+    conc: np.ndarray
+    dilution: np.ndarray
+    names: list
+    dilutions: np.ndarray
+    blank: np.ndarray
+    mean: np.ndarray
+    sd: np.ndarray
+    n: np.ndarray
+    scale: float = 1.0
+
+    @property
+    def stock(self):
+        return self.conc * self.dilution
+
+    def plate_frames(self, stock=False, fmt=None):
+        """(n_times, rows, cols) plate matrices of every read, scattered in one assignment."""
+        n_rows, n_cols = PLATE_SHAPES[fmt or plate_format(self.wells)]
+        rows, cols = well_positions(self.wells)
+        ok = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+        frames = np.full((len(self.times), n_rows, n_cols), np.nan)
+        frames[:, rows[ok], cols[ok]] = (self.stock if stock else self.conc)[:, ok]
+        return frames
+
+    def drift(self):
+        return TimeCourseEngine.drift(self.times, self.mean[:, ~self.blank])
+
+    def stable_window(self, n_reads=STABLE_READS):
+        return TimeCourseEngine.stable_window(self.times, self.mean[:, ~self.blank], n_reads)
+
+    def well_table(self, stock=False):
+        """Time column plus one concentration column per well."""
+        df = pd.DataFrame(self.stock if stock else self.conc, columns=self.wells)
+        df.insert(0, 'Time', self.times)
+        return df
+
+    def trace_table(self):
+        """Long table: one row per condition and read."""
+        n_times, n_cond = self.mean.shape
+        return pd.DataFrame({
+            'time': np.repeat(self.times, n_cond),
+            'condition': np.tile(np.arange(n_cond), n_times),
+            'sample': np.tile(np.asarray(self.names, dtype=object), n_times),
+            'dilution': np.tile(self.dilutions, n_times),
+            'n_wells': self.n.ravel().astype(int),
+            'conc': self.mean.ravel(),
+            'std': self.sd.ravel(),
+            'stock_conc': (self.mean * self.dilutions).ravel(),
+        })
+
+
+class TimeCourseEngine:
+    """Whole-matrix curve inversion and read-window stability."""
+
+    @staticmethod
+    def compute(df, conditions, curve, exclude=(), scale=1.0, smoothing='none'):
+        """TimeCourse of a (background corrected) plate against one curve.
+
+        Every read of every well is multiplied by `scale` (a calibrator
+        factor) and inverted at once; with `smoothing` (see SMOOTHING) the
+        traces are smoothed first, matching a curve built from the smoothed
+        peak. Condition traces leave out the wells in `exclude`.
+        """
+        wells = [c for c in df.columns if c != 'Time']
+        X = df[wells].to_numpy(dtype=float)
+        if smoothing != 'none':
+            X = smooth(X, smoothing)
+        conc = QuantEngine.invert(X * scale, QuantEngine.curve_arrays({'current': curve}))
+
+        n_cond = len(conditions)
+        member, _, cond_idx = QuantEngine.condition_peaks(df, conditions, exclude)
+        col = {w: j for j, w in enumerate(wells)}
+        mean, sd, n = QuantEngine.group_stats(conc[:, [col[w] for w in member]].T, cond_idx, n_cond)
+
+        dilutions = np.array([c.get('dilution', 1.0) for c in conditions], dtype=float)
+        well_dil = {w: d for c, d in zip(conditions, dilutions) for w in c['wells']}
+        return TimeCourse(df['Time'].to_numpy(dtype=float), wells, conc,
+                          np.array([well_dil.get(w, np.nan) for w in wells]), [c['name'] for c in conditions],
+                          dilutions, np.array([bool(c.get('blank')) for c in conditions], dtype=bool),
+                          mean.T, sd.T, n.T, float(scale))
+
+    @staticmethod
+    def drift(times, mean):
+        """Median over conditions of the relative rate of change of their concentration (%/min) at every read."""
+        times = np.asarray(times, dtype=float)
+        mean = np.asarray(mean, dtype=float).reshape(len(times), -1)
+        if len(times) < 2 or not mean.shape[1]:
+            return np.full(len(times), np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = 100 * np.abs(np.gradient(mean, times, axis=0) / mean)
+        rate[~np.isfinite(rate)] = np.nan
+        out = np.full(len(times), np.nan)
+        has = np.isfinite(rate).any(axis=1)
+        out[has] = np.nanmedian(rate[has], axis=1)
+        return out
+
+    @staticmethod
+    def stable_window(times, mean, n_reads=STABLE_READS):
+        """(start, end) read indices (end inclusive) of the `n_reads` consecutive reads with the lowest mean drift.
+
+        None if the drift cannot be computed (fewer reads than `n_reads`, or
+        no condition with a finite concentration).
+        """
+        drift = TimeCourseEngine.drift(times, mean)
+        n_reads = max(int(n_reads), 1)
+        if len(drift) < n_reads:
+            return None
+        ok = np.isfinite(drift)
+        kernel = np.ones(n_reads)
+        total = np.convolve(np.where(ok, drift, 0.0), kernel, 'valid')
+        count = np.convolve(ok.astype(float), kernel, 'valid')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            score = np.where(count == n_reads, total / count, np.inf)
+        if not np.isfinite(score).any():
+            return None
+        start = int(np.argmin(score))
+        return start, start + n_reads - 1
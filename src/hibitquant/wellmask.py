@@ -0,0 +1,159 @@
+"""Well sets as fixed-size bitmasks over a plate format.
+
+Bit i of a WellMask is the well at row i // n_cols, column i % n_cols (A1 is
+bit 0, A2 bit 1, ...). Set operations are single integer operations, and
+the pattern selectors build their masks arithmetically (repeating a row
+pattern down the plate is one multiplication by a repunit), so they cost
+the same on a 1536-well plate as on a 96-well one.
+"""
+from .features import PLATE_SHAPES, WELL_PATTERN, row_index, row_label
+
+
+def _repeat(pattern, width, times):
+    """`pattern` (a `width`-bit int) repeated `times` times: pattern * (1 + 2^width + 2^2width + ...)."""
+    return pattern * (((1 << (width * times)) - 1) // ((1 << width) - 1))
+
+
+class WellMask:
+    """An immutable set of wells of one plate format (96, 384 or 1536)."""
+    __slots__ = ('fmt', 'bits')
+
+    def __init__(self, fmt=96, bits=0):
+        if fmt not in PLATE_SHAPES:
+            raise ValueError(f"Unknown plate format: {fmt}")
+        self.fmt = fmt
+        self.bits = bits & ((1 << (PLATE_SHAPES[fmt][0] * PLATE_SHAPES[fmt][1])) - 1)
+
+    @property
+    def shape(self):
+        return PLATE_SHAPES[self.fmt]
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    # --- Wells <-> bits ---
+    def index(self, well):
+        """Bit index of a well ID, or None if it is not on this plate."""
+        m = WELL_PATTERN.match(well)
+        if not m:
+            return None
+        r, c = row_index(m.group(1)), int(m.group(2)) - 1
+        n_rows, n_cols = self.shape
+        return r * n_cols + c if 0 <= r < n_rows and 0 <= c < n_cols else None
+
+    def well(self, index):
+        return f"{row_label(index // self.shape[1])}{index % self.shape[1] + 1}"
+
+    @classmethod
+    def from_wells(cls, wells, fmt=96):
+        mask = cls(fmt)
+        bits = 0
+        for w in wells:
+            i = mask.index(str(w))
+            if i is not None:
+                bits |= 1 << i
+        return cls(fmt, bits)
+
+    def indices(self):
+        """Set bit indices in plate order."""
+        bits, out = self.bits, []
+        while bits:
+            low = bits & -bits
+            out.append(low.bit_length() - 1)
+            bits ^= low
+        return out
+
+    def wells(self):
+        """Well IDs in plate order (A1, A2, ..., B1, ...)."""
+        return [self.well(i) for i in self.indices()]
+
+    # --- Set operations ---
+    def _bits(self, other):
+        if isinstance(other, WellMask):
+            if other.fmt != self.fmt:
+                raise ValueError(f"Cannot combine {self.fmt}- and {other.fmt}-well masks.")
+            return other.bits
+        return WellMask.from_wells(other, self.fmt).bits
+
+    def __or__(self, other):
+        return WellMask(self.fmt, self.bits | self._bits(other))
+
+    def __and__(self, other):
+        return WellMask(self.fmt, self.bits & self._bits(other))
+
+    def __sub__(self, other):
+        return WellMask(self.fmt, self.bits & ~self._bits(other))
+
+    def __xor__(self, other):
+        return WellMask(self.fmt, self.bits ^ self._bits(other))
+
+    def __invert__(self):
+        return WellMask(self.fmt, ~self.bits)
+
+    def __eq__(self, other):
+        return isinstance(other, WellMask) and (self.fmt, self.bits) == (other.fmt, other.bits)
+
+    def __hash__(self):
+        return hash((self.fmt, self.bits))
+
+    def __contains__(self, well):
+        i = self.index(well)
+        return i is not None and bool(self.bits >> i & 1)
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __iter__(self):
+        return iter(self.wells())
+
+    def __repr__(self):
+        return f"WellMask({self.fmt}, {len(self)} wells)"
+
+    # --- Pattern selectors ---
+    @classmethod
+    def all(cls, fmt=96):
+        return cls(fmt, -1)
+
+    @classmethod
+    def row(cls, fmt, r):
+        """Every well of row `r` (0-based)."""
+        n_cols = PLATE_SHAPES[fmt][1]
+        return cls(fmt, ((1 << n_cols) - 1) << (r * n_cols))
+
+    @classmethod
+    def column(cls, fmt, c):
+        """Every well of column `c` (0-based)."""
+        n_rows, n_cols = PLATE_SHAPES[fmt]
+        return cls(fmt, _repeat(1 << c, n_cols, n_rows))
+
+    @classmethod
+    def checkerboard(cls, fmt, parity=0):
+        """Wells whose row + column is even (parity 0, including A1) or odd (parity 1)."""
+        n_rows, n_cols = PLATE_SHAPES[fmt]
+        full = (1 << n_cols) - 1
+        even = _repeat(1, 2, (n_cols + 1) // 2) & full # Columns 1, 3, 5, ... of one row
+        pair = ((even << parity) & full) | (((even << (1 - parity)) & full) << n_cols)
+        return cls(fmt, _repeat(pair, 2 * n_cols, n_rows // 2))
+
+    @classmethod
+    def interleave(cls, fmt, row_offset, col_offset, step=2):
+        """Every `step`-th row and column from the offsets, e.g. one 96-well source plate of a 384-well plate."""
+        n_rows, n_cols = PLATE_SHAPES[fmt]
+        cols = _repeat(1, step, (n_cols + step - 1) // step) << col_offset & ((1 << n_cols) - 1)
+        return cls(fmt, _repeat(cols << (row_offset * n_cols), step * n_cols, n_rows // step))
+
+    @classmethod
+    def quadrant(cls, fmt, q):
+        """Quadrant q (0-3) of the 2x2 interleave: the wells one smaller-format plate was stamped into.
+
+        On a 384-well plate quadrant 0 is A1, A3, ..., C1, ... (96-well plate 1),
+        1 starts at A2, 2 at B1 and 3 at B2; a 1536-well plate splits into
+        four 384-well quadrants the same way.
+        """
+        if not 0 <= q < 4:
+            raise ValueError("Quadrant must be 0-3.")
+        return cls.interleave(fmt, q // 2, q % 2)
@@ -0,0 +1,107 @@
+"""Multi-plate workspace with least-recently-used offloading."""
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class PlateWorkspace:
+    """Holds many loaded plates, each with its own conditions.
+
+    Each plate is kept as its parsed float64 (time x wells) values, time
+    vector and well list, so it quantifies exactly as through
+    `quantify_plate`; this takes as much memory as the parsed DataFrame.
+    Memory is bounded by eviction: when the resident arrays exceed the
+    budget, the least recently used inactive plates are written to an
+    on-disk store and reloaded transparently on the next access.
+    """
+
+    def __init__(self, budget_mb=512, store_dir=None):
+        self.budget_mb = budget_mb
+        self.store_dir = store_dir
+        self.plates = OrderedDict() # plate_id -> record, least recently used first
+        self.active = None
+        self._next_id = 1
+
+    def add(self, df, name, path=None, conditions=None):
+        pid = self._next_id
+        self._next_id += 1
+        rec = {'name': name, 'path': path, 'conditions': conditions or [], 'file': None}
+        rec.update(self._arrays(df))
+        self.plates[pid] = rec
+        self._enforce_budget()
+        return pid
+
+    def remove(self, pid):
+        rec = self.plates.pop(pid)
+        if rec['file'] and os.path.exists(rec['file']):
+            os.remove(rec['file'])
+        if self.active == pid:
+            self.active = None
+
+    def names(self):
+        return [(pid, rec['name']) for pid, rec in self.plates.items()]
+
+    def get_conditions(self, pid):
+        return self.plates[pid]['conditions']
+
+    def set_conditions(self, pid, conditions):
+        self.plates[pid]['conditions'] = conditions
+
+    def get_df(self, pid):
+        """Rebuilds the plate's DataFrame, reloading it from the store if it was evicted."""
+        rec = self.plates[pid]
+        self.plates.move_to_end(pid)
+        if rec['values'] is None:
+            with np.load(rec['file']) as data:
+                rec['values'] = data['values']
+                rec['time'] = data['time']
+            self._enforce_budget(keep=pid)
+        df = pd.DataFrame(rec['values'].astype(float), columns=rec['wells'])
+        df.insert(0, 'Time', rec['time'])
+        df.attrs = dict(rec['attrs'])
+        return df
+
+    def set_active(self, pid):
+        self.active = pid
+        return self.get_df(pid)
+
+    def memory_usage(self):
+        """Bytes held by resident plate arrays."""
+        return sum(rec['values'].nbytes + rec['time'].nbytes
+                   for rec in self.plates.values() if rec['values'] is not None)
+
+    def set_budget(self, budget_mb):
+        self.budget_mb = budget_mb
+        self._enforce_budget()
+
+    def close(self):
+        if self.store_dir and os.path.isdir(self.store_dir):
+            shutil.rmtree(self.store_dir, ignore_errors=True)
+
+    @staticmethod
+    def _arrays(df):
+        wells = [c for c in df.columns if c != 'Time']
+        return {
+            'wells': wells,
+            'time': df['Time'].to_numpy(dtype=float),
+            'values': df[wells].to_numpy(dtype=float),
+            'attrs': dict(df.attrs),
+        }
+
+    def _enforce_budget(self, keep=None):
+        budget = self.budget_mb * 1024 ** 2
+        for pid, rec in list(self.plates.items()):
+            if self.memory_usage() <= budget:
+                break
+            if pid in (self.active, keep) or rec['values'] is None:
+                continue
+            if self.store_dir is None:
+                self.store_dir = tempfile.mkdtemp(prefix='hibitquant_')
+            if rec['file'] is None:
+                rec['file'] = os.path.join(self.store_dir, f"plate_{pid}.npz")
+                np.savez(rec['file'], values=rec['values'], time=rec['time'])
+            rec['values'] = None